@@ -1,4 +1,5 @@
 from pydantic_settings import BaseSettings
+from typing import Optional
 import os
 from dotenv import load_dotenv
 
@@ -16,7 +17,90 @@ class Settings(BaseSettings):
     COCKTAIL_API_KEY: str
     COCKTAIL_BASE_URL: str
 
+    # Async engine dipakai oleh router; engine sync tetap ada untuk CLI (seeder, migrate)
+    DB_ASYNC_ENABLED: bool = True
+    DB_ASYNC_DRIVER: str = "asyncpg"
+    ASYNC_DATABASE_URL: Optional[str] = None
+
+    # Connection pool (per engine, per worker)
+    DB_ECHO: bool = False
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+
+    # Cache principal hasil autentikasi (0 = nonaktif)
+    AUTH_CACHE_TTL_SECONDS: int = 60
+
+    # Backend cache bersama: "memory" (per worker) atau "redis" (butuh paket redis)
+    CACHE_BACKEND: str = "memory"
+    CACHE_REDIS_URL: str = "redis://localhost:6379/0"
+    CACHE_KEY_PREFIX: str = "curriculum"
+    CACHE_OP_TIMEOUT: float = 0.25
+    CACHE_MEMORY_MAX_ENTRIES: int = 20000
+    CACHE_MEMORY_MAX_TTL_SECONDS: int = 86400
+
+    # Read model graf kurikulum in-process (0 = nonaktif)
+    READ_MODEL_MAX_KURIKULUM: int = 32
+    READ_MODEL_TTL_SECONDS: int = 300
+    READ_MODEL_SHARED_TTL_SECONDS: int = 3600
+
+    # Import massal (POST /matkul/bulk, POST /cpl/{id_kurikulum}/bulk)
+    MATKUL_BULK_MAX_ROWS: int = 10000
+    CPL_BULK_MAX_ITEMS: int = 2000  # jumlah CPL + indikator per request
+
+    # Invalidasi cache antar worker lewat PostgreSQL LISTEN/NOTIFY
+    CACHE_INVALIDATION_LISTEN: bool = True
+    CACHE_INVALIDATION_PING_SECONDS: int = 30
+
+    # Revocation store: refresh entry dari worker lain dan sweep entry kadaluarsa
+    REVOCATION_REFRESH_SECONDS: int = 5
+    REVOCATION_SWEEP_SECONDS: int = 3600
+
+    # Hash password: cost bcrypt dan executor khusus (terpisah dari threadpool anyio)
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_QUEUE: int = 64
+
+    # HTTP client upstream cocktail (satu client bersama per worker)
+    COCKTAIL_MAX_CONNECTIONS: int = 100
+    COCKTAIL_MAX_KEEPALIVE: int = 20
+    COCKTAIL_KEEPALIVE_EXPIRY: float = 30.0
+    COCKTAIL_HTTP2: bool = False  # butuh paket h2 (pip install httpx[http2])
+    COCKTAIL_CONNECT_TIMEOUT: float = 3.0
+    COCKTAIL_READ_TIMEOUT: float = 10.0
+    COCKTAIL_POOL_TIMEOUT: float = 5.0
+
+    # Ketahanan panggilan upstream cocktail
+    COCKTAIL_DEADLINE_SECONDS: float = 8.0
+    COCKTAIL_RETRY_ATTEMPTS: int = 3
+    COCKTAIL_RETRY_BACKOFF_BASE: float = 0.2
+    COCKTAIL_RETRY_BACKOFF_MAX: float = 2.0
+    COCKTAIL_BREAKER_FAILURE_THRESHOLD: int = 5
+    COCKTAIL_BREAKER_RESET_SECONDS: float = 30.0
+
+    # Batch detail cocktail
+    COCKTAIL_BATCH_MAX_IDS: int = 100
+    COCKTAIL_BATCH_CONCURRENCY: int = 8
+
+    # Cache response cocktail (stale-while-revalidate)
+    COCKTAIL_CACHE_TTL_SECONDS: int = 300
+    COCKTAIL_CACHE_STALE_SECONDS: int = 3600
+    COCKTAIL_CACHE_MAX_ENTRIES: int = 5000
+
+    # Cache persisten cocktail (file SQLite, dibagi semua worker di host)
+    COCKTAIL_DISK_CACHE_PATH: Optional[str] = None
+    COCKTAIL_DISK_CACHE_TTL_SECONDS: int = 300  # maksimal COCKTAIL_CACHE_TTL_SECONDS
+    COCKTAIL_DISK_CACHE_RETAIN_SECONDS: int = 604800
+
+    # Katalog cocktail lokal (indeks nama dari endpoint by-letter a-z dan 0-9)
+    COCKTAIL_CATALOG_ENABLED: bool = True
+    COCKTAIL_CATALOG_REFRESH_SECONDS: int = 21600
+    COCKTAIL_CATALOG_RETRY_SECONDS: int = 60
+    COCKTAIL_CATALOG_CONCURRENCY: int = 4
+
     class Config:
         env_file = ".env"
 
-settings = Settings()
\ No newline at end of file
+settings = Settings()
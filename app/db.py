@@ -1,7 +1,106 @@
+import threading
+import time
 from sqlmodel import SQLModel, create_engine, Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
 from app.config import settings
 
-engine = create_engine(settings.DATABASE_URL, echo=True)
+
+class PoolWaitStats:
+    """Counters for time spent waiting on a pool checkout"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.timeouts = 0
+
+    def record(self, elapsed: float, timed_out: bool = False):
+        with self._lock:
+            self.count += 1
+            self.total += elapsed
+            if elapsed > self.max:
+                self.max = elapsed
+            if timed_out:
+                self.timeouts += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.count,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": round(self.total / self.count * 1000, 3) if self.count else 0.0,
+                "max_wait_ms": round(self.max * 1000, 3),
+            }
+
+
+class _WaitTimingMixin:
+    """Measure how long each checkout waits for a free connection"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_stats = PoolWaitStats()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            self.wait_stats.record(time.perf_counter() - start, timed_out=True)
+            raise
+        self.wait_stats.record(time.perf_counter() - start)
+        return conn
+
+
+class TimedQueuePool(_WaitTimingMixin, QueuePool):
+    pass
+
+
+class TimedAsyncAdaptedQueuePool(_WaitTimingMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def _pool_options() -> dict:
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+engine = create_engine(
+    settings.DATABASE_URL,
+    echo=settings.DB_ECHO,
+    poolclass=TimedQueuePool,
+    **_pool_options()
+)
+
+def get_async_database_url() -> str:
+    """Build the async DSN from DATABASE_URL unless ASYNC_DATABASE_URL is set"""
+    if settings.ASYNC_DATABASE_URL:
+        return settings.ASYNC_DATABASE_URL
+
+    url = make_url(settings.DATABASE_URL)
+    backend = url.get_backend_name()
+    return url.set(drivername=f"{backend}+{settings.DB_ASYNC_DRIVER}").render_as_string(
+        hide_password=False
+    )
+
+async_engine = (
+    create_async_engine(
+        get_async_database_url(),
+        echo=settings.DB_ECHO,
+        poolclass=TimedAsyncAdaptedQueuePool,
+        **_pool_options()
+    )
+    if settings.DB_ASYNC_ENABLED
+    else None
+)
 
 def init_db():
     """Initialize database - create all tables"""
@@ -12,6 +111,7 @@ def init_db():
     from app.models.cpl_matkul import CPLMataKuliah  
     from app.models.user import User
     from app.models.token_blacklist import TokenBlacklist
+    from app.models.catalog_version import CatalogVersion
     
     SQLModel.metadata.create_all(engine)
     print("✓ Database tables created successfully!")
@@ -21,6 +121,38 @@ def drop_db():
     SQLModel.metadata.drop_all(engine)
     print("✓ All tables dropped!")
 
-def get_session():
+def _pool_status(pool) -> dict:
+    status = {
+        "pool_class": type(pool).__name__,
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "timeout_s": pool.timeout(),
+    }
+    wait_stats = getattr(pool, "wait_stats", None)
+    if wait_stats is not None:
+        status["wait"] = wait_stats.snapshot()
+    return status
+
+def pool_status() -> dict:
+    """Live connection pool statistics for this worker"""
+    status = {"sync": _pool_status(engine.pool)}
+    if async_engine is not None:
+        status["async"] = _pool_status(async_engine.pool)
+    return status
+
+def async_session() -> AsyncSession:
+    """Open a new AsyncSession on the async engine"""
+    if async_engine is None:
+        raise RuntimeError("Async database engine is disabled (DB_ASYNC_ENABLED=false)")
+    return AsyncSession(async_engine, expire_on_commit=False)
+
+async def get_session():
+    async with async_session() as session:
+        yield session
+
+def get_sync_session():
     with Session(engine) as session:
-        yield session
\ No newline at end of file
+        yield session
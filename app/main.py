@@ -1,3 +1,4 @@
+import asyncio
 from fastapi import FastAPI
 from app.db import init_db
 from app.utils.db_check import db_connection
@@ -7,6 +8,14 @@ from app.routers import cpl
 from app.routers import indikator
 from app.routers import matkul
 from app.routers import cocktail
+from app.routers import internal
+from app.utils.revocation import revocation_store
+from app.utils.password_pool import password_pool
+from app.utils import cocktail_service
+from app.utils.cocktail_catalog import cocktail_catalog
+from app.utils.invalidation import invalidation_listener, listener_enabled
+from app.utils.shared_cache import close_cache_backend
+from app.config import settings
 from fastapi.middleware.cors import CORSMiddleware
 
 app = FastAPI(
@@ -27,11 +36,32 @@ app.add_middleware(
     expose_headers=["*"],
 )
 
+background_tasks = []
+
 @app.on_event("startup")
 def on_startup():
     print("Starting up application...")
     print("Application ready!")
 
+@app.on_event("startup")
+async def start_background_tasks():
+    await cocktail_service.start_client()
+    background_tasks.append(asyncio.create_task(revocation_store.run()))
+    if listener_enabled():
+        background_tasks.append(asyncio.create_task(invalidation_listener.run()))
+    if settings.COCKTAIL_CATALOG_ENABLED:
+        background_tasks.append(asyncio.create_task(cocktail_catalog.run()))
+
+@app.on_event("shutdown")
+async def stop_background_tasks():
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    background_tasks.clear()
+    password_pool.shutdown()
+    await cocktail_service.close_client()
+    await close_cache_backend()
+
 @app.get("/")
 async def main():
     if db_connection:
@@ -47,4 +77,5 @@ app.include_router(kurikulum.router)
 app.include_router(cpl.router)
 app.include_router(indikator.router)
 app.include_router(matkul.router)
-app.include_router(cocktail.router)
\ No newline at end of file
+app.include_router(cocktail.router)
+app.include_router(internal.router)
\ No newline at end of file
@@ -0,0 +1,9 @@
+from sqlmodel import SQLModel, Field
+
+class CatalogVersion(SQLModel, table=True):
+    __tablename__ = "catalog_version"
+
+    # satu baris per daftar yang divalidasi dengan ETag (mis. "matkul"),
+    # naik di transaksi yang sama dengan setiap perubahan kurikulum/matkul
+    name: str = Field(primary_key=True, max_length=50)
+    version: int = Field(default=1)
@@ -12,7 +12,7 @@ class CPLMataKuliah(SQLModel, table=True):
 
     id_kurikulum: uuid.UUID = Field()
     id_cpl: str = Field(max_length=50)
-    id_matkul: str = Field(max_length=50)
+    id_matkul: str = Field(max_length=50, index=True)
 
     __table_args__ = (
         PrimaryKeyConstraint("id_kurikulum", "id_cpl", "id_matkul"),
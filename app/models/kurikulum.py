@@ -20,8 +20,10 @@ class Kurikulum(SQLModel, table=True):
     )
     nama_kurikulum: str = Field(max_length=255)
     revisi: Optional[str] = Field(default=None, max_length=50)
-    status_kurikulum: Optional[StatusEnum] = None
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    status_kurikulum: Optional[StatusEnum] = Field(default=None, index=True)
+    created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
+    # naik setiap ada perubahan pada kurikulum atau turunannya (CPL, indikator, relasi matkul)
+    version: int = Field(default=1, sa_column_kwargs={"server_default": "1", "nullable": False})
     
     cpl_list: List["CPL"] = Relationship(back_populates="kurikulum")
\ No newline at end of file
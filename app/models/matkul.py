@@ -10,8 +10,8 @@ class MataKuliah(SQLModel, table=True):
 
     id_matkul: str = Field(primary_key=True, max_length=50)
     mata_kuliah: str = Field(max_length=255)
-    sks: int
-    semester: int
+    sks: int = Field(index=True)
+    semester: int = Field(index=True)
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     
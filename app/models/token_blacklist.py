@@ -1,12 +1,12 @@
 from sqlmodel import SQLModel, Field
-from datetime import datetime, timezone
-import uuid
+from datetime import datetime
 
 class TokenBlacklist(SQLModel, table=True):
     __tablename__ = "token_blacklist"
 
-    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
-    token: str = Field(index=True, unique=True)
-    blacklisted_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
-    expires_at: datetime  
-    user_id: str = Field(foreign_key="users.user_id", max_length=25)
\ No newline at end of file
+    # jti token, atau SHA-256 hex dari token lama yang belum punya jti.
+    # Database lama (kolom id/token) dimigrasi oleh revisi 0004 di app/utils/migrate.py
+    token_key: str = Field(primary_key=True, max_length=64)
+    blacklisted_at: datetime = Field(default_factory=datetime.utcnow, index=True)
+    expires_at: datetime = Field(index=True)
+    user_id: str = Field(foreign_key="users.user_id", max_length=25)
@@ -1,6 +1,6 @@
 from sqlmodel import SQLModel, Field
 from enum import Enum
-from datetime import datetime, timezone
+from datetime import datetime
 
 class RoleEnum(str, Enum):
     kadep = "kadep"
@@ -13,5 +13,5 @@ class User(SQLModel, table=True):
     nama: str = Field(max_length=255)
     password: str = Field(max_length=255)  
     role: RoleEnum = Field(sa_column_kwargs={"nullable": False})
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
-    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
\ No newline at end of file
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
\ No newline at end of file
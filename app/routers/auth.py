@@ -1,20 +1,27 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials
-from sqlmodel import Session, select
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy.exc import IntegrityError
 from app.db import get_session
 from app.models.user import User
 from app.models.token_blacklist import TokenBlacklist
 from app.schemas.auth import LoginRequest, TokenResponse, UserResponse, RegisterRequest
 from app.utils.auth import (
-    verify_password, 
+    verify_password_async, 
     create_access_token, 
     get_current_user,
     security,
     decode_token,
-    hash_password
+    hash_password_async,
+    password_needs_rehash,
+    invalidate_principal
 )
-from datetime import timedelta, datetime, timezone
+from datetime import timedelta, datetime
+from jose import jwt
 from app.utils.auth import require_kadep
+from app.utils.revocation import revocation_key, revocation_store
+from app.utils.password_pool import PasswordPoolBusy
 
 router = APIRouter(
     prefix="/auth", 
@@ -33,9 +40,9 @@ router = APIRouter(
     description="Autentikasi user dan mendapatkan JWT access token",
     response_description="JWT access token untuk autentikasi dan otorisasi endpoint lain"
 )
-def login(
+async def login(
     login_data: LoginRequest,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_session)
 ):
     """
     Login user dan mendapatkan JWT access token.
@@ -46,9 +53,10 @@ def login(
     
     **Proses:**
     1. Mencari user berdasarkan user_id
-    2. Memverifikasi password (hashed comparison)
-    3. Membuat JWT token dengan payload user info
-    4. Token berlaku selama 24 jam
+    2. Memverifikasi password (hashed comparison) di pool bcrypt khusus
+    3. Jika cost hash tersimpan berbeda dari BCRYPT_ROUNDS, password di-hash ulang
+    4. Membuat JWT token dengan payload user info
+    5. Token berlaku selama 24 jam
     
     **Token Payload:**
     - sub: user_id
@@ -65,20 +73,38 @@ def login(
     
     **Error:**
     - 401: user_id tidak ditemukan atau password salah
+    - 503: Antrian verifikasi password penuh (coba lagi sesuai Retry-After)
     
     **Security:**
     - Password di-hash menggunakan bcrypt
     - Token menggunakan JWT dengan signing algorithm
     """
     statement = select(User).where(User.user_id == login_data.user_id)
-    user = session.exec(statement).first()
+    user = (await session.exec(statement)).first()
     
-    if not user or not verify_password(login_data.password, user.password):
+    try:
+        valid = user is not None and await verify_password_async(login_data.password, user.password)
+    except PasswordPoolBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many concurrent login attempts, please retry",
+            headers={"Retry-After": "1"},
+        )
+    
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect user_id or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    
+    if password_needs_rehash(user.password):
+        try:
+            user.password = await hash_password_async(login_data.password)
+            session.add(user)
+            await session.commit()
+        except PasswordPoolBusy:
+            pass
       
     access_token = create_access_token(
         data={
@@ -102,7 +128,7 @@ def login(
     description="Mengambil informasi user yang sedang login berdasarkan JWT token",
     response_description="Data lengkap user yang sedang terautentikasi"
 )
-def get_current_user_info(
+async def get_current_user_info(
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -147,9 +173,9 @@ def get_current_user_info(
     description="Logout user dengan cara memasukkan token ke blacklist",
     response_description="Konfirmasi logout berhasil"
 )
-def logout(
+async def logout(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_session)
 ):
     """
     Logout user dengan cara me-revoke JWT token.
@@ -161,12 +187,13 @@ def logout(
     **Proses:**
     1. Decode dan validasi JWT token
     2. Cek apakah token sudah ada di blacklist
-    3. Tambahkan token ke blacklist dengan expires_at 24 jam
+    3. Tambahkan jti token ke blacklist dengan expires_at = exp token
     4. Token tidak bisa digunakan lagi setelah logout
     
     **Token Blacklist:**
-    - Token yang di-logout disimpan di database
-    - Token tetap di blacklist sampai expires_at tercapai
+    - Yang disimpan hanya jti token (atau hash SHA-256 untuk token lama)
+    - Token tetap di blacklist sampai expires_at tercapai, lalu dihapus
+      oleh sweep berkala
     - Mencegah token yang sama digunakan ulang
     
     **Return:**
@@ -190,24 +217,39 @@ def logout(
     
     try: 
         token_data = decode_token(token)
-          
-        existing = session.exec(
-            select(TokenBlacklist).where(TokenBlacklist.token == token)
-        ).first()
+        key = revocation_key(token)
         
-        if existing:
+        if await revocation_store.is_revoked(session, key):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Token already revoked"
             )   
         
+        exp = jwt.get_unverified_claims(token).get("exp")
+        expires_at = (
+            datetime.utcfromtimestamp(exp) if exp is not None
+            else datetime.utcnow() + timedelta(hours=24)
+        )
+        
         blacklist_entry = TokenBlacklist(
-            token=token,
+            token_key=key,
             user_id=token_data.user_id,
-            expires_at=datetime.now(timezone.utc) + timedelta(hours=24)  
+            expires_at=expires_at
         )
         session.add(blacklist_entry)
-        session.commit()
+        try:
+            await session.commit()
+        except IntegrityError:
+            # sudah di-revoke di worker lain, salinan lokal belum sempat refresh
+            await session.rollback()
+            revocation_store.add(key, expires_at)
+            await invalidate_principal(token)
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Token already revoked"
+            )
+        revocation_store.add(key, expires_at)
+        await invalidate_principal(token)
         
         return {
             "message": "Successfully logged out",
@@ -230,9 +272,9 @@ def logout(
     response_description="Data user yang berhasil didaftarkan",
     dependencies=[Depends(require_kadep)]
 )
-def register(
+async def register(
     register_data: RegisterRequest,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_session)
 ):
     """
     Mendaftarkan user baru ke sistem.
@@ -272,9 +314,9 @@ def register(
     - Tambahkan captcha untuk mencegah spam registration
     """
     
-    existing_user = session.exec(
+    existing_user = (await session.exec(
         select(User).where(User.user_id == register_data.user_id)
-    ).first()
+    )).first()
     
     if existing_user:
         raise HTTPException(
@@ -295,7 +337,14 @@ def register(
             detail="Password must be at least 8 characters long."
         )
     
-    hashed_password = hash_password(register_data.password)
+    try:
+        hashed_password = await hash_password_async(register_data.password)
+    except PasswordPoolBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server busy hashing passwords, please retry",
+            headers={"Retry-After": "1"},
+        )
      
     new_user = User(
         user_id=register_data.user_id,
@@ -305,8 +354,8 @@ def register(
     )
     
     session.add(new_user)
-    session.commit()
-    session.refresh(new_user)
+    await session.commit()
+    await session.refresh(new_user)
     
     return {
         "message": "User registered successfully",
@@ -1,27 +1,76 @@
-from fastapi import APIRouter, HTTPException
+import math
+from fastapi import APIRouter, HTTPException, status
+from app.utils.circuit_breaker import CircuitOpen
 from app.utils.cocktail_service import (
     fetch_cocktail_list,
     fetch_cocktail_detail,
-    fetch_cocktails_by_letter
+    fetch_cocktails_by_letter,
+    fetch_cocktail_details
 )
+from app.schemas.cocktail import CocktailBatch
+from app.utils.cocktail_catalog import cocktail_catalog
 
 router = APIRouter(
     prefix="/api/cocktails",
     tags=["Cocktails"]
 )
 
+
+def upstream_error(exc: Exception, detail: str) -> HTTPException:
+    """
+    Map an upstream failure to an HTTP error: 503 when the circuit breaker
+    is open, 504 when the call deadline is exceeded, 500 otherwise
+    """
+    if isinstance(exc, CircuitOpen):
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"{detail}: upstream unavailable",
+            headers={"Retry-After": str(max(1, math.ceil(exc.retry_after)))},
+        )
+    if isinstance(exc, TimeoutError):
+        return HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=f"{detail}: upstream timed out"
+        )
+    return HTTPException(
+        status_code=500,
+        detail=detail
+    )
+
 @router.get("/")
 async def list_cocktails(name: str):
     """
     List cocktails by name
+
+    Answered from the local catalogue when possible, falls back to upstream
+    when the catalogue is not loaded yet or has no match.
     """
+    local = cocktail_catalog.search(name)
+    if local is not None:
+        return local
+
     try:
         return await fetch_cocktail_list(name)
-    except Exception:
-        raise HTTPException(
-            status_code=500,
-            detail="Failed to fetch cocktail list"
-        )
+    except Exception as e:
+        raise upstream_error(e, "Failed to fetch cocktail list")
+
+@router.post("/batch")
+async def cocktail_batch(batch: CocktailBatch):
+    """
+    Get details for many cocktails in one request
+
+    Duplicate IDs are collapsed; cached details are returned directly and
+    the rest are fetched concurrently. `drinks` maps each ID to its detail
+    (null when upstream has no such cocktail), `not_found` and `failed`
+    list the IDs without a detail.
+    """
+    drinks, failed = await fetch_cocktail_details(batch.ids)
+    return {
+        "drinks": drinks,
+        "not_found": [cocktail_id for cocktail_id, drink in drinks.items() if drink is None],
+        "failed": failed
+    }
+
 
 @router.get("/{cocktail_id}")
 async def cocktail_detail(cocktail_id: str):
@@ -30,11 +79,8 @@ async def cocktail_detail(cocktail_id: str):
     """
     try:
         return await fetch_cocktail_detail(cocktail_id)
-    except Exception:
-        raise HTTPException(
-            status_code=500,
-            detail="Failed to fetch cocktail detail"
-        )
+    except Exception as e:
+        raise upstream_error(e, "Failed to fetch cocktail detail")
 
 
 @router.get("/by-letter/{letter}")
@@ -50,8 +96,5 @@ async def cocktails_by_letter(letter: str):
 
     try:
         return await fetch_cocktails_by_letter(letter.lower())
-    except Exception:
-        raise HTTPException(
-            status_code=500,
-            detail="Failed to fetch cocktails by letter"
-        )
\ No newline at end of file
+    except Exception as e:
+        raise upstream_error(e, "Failed to fetch cocktails by letter")
\ No newline at end of file
@@ -1,15 +1,29 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlmodel import select, func
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import tuple_, insert
+from sqlalchemy.exc import IntegrityError
+from typing import Any, Dict, List, Optional
 from app.db import get_session
-from app.schemas.cpl import CreateCPL, UpdateCPL
+from app.schemas.cpl import CreateCPL, UpdateCPL, BulkCPL
 from app.models.cpl import CPL
 from app.models.kurikulum import Kurikulum
 from app.models.indikator import IndikatorCPL
 from app.models.cpl_matkul import CPLMataKuliah
-from app.models.matkul import MataKuliah
+from app.config import settings
 import re
 import uuid
 from app.utils.auth import require_kadep, require_kadep_or_dosen
+from app.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, decode_cursor, split_page
+from app.utils.read_model import read_model
+from app.utils.versioning import (
+    bump_kurikulum_version,
+    load_kurikulum_version,
+    make_etag,
+    etag_matches,
+    not_modified,
+    set_etag
+)
 
 router = APIRouter(
     prefix="/cpl", 
@@ -17,6 +31,16 @@ router = APIRouter(
     responses={404: {"description": "Tidak ditemukan"}}
 )
 
+
+async def cpl_has_matkul(session: AsyncSession, id_kurikulum: uuid.UUID, id_cpl: str) -> bool:
+    """True jika CPL dipetakan ke mata kuliah (datanya ikut tampil di GET /matkul/)"""
+    return (await session.exec(
+        select(CPLMataKuliah.id_matkul).where(
+            CPLMataKuliah.id_kurikulum == id_kurikulum,
+            CPLMataKuliah.id_cpl == id_cpl
+        ).limit(1)
+    )).first() is not None
+
 @router.post(
     "/{id_kurikulum}", 
     status_code=status.HTTP_201_CREATED,
@@ -28,7 +52,7 @@ router = APIRouter(
 async def create_cpl(
     id_kurikulum: uuid.UUID,
     data: CreateCPL,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_session)
 ):
     """
     Menambahkan CPL baru ke kurikulum.
@@ -58,9 +82,9 @@ async def create_cpl(
     - 400: Format ID tidak valid, field kosong, atau ID sudah digunakan
     - 404: Kurikulum tidak ditemukan
     """
-    kurikulum = session.exec(
+    kurikulum = (await session.exec(
         select(Kurikulum).where(Kurikulum.id_kurikulum == id_kurikulum)
-    ).first()
+    )).first()
 
     if not kurikulum:
         raise HTTPException(404, "Kurikulum tidak ditemukan.")
@@ -76,11 +100,11 @@ async def create_cpl(
             "Format id_cpl tidak valid. Gunakan pola 'CPL-XX' (dua digit)."
         )
 
-    existing_cpl = session.exec(
+    existing_cpl = (await session.exec(
         select(CPL).where(
             (CPL.id_cpl == data.id_cpl) & (CPL.id_kurikulum == id_kurikulum)
         )
-    ).first()
+    )).first()
 
     if existing_cpl:
         raise HTTPException(400, "id_cpl sudah digunakan. Gunakan id_cpl lain.")
@@ -95,14 +119,155 @@ async def create_cpl(
     )
 
     session.add(new_cpl)
-    session.commit()
-    session.refresh(new_cpl)
+    await bump_kurikulum_version(session, id_kurikulum)
+    await session.commit()
+    await session.refresh(new_cpl)
+    read_model.invalidate(id_kurikulum)
 
     return {
         "message": "Berhasil menambahkan CPL",
         "cpl": new_cpl
     }
 
+@router.post(
+    "/{id_kurikulum}/bulk",
+    status_code=status.HTTP_201_CREATED,
+    summary="Tambah CPL dan Indikator Sekaligus",
+    description="Menambahkan banyak CPL beserta indikatornya ke kurikulum tertentu dalam satu transaksi",
+    response_description="Jumlah CPL dan indikator yang berhasil ditambahkan",
+    dependencies=[Depends(require_kadep)]
+)
+async def create_cpl_bulk(
+    id_kurikulum: uuid.UUID,
+    data: BulkCPL,
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Menambahkan pohon CPL dan indikator ke kurikulum sekaligus.
+
+    **Parameter Path:**
+    - **id_kurikulum**: ID kurikulum tempat CPL akan ditambahkan (format UUID)
+
+    **Parameter Body:**
+    - **cpl**: Daftar CPL (`id_cpl`, `deskripsi`), masing-masing dengan daftar
+      `indikator` (`id_indikator`, `deskripsi`)
+
+    **Validasi:**
+    - Aturan sama dengan `POST /cpl/{id_kurikulum}` dan `POST /indikator/{id_kurikulum}/{id_cpl}`
+    - id_cpl unik di dalam request dan belum ada di kurikulum
+    - id_indikator unik untuk setiap CPL
+    - Semua error dikumpulkan; jika ada satu saja, tidak ada data yang disimpan
+
+    **Return:**
+    - Message konfirmasi
+    - Jumlah CPL dan indikator yang ditambahkan
+
+    **Error:**
+    - 400: Ada item yang tidak valid (detail berisi daftar error per item)
+    - 404: Kurikulum tidak ditemukan
+    - 409: CPL dengan ID yang sama ditambahkan bersamaan oleh request lain
+    """
+    if not data.cpl:
+        raise HTTPException(400, "Daftar CPL tidak boleh kosong.")
+
+    total_items = len(data.cpl) + sum(len(item.indikator) for item in data.cpl)
+    if total_items > settings.CPL_BULK_MAX_ITEMS:
+        raise HTTPException(
+            413,
+            f"Maksimal {settings.CPL_BULK_MAX_ITEMS} CPL dan indikator per request."
+        )
+
+    kurikulum_exists = (await session.exec(
+        select(Kurikulum.id_kurikulum).where(Kurikulum.id_kurikulum == id_kurikulum)
+    )).first()
+
+    if not kurikulum_exists:
+        raise HTTPException(404, "Kurikulum tidak ditemukan.")
+
+    existing_cpl = set((await session.exec(
+        select(CPL.id_cpl).where(
+            CPL.id_kurikulum == id_kurikulum,
+            CPL.id_cpl.in_({item.id_cpl for item in data.cpl})
+        )
+    )).all())
+
+    cpl_pattern = r"^CPL-\d{2}$"
+    indikator_pattern = r"^IND-\d{2}-\d{2}$"
+    errors: List[Dict[str, Any]] = []
+    seen_cpl = set()
+
+    for i, item in enumerate(data.cpl):
+        problems = []
+        if not item.id_cpl.strip():
+            problems.append("id_cpl tidak boleh kosong.")
+        elif not re.match(cpl_pattern, item.id_cpl):
+            problems.append("Format id_cpl tidak valid. Gunakan pola 'CPL-XX' (dua digit).")
+        elif item.id_cpl in existing_cpl or item.id_cpl in seen_cpl:
+            problems.append("id_cpl sudah digunakan. Gunakan id_cpl lain.")
+        if not item.deskripsi.strip():
+            problems.append("deskripsi tidak boleh kosong.")
+        if problems:
+            errors.append({"path": f"cpl[{i}]", "id": item.id_cpl, "errors": problems})
+        seen_cpl.add(item.id_cpl)
+
+        seen_indikator = set()
+        for j, indikator in enumerate(item.indikator):
+            problems = []
+            if not indikator.id_indikator.strip():
+                problems.append("id_indikator tidak boleh kosong.")
+            elif not re.match(indikator_pattern, indikator.id_indikator):
+                problems.append("Format id_indikator tidak valid. Gunakan pola 'IND-XX-YY', XX sesuai no CPL.")
+            elif indikator.id_indikator in seen_indikator:
+                problems.append("id_indikator sudah digunakan untuk CPL ini. Gunakan id_indikator lain.")
+            if not indikator.deskripsi.strip():
+                problems.append("deskripsi tidak boleh kosong.")
+            if problems:
+                errors.append({
+                    "path": f"cpl[{i}].indikator[{j}]",
+                    "id": indikator.id_indikator,
+                    "errors": problems
+                })
+            seen_indikator.add(indikator.id_indikator)
+
+    if errors:
+        raise HTTPException(
+            400,
+            {"message": "Tidak ada data yang disimpan karena ada item yang tidak valid.", "errors": errors}
+        )
+
+    cpl_rows = [
+        {"id_kurikulum": id_kurikulum, "id_cpl": item.id_cpl, "deskripsi": item.deskripsi}
+        for item in data.cpl
+    ]
+    indikator_rows = [
+        {
+            "id_kurikulum": id_kurikulum,
+            "id_cpl": item.id_cpl,
+            "id_indikator": indikator.id_indikator,
+            "deskripsi": indikator.deskripsi
+        }
+        for item in data.cpl
+        for indikator in item.indikator
+    ]
+
+    try:
+        await session.exec(insert(CPL), params=cpl_rows)
+        if indikator_rows:
+            await session.exec(insert(IndikatorCPL), params=indikator_rows)
+        await bump_kurikulum_version(session, id_kurikulum)
+        await session.commit()
+    except IntegrityError:
+        await session.rollback()
+        raise HTTPException(409, "Sebagian CPL sudah ditambahkan oleh request lain. Silakan ulangi.")
+    read_model.invalidate(id_kurikulum)
+
+    return {
+        "message": "Berhasil menambahkan CPL dan indikator",
+        "id_kurikulum": str(id_kurikulum),
+        "cpl": len(cpl_rows),
+        "indikator": len(indikator_rows)
+    }
+
 @router.get(
     "/{id_kurikulum}/{id_cpl}", 
     status_code=status.HTTP_200_OK,
@@ -114,7 +279,9 @@ async def create_cpl(
 async def get_detail_cpl(
     id_kurikulum: uuid.UUID,
     id_cpl: str,
-    session: Session = Depends(get_session) 
+    request: Request,
+    response: Response,
+    session: AsyncSession = Depends(get_session)
 ):
     """
     Mengambil informasi detail CPL lengkap dengan semua relasinya.
@@ -138,62 +305,57 @@ async def get_detail_cpl(
     **Fitur:**
     - Menampilkan semua relasi CPL dalam satu response
     - Berguna untuk melihat dampak CPL terhadap mata kuliah
+    - Dilayani dari read model in-process (app.utils.read_model)
+    - ETag mengikuti version kurikulum; If-None-Match yang cocok mendapat 304
     
     **Error:**
+    - 304: Tidak berubah sejak ETag di If-None-Match
     - 404: CPL tidak ditemukan
     """
-    cpl = session.exec(
-        select(CPL).where(
-            (CPL.id_kurikulum == id_kurikulum) & (CPL.id_cpl == id_cpl)
-        )
-    ).first()
+    version = read_model.cached_version(id_kurikulum)
+    if version is None:
+        version = await load_kurikulum_version(session, id_kurikulum)
+    if version is None:
+        raise HTTPException(404, "CPL tidak ditemukan.")
+
+    etag = make_etag("cpl", id_kurikulum, id_cpl, version)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    graph = await read_model.get(id_kurikulum)
+    cpl = graph.cpl_by_id.get(id_cpl) if graph else None
 
     if not cpl:
         raise HTTPException(404, "CPL tidak ditemukan.")
     
-    kurikulum = session.get(Kurikulum, cpl.id_kurikulum)
-
-    indikator_list = session.exec(
-        select(IndikatorCPL).where(IndikatorCPL.id_cpl == id_cpl)
-    ).all()
-  
-    relasi = session.exec(
-        select(CPLMataKuliah).where(CPLMataKuliah.id_cpl == id_cpl)
-    ).all()
-
-    id_matkul_list = [r.id_matkul for r in relasi]
- 
-    matkul_list = []
-    if id_matkul_list:
-        matkul_list = session.exec(
-            select(MataKuliah).where(MataKuliah.id_matkul.in_(id_matkul_list))
-        ).all()
+    kurikulum = graph.kurikulum
+    set_etag(response, make_etag("cpl", id_kurikulum, id_cpl, kurikulum["version"]))
 
     return {
         "cpl": {
-            "id_cpl": cpl.id_cpl,
-            "deskripsi": cpl.deskripsi,
+            "id_cpl": cpl["id_cpl"],
+            "deskripsi": cpl["deskripsi"],
         },
         "kurikulum": {
-            "id_kurikulum": kurikulum.id_kurikulum,
-            "nama_kurikulum": kurikulum.nama_kurikulum,
-            "revisi": kurikulum.revisi
-        } if kurikulum else None,
+            "id_kurikulum": kurikulum["id_kurikulum"],
+            "nama_kurikulum": kurikulum["nama_kurikulum"],
+            "revisi": kurikulum["revisi"]
+        },
         "indikator": [
             {
-                "id_indikator": i.id_indikator,
-                "deskripsi": i.deskripsi
+                "id_indikator": i["id_indikator"],
+                "deskripsi": i["deskripsi"]
             }
-            for i in indikator_list
+            for i in graph.indikator_by_cpl.get(id_cpl, [])
         ],
         "mata_kuliah": [
             {
-                "id_matkul": m.id_matkul,
-                "mata_kuliah": m.mata_kuliah,
-                "sks": m.sks,
-                "semester": m.semester
+                "id_matkul": m["id_matkul"],
+                "mata_kuliah": m["mata_kuliah"],
+                "sks": m["sks"],
+                "semester": m["semester"]
             }
-            for m in matkul_list
+            for m in graph.matkul_by_cpl.get(id_cpl, [])
         ]
     }
 
@@ -210,7 +372,7 @@ async def update_cpl(
     id_kurikulum: uuid.UUID,
     id_cpl: str,
     data: UpdateCPL,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_session)
 ):
     """
     Mengupdate data CPL yang sudah ada.
@@ -236,23 +398,31 @@ async def update_cpl(
     - 400: Deskripsi kosong
     - 404: CPL tidak ditemukan
     """
-    cpl = session.exec(
+    cpl = (await session.exec(
         select(CPL).where(
             (CPL.id_kurikulum == id_kurikulum) & (CPL.id_cpl == id_cpl)
         )
-    ).first()
+    )).first()
 
     if not cpl:
         raise HTTPException(404, "CPL tidak ditemukan.")
 
+    deskripsi_changed = False
     if data.deskripsi is not None:
         if not data.deskripsi.strip():
             raise HTTPException(400, "deskripsi tidak boleh kosong.")
+        deskripsi_changed = data.deskripsi != cpl.deskripsi
         cpl.deskripsi = data.deskripsi
 
     session.add(cpl)
-    session.commit()
-    session.refresh(cpl)
+    await bump_kurikulum_version(
+        session,
+        id_kurikulum,
+        matkul_catalog=deskripsi_changed and await cpl_has_matkul(session, id_kurikulum, id_cpl)
+    )
+    await session.commit()
+    await session.refresh(cpl)
+    read_model.invalidate(id_kurikulum)
 
     return {
         "message": "Berhasil memperbarui CPL",
@@ -270,7 +440,7 @@ async def update_cpl(
 async def delete_cpl(
     id_kurikulum: uuid.UUID,
     id_cpl: str,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_session)
 ):
     """
     Menghapus CPL dari database.
@@ -292,38 +462,94 @@ async def delete_cpl(
     **Error:**
     - 404: CPL tidak ditemukan
     """
-    cpl = session.exec(
+    cpl = (await session.exec(
         select(CPL).where(
             (CPL.id_kurikulum == id_kurikulum) & (CPL.id_cpl == id_cpl)
         )
-    ).first()
+    )).first()
 
     if not cpl:
         raise HTTPException(404, "CPL tidak ditemukan.")
 
-    session.delete(cpl)
-    session.commit()
+    mapped = await cpl_has_matkul(session, id_kurikulum, id_cpl)
+    await session.delete(cpl)
+    await bump_kurikulum_version(session, id_kurikulum, matkul_catalog=mapped)
+    await session.commit()
+    read_model.invalidate(id_kurikulum)
+
+
+async def _active_cpl_from_read_model(
+    id_kurikulum: uuid.UUID,
+    limit: int,
+    cursor: Optional[str],
+    with_total: bool
+):
+    """Versi kurikulum-aktif untuk satu kurikulum, dihitung dari graf di read model"""
+    graph = await read_model.get(id_kurikulum)
+    if not graph or graph.kurikulum["status_kurikulum"] != "aktif":
+        return {"total": 0 if with_total else None, "data": [], "next_cursor": None}
+
+    rows = graph.cpl
+    if cursor:
+        last_key = tuple(decode_cursor(cursor, [uuid.UUID, str]))
+        rows = [c for c in rows if (id_kurikulum, c["id_cpl"]) > last_key]
+
+    page, next_cursor = split_page(
+        rows[:limit + 1], limit, lambda c: (id_kurikulum, c["id_cpl"])
+    )
+
+    kurikulum = graph.kurikulum
+    return {
+        "total": len(graph.cpl) if with_total else None,
+        "data": [
+            {
+                "id_cpl": c["id_cpl"],
+                "deskripsi": c["deskripsi"],
+                "kurikulum": {
+                    "id_kurikulum": kurikulum["id_kurikulum"],
+                    "nama_kurikulum": kurikulum["nama_kurikulum"],
+                    "revisi": kurikulum["revisi"],
+                    "status_kurikulum": kurikulum["status_kurikulum"]
+                }
+            }
+            for c in page
+        ],
+        "next_cursor": next_cursor
+    }
 
 
 @router.get(
     "/kurikulum-aktif", 
     status_code=status.HTTP_200_OK,
     summary="Daftar CPL dari Kurikulum Aktif",
-    description="Mengambil semua CPL yang berasal dari kurikulum dengan status aktif",
-    response_description="Daftar CPL dari kurikulum aktif",
+    description="Mengambil CPL dari kurikulum berstatus aktif per halaman",
+    response_description="Daftar CPL dari kurikulum aktif pada halaman ini",
     dependencies=[Depends(require_kadep_or_dosen)]
 )
-async def get_cpl_from_active_kurikulum(session: Session = Depends(get_session)):
+async def get_cpl_from_active_kurikulum(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    id_kurikulum: Optional[uuid.UUID] = None,
+    with_total: bool = False,
+    session: AsyncSession = Depends(get_session)
+):
     """
-    Mengambil semua CPL dari kurikulum yang berstatus 'aktif'.
+    Mengambil CPL dari kurikulum yang berstatus 'aktif' (keyset pagination).
+    
+    **Parameter Query:**
+    - **limit**: Jumlah data per halaman (default 50, maksimum 200)
+    - **cursor**: Nilai next_cursor dari halaman sebelumnya
+    - **id_kurikulum** (opsional): Batasi ke satu kurikulum aktif (dilayani dari read model)
+    - **with_total**: Sertakan jumlah total data (menambah satu query COUNT)
     
     **Fitur:**
     - Hanya menampilkan CPL dari kurikulum aktif
     - Berguna untuk mendapatkan CPL yang sedang berlaku
     - Menampilkan informasi kurikulum parent untuk setiap CPL
+    - Diurutkan berdasarkan id_kurikulum lalu id_cpl (primary key CPL)
     
     **Return:**
-    - **total**: Jumlah total CPL dari kurikulum aktif
+    - **total**: Jumlah total CPL dari kurikulum aktif (null jika with_total=false)
     - **data**: Array CPL dengan struktur:
       - id_cpl: ID CPL
       - deskripsi: Deskripsi CPL
@@ -332,38 +558,45 @@ async def get_cpl_from_active_kurikulum(session: Session = Depends(get_session))
         - nama_kurikulum
         - revisi
         - status_kurikulum
+    - **next_cursor**: Cursor halaman berikutnya (null jika sudah halaman terakhir)
     
     **Use Case:**
     - Menampilkan CPL yang sedang berlaku di sistem
     - Filter data untuk proses pembelajaran aktif
     - Referensi untuk pembuatan RPS atau dokumen akademik
-    """
-    
-    kurikulum_aktif = session.exec(
-        select(Kurikulum).where(Kurikulum.status_kurikulum == "aktif")
-    ).all()
-    
-    if not kurikulum_aktif:
-        return {
-            "total": 0,
-            "data": []
-        }
-    
-    
-    id_kurikulum_aktif = [k.id_kurikulum for k in kurikulum_aktif]
-    
-    
-    cpl_list = session.exec(
-        select(CPL).where(CPL.id_kurikulum.in_(id_kurikulum_aktif))
-    ).all()
-    
-    
-    kurikulum_dict = {k.id_kurikulum: k for k in kurikulum_aktif}
     
+    **Error:**
+    - 400: cursor tidak valid
+    """
+    if id_kurikulum is not None:
+        return await _active_cpl_from_read_model(id_kurikulum, limit, cursor, with_total)
+
+    filters = [Kurikulum.status_kurikulum == "aktif"]
+
+    statement = (
+        select(CPL, Kurikulum)
+        .join(Kurikulum, Kurikulum.id_kurikulum == CPL.id_kurikulum)
+        .where(*filters)
+    )
+
+    if cursor:
+        last_id_kurikulum, last_id_cpl = decode_cursor(cursor, [uuid.UUID, str])
+        statement = statement.where(
+            tuple_(CPL.id_kurikulum, CPL.id_cpl) > (last_id_kurikulum, last_id_cpl)
+        )
+
+    rows = (await session.exec(
+        statement
+        .order_by(CPL.id_kurikulum, CPL.id_cpl)
+        .limit(limit + 1)
+    )).all()
+
+    page, next_cursor = split_page(
+        rows, limit, lambda row: (row[0].id_kurikulum, row[0].id_cpl)
+    )
     
     result = []
-    for cpl in cpl_list:
-        kurikulum = kurikulum_dict.get(cpl.id_kurikulum)
+    for cpl, kurikulum in page:
         result.append({
             "id_cpl": cpl.id_cpl,
             "deskripsi": cpl.deskripsi,
@@ -372,10 +605,20 @@ async def get_cpl_from_active_kurikulum(session: Session = Depends(get_session))
                 "nama_kurikulum": kurikulum.nama_kurikulum,
                 "revisi": kurikulum.revisi,
                 "status_kurikulum": kurikulum.status_kurikulum
-            } if kurikulum else None
+            }
         })
+
+    total = None
+    if with_total:
+        total = (await session.exec(
+            select(func.count())
+            .select_from(CPL)
+            .join(Kurikulum, Kurikulum.id_kurikulum == CPL.id_kurikulum)
+            .where(*filters)
+        )).one()
     
     return {
-        "total": len(result),
-        "data": result
-    }
\ No newline at end of file
+        "total": total,
+        "data": result,
+        "next_cursor": next_cursor
+    }
@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select, delete
+from sqlmodel import select, delete
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.db import get_session
 from app.schemas.indikator import CreateIndikator, IndikatorCPLUpdate
 from app.models.indikator import IndikatorCPL
@@ -7,6 +8,8 @@ from app.models.cpl import CPL
 import re
 import uuid
 from app.utils.auth import require_kadep, require_kadep_or_dosen
+from app.utils.read_model import read_model
+from app.utils.versioning import bump_kurikulum_version
 
 router = APIRouter(
     prefix="/indikator", 
@@ -26,7 +29,7 @@ async def create_indikator(
     id_kurikulum: uuid.UUID,
     id_cpl: str,
     data: CreateIndikator,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_session)
 ):
     """
     Menambahkan indikator CPL baru ke database.
@@ -54,12 +57,12 @@ async def create_indikator(
     - 400: Format ID tidak valid, field kosong, atau ID sudah digunakan
     - 404: CPL tidak ditemukan
     """
-    cpl = session.exec(
+    cpl = (await session.exec(
         select(CPL).where(
             CPL.id_kurikulum == id_kurikulum,
             CPL.id_cpl == id_cpl
         )
-    ).first()
+    )).first()
 
     if not cpl:
         raise HTTPException(
@@ -77,13 +80,13 @@ async def create_indikator(
             "Format id_indikator tidak valid. Gunakan pola 'IND-XX-YY', XX sesuai no CPL."
         )
     
-    existing_indikator = session.exec(
+    existing_indikator = (await session.exec(
         select(IndikatorCPL).where(
             IndikatorCPL.id_kurikulum == id_kurikulum,
             IndikatorCPL.id_cpl == id_cpl,
             IndikatorCPL.id_indikator == data.id_indikator
         )
-    ).first()
+    )).first()
 
     if existing_indikator:
         raise HTTPException(
@@ -102,8 +105,10 @@ async def create_indikator(
     )
 
     session.add(new_indikator)
-    session.commit()
-    session.refresh(new_indikator)
+    await bump_kurikulum_version(session, id_kurikulum)
+    await session.commit()
+    await session.refresh(new_indikator)
+    read_model.invalidate(id_kurikulum)
 
     return {
         "message": "Indikator CPL berhasil dibuat.",
@@ -128,7 +133,7 @@ async def deleteIndikator(
     id_kurikulum: uuid.UUID,
     id_cpl: str,
     id_indikator: str,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_session)
 ):
     """
     Menghapus indikator CPL dari database.
@@ -154,7 +159,7 @@ async def deleteIndikator(
         IndikatorCPL.id_cpl == id_cpl,
         IndikatorCPL.id_indikator == id_indikator
     )
-    indikator = session.exec(statement).first()
+    indikator = (await session.exec(statement)).first()
     
     if not indikator:
         raise HTTPException(
@@ -167,8 +172,10 @@ async def deleteIndikator(
         IndikatorCPL.id_cpl == id_cpl,
         IndikatorCPL.id_indikator == id_indikator
     )
-    session.exec(hapus)
-    session.commit()
+    await session.exec(hapus)
+    await bump_kurikulum_version(session, id_kurikulum)
+    await session.commit()
+    read_model.invalidate(id_kurikulum)
 
 
 @router.patch(
@@ -184,7 +191,7 @@ async def update_indikator(
     id_cpl: str,
     id_indikator: str,
     data: IndikatorCPLUpdate,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_session)
 ):
     """
     Mengupdate data indikator CPL yang sudah ada.
@@ -222,7 +229,7 @@ async def update_indikator(
         IndikatorCPL.id_cpl == id_cpl,
         IndikatorCPL.id_indikator == id_indikator
     )
-    item = session.exec(statement).first()
+    item = (await session.exec(statement)).first()
     
     if not item:
         raise HTTPException(status_code=404, detail="Indikator tidak ditemukan")
@@ -237,7 +244,7 @@ async def update_indikator(
             CPL.id_kurikulum == id_kurikulum,
             CPL.id_cpl == new_id_cpl
         )
-        cpl_item = session.exec(statement_cpl).first()
+        cpl_item = (await session.exec(statement_cpl)).first()
         
         if not cpl_item:
             raise HTTPException(
@@ -251,7 +258,7 @@ async def update_indikator(
                 IndikatorCPL.id_cpl == new_id_cpl,
                 IndikatorCPL.id_indikator == id_indikator
             )
-            existing = session.exec(check_statement).first()
+            existing = (await session.exec(check_statement)).first()
             
             if existing:
                 raise HTTPException(
@@ -259,8 +266,8 @@ async def update_indikator(
                     detail=f"Indikator dengan id_cpl '{new_id_cpl}' dan id_indikator '{id_indikator}' sudah ada"
                 )
               
-            session.delete(item)
-            session.flush()
+            await session.delete(item)
+            await session.flush()
             
             new_item = IndikatorCPL(
                 id_kurikulum=id_kurikulum,
@@ -269,8 +276,10 @@ async def update_indikator(
                 deskripsi=updates.get("deskripsi", item.deskripsi)
             )
             session.add(new_item)
-            session.commit()
-            session.refresh(new_item)
+            await bump_kurikulum_version(session, id_kurikulum)
+            await session.commit()
+            await session.refresh(new_item)
+            read_model.invalidate(id_kurikulum)
             
             return {
                 "message": "Berhasil memperbarui indikator (dengan id_cpl baru)",
@@ -287,8 +296,10 @@ async def update_indikator(
             setattr(item, key, value)
 
     session.add(item)
-    session.commit()
-    session.refresh(item)
+    await bump_kurikulum_version(session, id_kurikulum)
+    await session.commit()
+    await session.refresh(item)
+    read_model.invalidate(id_kurikulum)
 
     return {
         "message": "Berhasil memperbarui indikator",
@@ -0,0 +1,143 @@
+import os
+from fastapi import APIRouter, Depends, status
+from app.db import pool_status
+from app.config import settings
+from app.utils.auth import require_kadep, principal_cache
+from app.utils.revocation import revocation_store
+from app.utils.password_pool import password_pool
+from app.utils.cocktail_service import cocktail_cache, disk_cache, shared_cache, upstream_status
+from app.utils.cocktail_catalog import cocktail_catalog
+from app.utils.read_model import read_model
+from app.utils.invalidation import invalidation_listener
+from app.utils.shared_cache import cache_backend_stats
+
+router = APIRouter(
+    prefix="/internal",
+    tags=["internal"],
+    dependencies=[Depends(require_kadep)]
+)
+
+@router.get(
+    "/pool",
+    status_code=status.HTTP_200_OK,
+    summary="Statistik Connection Pool",
+    description="Menampilkan status connection pool database pada worker yang melayani request",
+    response_description="Jumlah koneksi checked-out, idle, overflow dan waktu tunggu checkout"
+)
+async def get_pool_status():
+    """
+    Mengambil statistik connection pool database secara live.
+    
+    **Return:**
+    - **worker_pid**: PID worker yang melayani request ini
+    - **config**: Konfigurasi pool dari Settings
+    - **engines**: Status pool per engine (sync dan async)
+      - size, checked_out, idle, overflow
+      - wait: jumlah checkout, timeout, rata-rata dan maksimum waktu tunggu (ms)
+    
+    **Catatan:**
+    - Setiap worker uvicorn memiliki pool sendiri, total koneksi maksimum
+      adalah jumlah worker x (pool_size + max_overflow)
+    """
+    return {
+        "worker_pid": os.getpid(),
+        "config": {
+            "pool_size": settings.DB_POOL_SIZE,
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "pool_timeout": settings.DB_POOL_TIMEOUT,
+            "pool_recycle": settings.DB_POOL_RECYCLE,
+            "pool_pre_ping": settings.DB_POOL_PRE_PING
+        },
+        "engines": pool_status()
+    }
+
+
+@router.get(
+    "/cache",
+    status_code=status.HTTP_200_OK,
+    summary="Statistik Cache",
+    description="Menampilkan statistik cache in-process pada worker yang melayani request",
+    response_description="Jumlah entry, hit, miss dan eviction per cache"
+)
+async def get_cache_status():
+    """
+    Mengambil statistik cache in-process secara live.
+    
+    **Return:**
+    - **worker_pid**: PID worker yang melayani request ini
+    - **backend**: Backend cache bersama (memory / redis) dan codec JSON
+    - **auth_principal**: Namespace cache hasil autentikasi token (get_current_user)
+      - ttl_s, hits, misses, hit_rate, writes, errors
+    - **token_revocation**: Salinan in-memory token_blacklist
+      - loaded, entries, memory_lookups, db_lookups, swept
+    - **curriculum_read_model**: Graf kurikulum in-process (detail kurikulum / CPL)
+      - entries, approx_bytes, hits, misses, coalesced, hit_rate, loads, invalidations
+    - **invalidation_listener**: Status LISTEN/NOTIFY antar worker
+      - connected, connects, disconnects, messages, evicted_ids, last_error
+    - **cocktail_response**: Cache response upstream cocktail
+      - hits, stale_hits, misses, coalesced, loads, load_errors, inflight
+    - **cocktail_shared**: Namespace cocktail di backend bersama (hanya dipakai jika shared)
+    - **cocktail_disk**: Cache persisten (SQLite) bersama antar worker
+      - enabled, rows, hits, expired_hits, misses, writes, pruned, errors
+    - **cocktail_catalog**: Katalog cocktail lokal untuk pencarian nama
+      - loaded, drinks, letters_failed, last_refresh_at, local_hits, fallbacks
+    """
+    return {
+        "worker_pid": os.getpid(),
+        "backend": cache_backend_stats(),
+        "auth_principal": principal_cache.stats(),
+        "token_revocation": revocation_store.stats(),
+        "curriculum_read_model": read_model.stats(),
+        "invalidation_listener": invalidation_listener.stats(),
+        "cocktail_response": cocktail_cache.stats(),
+        "cocktail_shared": shared_cache.stats(),
+        "cocktail_disk": await disk_cache.stats(),
+        "cocktail_catalog": cocktail_catalog.stats()
+    }
+
+
+@router.get(
+    "/password-pool",
+    status_code=status.HTTP_200_OK,
+    summary="Statistik Pool Hash Password",
+    description="Menampilkan status executor bcrypt khusus pada worker yang melayani request",
+    response_description="Jumlah job pending, ditolak, selesai dan latensi hash"
+)
+async def get_password_pool_status():
+    """
+    Mengambil statistik executor bcrypt (login dan register).
+    
+    **Return:**
+    - **workers / max_queue**: Kapasitas executor
+    - **pending / peak_pending**: Job yang sedang berjalan atau menunggu
+    - **submitted / completed / rejected**: Counter job
+    - **avg_ms / max_ms**: Latensi hash termasuk waktu antri
+    - **bcrypt_rounds**: Cost bcrypt yang berlaku
+    """
+    return {
+        "worker_pid": os.getpid(),
+        **password_pool.stats()
+    }
+
+
+@router.get(
+    "/upstream",
+    status_code=status.HTTP_200_OK,
+    summary="Statistik Upstream Cocktail",
+    description="Menampilkan status circuit breaker dan retry panggilan upstream cocktail pada worker yang melayani request",
+    response_description="State breaker, jumlah trip, retry dan deadline yang terlampaui"
+)
+async def get_upstream_status():
+    """
+    Mengambil statistik ketahanan panggilan upstream cocktail.
+    
+    **Return:**
+    - **calls / attempts / retries**: Panggilan logis, percobaan HTTP dan retry
+    - **deadline_exceeded**: Panggilan yang melewati COCKTAIL_DEADLINE_SECONDS
+    - **served_cached_on_error**: Response yang dilayani dari cache karena upstream gagal
+    - **breaker**: state (closed / open / half_open), trips, rejected, successes, failures
+    """
+    return {
+        "worker_pid": os.getpid(),
+        **upstream_status()
+    }
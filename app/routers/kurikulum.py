@@ -1,14 +1,33 @@
-from fastapi import APIRouter, HTTPException, Depends, status
-from sqlmodel import Session, select
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlmodel import select, func
+from sqlmodel.ext.asyncio.session import AsyncSession
 from datetime import datetime
-from sqlalchemy.orm import selectinload
+from typing import Optional
+import json
+from sqlalchemy import tuple_
 import uuid
 from app.utils.current_datetime import timestamp_now
 from app.utils.auth import require_kadep, require_kadep_or_dosen
-from app.db import get_session
-from app.models.kurikulum import Kurikulum
+from app.db import get_session, async_session
+from app.models.kurikulum import Kurikulum, StatusEnum
 from app.models.cpl import CPL
+from app.models.indikator import IndikatorCPL
+from app.models.matkul import MataKuliah
+from app.models.cpl_matkul import CPLMataKuliah
 from app.schemas.kurikulum import KurikulumCreate, KurikulumUpdate, CPLRead
+from app.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, decode_cursor, split_page
+from app.utils.read_model import read_model
+from app.utils.versioning import (
+    bump_kurikulum_version,
+    load_kurikulum_version,
+    make_etag,
+    etag_matches,
+    not_modified,
+    set_etag
+)
+
+EXPORT_BATCH_SIZE = 500
 
 router = APIRouter(
     prefix="/kurikulum", 
@@ -25,7 +44,7 @@ router = APIRouter(
     response_description="Data kurikulum yang berhasil ditambahkan",
     dependencies=[Depends(require_kadep)]
 )
-async def create_kurikulum(data: KurikulumCreate, session: Session = Depends(get_session)):
+async def create_kurikulum(data: KurikulumCreate, session: AsyncSession = Depends(get_session)):
     """
     Menambahkan kurikulum baru ke database.
     
@@ -52,9 +71,9 @@ async def create_kurikulum(data: KurikulumCreate, session: Session = Depends(get
             detail="status_kurikulum harus 'aktif' atau 'nonaktif'"
         )
 
-    exist = session.exec(
+    exist = (await session.exec(
         select(Kurikulum).where(Kurikulum.nama_kurikulum == data.nama_kurikulum)
-    ).first()
+    )).first()
 
     if exist:
         raise HTTPException(status_code=400, detail="Nama kurikulum sudah ada.")
@@ -66,8 +85,8 @@ async def create_kurikulum(data: KurikulumCreate, session: Session = Depends(get
     )
 
     session.add(new_item)
-    session.commit()
-    session.refresh(new_item)
+    await session.commit()
+    await session.refresh(new_item)
 
     return {
         "message": "Berhasil menambahkan kurikulum",
@@ -84,17 +103,33 @@ async def create_kurikulum(data: KurikulumCreate, session: Session = Depends(get
     "/", 
     status_code=status.HTTP_200_OK,
     summary="Daftar Semua Kurikulum",
-    description="Mengambil daftar lengkap semua kurikulum yang ada di sistem",
-    response_description="Total dan daftar kurikulum",
+    description="Mengambil daftar kurikulum per halaman dengan filter status dan cursor",
+    response_description="Daftar kurikulum pada halaman ini dan cursor halaman berikutnya",
     dependencies=[Depends(require_kadep_or_dosen)]
 )
-async def get_all(session: Session = Depends(get_session)):
+async def get_all(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    status_kurikulum: Optional[StatusEnum] = None,
+    with_total: bool = False,
+    session: AsyncSession = Depends(get_session)
+):
     """
-    Mengambil semua data kurikulum.
+    Mengambil data kurikulum per halaman (keyset pagination).
+    
+    **Parameter Query:**
+    - **limit**: Jumlah data per halaman (default 50, maksimum 200)
+    - **cursor**: Nilai next_cursor dari halaman sebelumnya
+    - **status_kurikulum** (opsional): Filter 'aktif' atau 'nonaktif'
+    - **with_total**: Sertakan jumlah total data (menambah satu query COUNT)
+    
+    **Urutan:**
+    - created_at, lalu id_kurikulum (stabil antar halaman)
     
     **Return:**
-    - **total**: Jumlah total kurikulum
-    - **data**: Array berisi semua data kurikulum
+    - **total**: Jumlah total kurikulum sesuai filter (null jika with_total=false)
+    - **data**: Array berisi data kurikulum pada halaman ini
+    - **next_cursor**: Cursor halaman berikutnya (null jika sudah halaman terakhir)
     
     Setiap kurikulum berisi:
     - id_kurikulum
@@ -103,10 +138,39 @@ async def get_all(session: Session = Depends(get_session)):
     - status_kurikulum
     - created_at
     - updated_at
+    
+    **Error:**
+    - 400: cursor tidak valid
     """
-    data = session.exec(select(Kurikulum)).all()
+    filters = []
+    if status_kurikulum is not None:
+        filters.append(Kurikulum.status_kurikulum == status_kurikulum)
+
+    statement = select(Kurikulum).where(*filters)
+
+    if cursor:
+        created_at, id_kurikulum = decode_cursor(cursor, [datetime.fromisoformat, uuid.UUID])
+        statement = statement.where(
+            tuple_(Kurikulum.created_at, Kurikulum.id_kurikulum) > (created_at, id_kurikulum)
+        )
+
+    rows = (await session.exec(
+        statement
+        .order_by(Kurikulum.created_at, Kurikulum.id_kurikulum)
+        .limit(limit + 1)
+    )).all()
+
+    data, next_cursor = split_page(
+        rows, limit, lambda k: (k.created_at.isoformat(), k.id_kurikulum)
+    )
+
+    total = None
+    if with_total:
+        total = (await session.exec(
+            select(func.count()).select_from(Kurikulum).where(*filters)
+        )).one()
 
-    return {"total": len(data), "data": data}
+    return {"total": total, "data": data, "next_cursor": next_cursor}
 
 
 @router.patch(
@@ -118,9 +182,9 @@ async def get_all(session: Session = Depends(get_session)):
     dependencies=[Depends(require_kadep)]
 )
 async def update_kurikulum(
-    id_kurikulum: str, 
+    id_kurikulum: uuid.UUID, 
     data: KurikulumUpdate,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_session)
 ):
     """
     Mengupdate data kurikulum yang sudah ada.
@@ -142,7 +206,7 @@ async def update_kurikulum(
     **Error:**
     - 404: Kurikulum tidak ditemukan
     """
-    item = session.get(Kurikulum, id_kurikulum)
+    item = await session.get(Kurikulum, id_kurikulum)
 
     if not item:
         raise HTTPException(status_code=404, detail="Kurikulum tidak ditemukan.")
@@ -154,8 +218,10 @@ async def update_kurikulum(
 
     item.updated_at = timestamp_now()
     session.add(item)
-    session.commit()
-    session.refresh(item)
+    await bump_kurikulum_version(session, id_kurikulum)
+    await session.commit()
+    await session.refresh(item)
+    read_model.invalidate(id_kurikulum)
 
     return {"message": "Berhasil memperbarui kurikulum", "kurikulum": item}
 
@@ -168,7 +234,12 @@ async def update_kurikulum(
     response_description="Data lengkap kurikulum dengan CPL",
     dependencies=[Depends(require_kadep_or_dosen)]
 )
-async def detail_kurikulum(id_kurikulum: str, session: Session = Depends(get_session)):
+async def detail_kurikulum(
+    id_kurikulum: str,
+    request: Request,
+    response: Response,
+    session: AsyncSession = Depends(get_session)
+):
     """
     Mengambil informasi detail kurikulum beserta CPL terkait.
     
@@ -188,37 +259,143 @@ async def detail_kurikulum(id_kurikulum: str, session: Session = Depends(get_ses
       - deskripsi
     
     **Error:**
+    - 304: Tidak berubah sejak ETag di If-None-Match
     - 400: Format ID kurikulum tidak valid (bukan UUID)
     - 404: Kurikulum tidak ditemukan
+    
+    **Catatan:**
+    - Dilayani dari read model in-process (app.utils.read_model)
+    - Response membawa ETag dari version kurikulum; kirim kembali lewat
+      If-None-Match untuk mendapat 304 tanpa body
     """
     try:
         uuid_obj = uuid.UUID(id_kurikulum)
     except ValueError:
         raise HTTPException(status_code=400, detail="ID Kurikulum tidak valid")
     
-    item = session.exec(
-        select(Kurikulum)
-        .where(Kurikulum.id_kurikulum == id_kurikulum)
-        .options(selectinload(Kurikulum.cpl_list))
-    ).first()
+    version = read_model.cached_version(uuid_obj)
+    if version is None:
+        version = await load_kurikulum_version(session, uuid_obj)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Kurikulum tidak ditemukan")
 
-    if not item:
+    etag = make_etag("kurikulum", uuid_obj, version)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    graph = await read_model.get(uuid_obj)
+
+    if not graph:
         raise HTTPException(status_code=404, detail="Kurikulum tidak ditemukan")
 
-    
+    set_etag(response, make_etag("kurikulum", uuid_obj, graph.kurikulum["version"]))
+
+    item = graph.kurikulum
     cpl_list = [
-        CPLRead(id_cpl=c.id_cpl, deskripsi=c.deskripsi)
-        for c in item.cpl_list
+        CPLRead(id_cpl=c["id_cpl"], deskripsi=c["deskripsi"])
+        for c in graph.cpl
     ]
 
     return {
         "kurikulum": {
-            "id_kurikulum": item.id_kurikulum,
-            "nama_kurikulum": item.nama_kurikulum,
-            "revisi": item.revisi,
-            "status_kurikulum": item.status_kurikulum,
-            "created_at": item.created_at,
-            "updated_at": item.updated_at,
+            "id_kurikulum": item["id_kurikulum"],
+            "nama_kurikulum": item["nama_kurikulum"],
+            "revisi": item["revisi"],
+            "status_kurikulum": item["status_kurikulum"],
+            "created_at": item["created_at"],
+            "updated_at": item["updated_at"],
             "cpl": cpl_list
         }
-    }
\ No newline at end of file
+    }
+
+def _export_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _export_line(row_type: str, row) -> str:
+    return json.dumps(
+        {"type": row_type, "data": row.model_dump()},
+        default=_export_default,
+        ensure_ascii=False
+    ) + "\n"
+
+
+async def _stream_kurikulum_export(kurikulum: Kurikulum):
+    """Generator NDJSON: satu baris per record, dibaca per batch dari server-side cursor"""
+    id_kurikulum = kurikulum.id_kurikulum
+    matkul_ids = (
+        select(CPLMataKuliah.id_matkul)
+        .where(CPLMataKuliah.id_kurikulum == id_kurikulum)
+        .distinct()
+    )
+    sections = [
+        ("cpl", select(CPL)
+            .where(CPL.id_kurikulum == id_kurikulum)
+            .order_by(CPL.id_cpl)),
+        ("indikator", select(IndikatorCPL)
+            .where(IndikatorCPL.id_kurikulum == id_kurikulum)
+            .order_by(IndikatorCPL.id_cpl, IndikatorCPL.id_indikator)),
+        ("mata_kuliah", select(MataKuliah)
+            .where(MataKuliah.id_matkul.in_(matkul_ids))
+            .order_by(MataKuliah.id_matkul)),
+        ("cpl_matkul", select(CPLMataKuliah)
+            .where(CPLMataKuliah.id_kurikulum == id_kurikulum)
+            .order_by(CPLMataKuliah.id_cpl, CPLMataKuliah.id_matkul)),
+    ]
+
+    yield _export_line("kurikulum", kurikulum)
+
+    # Session sendiri: dependency get_session sudah ditutup saat body di-stream
+    async with async_session() as session:
+        for row_type, statement in sections:
+            result = await session.stream_scalars(
+                statement.execution_options(yield_per=EXPORT_BATCH_SIZE)
+            )
+            async for rows in result.partitions():
+                yield "".join(_export_line(row_type, row) for row in rows)
+
+
+@router.get(
+    "/{id_kurikulum}/export",
+    status_code=200,
+    summary="Export Kurikulum (NDJSON)",
+    description="Mengekspor seluruh graf kurikulum (CPL, indikator, mata kuliah, relasi) sebagai stream NDJSON",
+    response_description="Stream NDJSON, satu record per baris",
+    dependencies=[Depends(require_kadep_or_dosen)]
+)
+async def export_kurikulum(id_kurikulum: uuid.UUID, session: AsyncSession = Depends(get_session)):
+    """
+    Mengekspor satu kurikulum lengkap untuk kebutuhan reporting.
+    
+    **Parameter:**
+    - **id_kurikulum**: ID kurikulum (format UUID)
+    
+    **Format Response (application/x-ndjson):**
+    - Setiap baris adalah objek JSON `{"type": ..., "data": {...}}`
+    - Urutan type: kurikulum, cpl, indikator, mata_kuliah, cpl_matkul
+    - mata_kuliah hanya yang terhubung ke CPL kurikulum ini
+    
+    **Catatan:**
+    - Data dibaca per batch dari server-side cursor (yield_per), sehingga
+      memori tetap kecil berapapun ukuran kurikulum
+    - Response tidak memiliki Content-Length, baca sampai stream selesai
+    
+    **Error:**
+    - 404: Kurikulum tidak ditemukan
+    """
+    kurikulum = await session.get(Kurikulum, id_kurikulum)
+
+    if not kurikulum:
+        raise HTTPException(status_code=404, detail="Kurikulum tidak ditemukan")
+
+    return StreamingResponse(
+        _stream_kurikulum_export(kurikulum),
+        media_type="application/x-ndjson",
+        headers={
+            "Content-Disposition": f'attachment; filename="kurikulum-{id_kurikulum}.ndjson"'
+        }
+    )
@@ -1,13 +1,36 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select, delete
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlmodel import select, delete, func
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import exists, insert, tuple_
+from sqlalchemy.exc import IntegrityError
+from pydantic import ValidationError
+from typing import Any, Dict, List, Optional, Tuple
+import csv
+import io
+import uuid
+from app.config import settings
 from app.db import get_session
 from app.schemas.matkul import createMatkul, updateMatkul
 from app.models.matkul import MataKuliah
 from app.models.cpl_matkul import CPLMataKuliah
-from app.models.cpl import CPL
-from app.models.indikator import IndikatorCPL
 from app.utils.current_datetime import timestamp_now
 from app.utils.auth import require_kadep, require_kadep_or_dosen
+from app.utils.loaders import (
+    load_cpl_by_matkul,
+    load_kurikulum_ids_by_matkul,
+    load_existing_cpl_keys,
+    load_existing_matkul_ids
+)
+from app.utils.read_model import read_model
+from app.utils.versioning import (
+    bump_kurikulum_version,
+    load_catalog_version,
+    make_etag,
+    etag_matches,
+    not_modified,
+    set_etag
+)
+from app.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, decode_cursor, split_page
 
 router = APIRouter(
     prefix="/matkul", 
@@ -23,7 +46,7 @@ router = APIRouter(
     response_description="Data mata kuliah dan relasi CPL yang berhasil ditambahkan",
     dependencies=[Depends(require_kadep_or_dosen)]
 )  
-async def inputMatkul(data: createMatkul, session: Session = Depends(get_session)):
+async def inputMatkul(data: createMatkul, session: AsyncSession = Depends(get_session)):
     """
     Menambahkan mata kuliah baru ke database.
     
@@ -36,15 +59,16 @@ async def inputMatkul(data: createMatkul, session: Session = Depends(get_session
     
     **Validasi:**
     - ID mata kuliah harus unik
-    - Semua CPL dalam cpl_list harus sudah ada di database
+    - Semua CPL dalam cpl_list harus sudah ada di database (dicek dalam satu query,
+      semua CPL yang tidak ditemukan dilaporkan sekaligus)
     
     **Return:**
     - Data mata kuliah yang baru dibuat
     - Daftar relasi CPL-Matkul yang terbentuk
     """
-    existing_matkul = session.exec(
-        select(MataKuliah).where(MataKuliah.id_matkul == data.id_matkul)
-    ).first()
+    existing_matkul = (await session.exec(
+        select(MataKuliah.id_matkul).where(MataKuliah.id_matkul == data.id_matkul)
+    )).first()
 
     if existing_matkul:
         raise HTTPException(
@@ -52,19 +76,19 @@ async def inputMatkul(data: createMatkul, session: Session = Depends(get_session
             detail="Mata kuliah dengan ID tersebut sudah ada."
         )
 
-    for cpl_input in data.cpl_list:
-        cpl_exists = session.exec(
-            select(CPL).where(
-                CPL.id_kurikulum == cpl_input.id_kurikulum,
-                CPL.id_cpl == cpl_input.id_cpl
-            )
-        ).first()
+    cpl_keys = list(dict.fromkeys(
+        (cpl_input.id_kurikulum, cpl_input.id_cpl) for cpl_input in data.cpl_list
+    ))
+    found_cpl = await load_existing_cpl_keys(session, cpl_keys)
+    missing_cpl = [key for key in cpl_keys if key not in found_cpl]
 
-        if not cpl_exists:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"CPL dengan ID {cpl_input.id_cpl} di kurikulum {cpl_input.id_kurikulum} tidak ditemukan."
+    if missing_cpl:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="CPL tidak ditemukan: " + ", ".join(
+                f"{id_cpl} di kurikulum {id_kurikulum}" for id_kurikulum, id_cpl in missing_cpl
             )
+        )
 
     newMatkul = MataKuliah(
         id_matkul=data.id_matkul,
@@ -72,33 +96,24 @@ async def inputMatkul(data: createMatkul, session: Session = Depends(get_session
         sks=data.sks,
         semester=data.semester
     )
+    newRelations = [
+        CPLMataKuliah(id_kurikulum=id_kurikulum, id_cpl=id_cpl, id_matkul=newMatkul.id_matkul)
+        for id_kurikulum, id_cpl in cpl_keys
+    ]
     session.add(newMatkul)
-    session.commit()
-    session.refresh(newMatkul)
-
-    newRelations = []
-    for cpl_input in data.cpl_list:
-        existing_relation = session.exec(
-            select(CPLMataKuliah).where(
-                CPLMataKuliah.id_kurikulum == cpl_input.id_kurikulum,
-                CPLMataKuliah.id_cpl == cpl_input.id_cpl,
-                CPLMataKuliah.id_matkul == data.id_matkul
-            )
-        ).first()
+    session.add_all(newRelations)
 
-        if not existing_relation:
-            newCplMatkul = CPLMataKuliah(
-                id_kurikulum=cpl_input.id_kurikulum,
-                id_cpl=cpl_input.id_cpl,
-                id_matkul=newMatkul.id_matkul
-            )
-            session.add(newCplMatkul)
-            newRelations.append(newCplMatkul)
-    
-    session.commit()
-    
-    for relation in newRelations:
-        session.refresh(relation)
+    affected_kurikulum = {id_kurikulum for id_kurikulum, _ in cpl_keys}
+    try:
+        await bump_kurikulum_version(session, *affected_kurikulum, matkul_catalog=True)
+        await session.commit()
+    except IntegrityError:
+        await session.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Mata kuliah atau CPL terkait berubah bersamaan oleh request lain. Silakan ulangi."
+        )
+    read_model.invalidate(*affected_kurikulum)
 
     return {
         "message": "Berhasil menambahkan mata kuliah",
@@ -121,6 +136,268 @@ async def inputMatkul(data: createMatkul, session: Session = Depends(get_session
     }
 
 
+BULK_CSV_COLUMNS = {"id_matkul", "mata_kuliah", "sks", "semester"}
+
+
+def _rows_from_csv(content: bytes) -> List[Tuple[int, Dict[str, Any], List[int]]]:
+    """
+    Satu baris CSV = satu relasi CPL. Baris dengan id_matkul sama digabung;
+    nama, SKS, dan semester diambil dari baris pertama. Nomor baris tiap
+    relasi CPL disimpan sejajar dengan cpl_list untuk laporan error.
+    """
+    try:
+        text = content.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="File CSV harus berenkoding UTF-8."
+        )
+
+    reader = csv.DictReader(io.StringIO(text))
+    missing_columns = BULK_CSV_COLUMNS - set(reader.fieldnames or [])
+    if missing_columns:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Kolom CSV tidak lengkap: {', '.join(sorted(missing_columns))}"
+        )
+
+    merged: Dict[str, Tuple[int, Dict[str, Any], List[int]]] = {}
+    for line_number, record in enumerate(reader, start=2):
+        id_matkul = (record.get("id_matkul") or "").strip().upper()
+        entry = merged.get(id_matkul)
+        if entry is None:
+            entry = merged[id_matkul] = (line_number, {
+                "id_matkul": id_matkul,
+                "mata_kuliah": (record.get("mata_kuliah") or "").strip(),
+                "sks": record.get("sks"),
+                "semester": record.get("semester"),
+                "cpl_list": []
+            }, [])
+
+        id_kurikulum = (record.get("id_kurikulum") or "").strip()
+        id_cpl = (record.get("id_cpl") or "").strip()
+        if id_kurikulum or id_cpl:
+            entry[1]["cpl_list"].append({"id_kurikulum": id_kurikulum, "id_cpl": id_cpl})
+            entry[2].append(line_number)
+
+    return list(merged.values())
+
+
+async def _read_bulk_rows(request: Request) -> List[Tuple[int, Any, Optional[List[int]]]]:
+    """
+    Baris import beserta nomornya (indeks array JSON atau nomor baris CSV)
+    dan, untuk CSV, nomor baris tiap entry cpl_list
+    """
+    content_type = request.headers.get("content-type", "")
+
+    if content_type.startswith("multipart/form-data"):
+        form = await request.form()
+        upload = form.get("file")
+        if upload is None or isinstance(upload, str):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="File CSV harus dikirim pada field 'file'."
+            )
+        return _rows_from_csv(await upload.read())
+
+    if content_type.startswith("text/csv"):
+        return _rows_from_csv(await request.body())
+
+    try:
+        payload = await request.json()
+    except ValueError:
+        payload = None
+
+    if not isinstance(payload, list):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Body harus berupa JSON array atau file CSV."
+        )
+    return [(row, raw, None) for row, raw in enumerate(payload, start=1)]
+
+
+def _row_error(row: int, id_matkul: Any, errors: List[str]) -> Dict[str, Any]:
+    return {"row": row, "id_matkul": id_matkul, "errors": errors}
+
+
+def _cpl_line(cpl_lines: Optional[List[int]], index: Any) -> str:
+    """Keterangan baris CSV untuk entry cpl_list ke-index (kosong untuk JSON)"""
+    if cpl_lines is None or not isinstance(index, int) or not 0 <= index < len(cpl_lines):
+        return ""
+    return f" (baris {cpl_lines[index]})"
+
+
+def _validation_message(err: Dict[str, Any], cpl_lines: Optional[List[int]]) -> str:
+    loc = err["loc"]
+    message = f"{'.'.join(str(part) for part in loc) or 'row'}: {err['msg']}"
+    if len(loc) > 1 and loc[0] == "cpl_list":
+        message += _cpl_line(cpl_lines, loc[1])
+    return message
+
+
+@router.post(
+    "/bulk",
+    summary="Import Mata Kuliah Massal",
+    description="Menambahkan banyak mata kuliah beserta relasi CPL dari JSON array atau file CSV dalam satu transaksi",
+    response_description="Jumlah data yang berhasil diimpor dan laporan error per baris",
+    dependencies=[Depends(require_kadep_or_dosen)],
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {
+                    "schema": {"type": "array", "items": {"$ref": "#/components/schemas/createMatkul"}}
+                },
+                "multipart/form-data": {
+                    "schema": {
+                        "type": "object",
+                        "properties": {"file": {"type": "string", "format": "binary"}},
+                        "required": ["file"]
+                    }
+                },
+                "text/csv": {"schema": {"type": "string"}}
+            }
+        }
+    }
+)
+async def bulkInputMatkul(
+    request: Request,
+    atomic: bool = Query(False, description="Batalkan seluruh import jika ada satu baris yang gagal"),
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Import mata kuliah secara massal.
+
+    **Format:**
+    - **JSON**: array dengan bentuk item sama seperti `POST /matkul/`
+    - **CSV** (multipart field `file` atau body `text/csv`): kolom `id_matkul`, `mata_kuliah`,
+      `sks`, `semester`, `id_kurikulum`, `id_cpl`; satu baris per relasi CPL
+
+    **Validasi:**
+    - Setiap baris divalidasi seperti `POST /matkul/`
+    - id_matkul tidak boleh duplikat di dalam file maupun sudah ada di database
+    - Semua pasangan (id_kurikulum, id_cpl) dicek sekaligus dalam satu query
+
+    **Return:**
+    - Jumlah mata kuliah dan relasi yang dimasukkan
+    - Daftar error per baris; baris yang valid tetap dimasukkan kecuali `atomic=true`
+    - Untuk CSV, error pada relasi CPL menyebut nomor baris relasi tersebut
+    """
+    raw_rows = await _read_bulk_rows(request)
+
+    if not raw_rows:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Tidak ada data untuk diimpor."
+        )
+    if len(raw_rows) > settings.MATKUL_BULK_MAX_ROWS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Maksimal {settings.MATKUL_BULK_MAX_ROWS} mata kuliah per import."
+        )
+
+    errors: List[Dict[str, Any]] = []
+    candidates: List[Tuple[int, createMatkul, Optional[List[int]]]] = []
+    seen_ids = set()
+
+    for row, raw, cpl_lines in raw_rows:
+        try:
+            item = createMatkul.model_validate(raw)
+        except ValidationError as e:
+            raw_id = raw.get("id_matkul") if isinstance(raw, dict) else None
+            errors.append(_row_error(row, raw_id, [
+                _validation_message(err, cpl_lines) for err in e.errors()
+            ]))
+            continue
+
+        if item.id_matkul in seen_ids:
+            errors.append(_row_error(row, item.id_matkul, ["id_matkul duplikat di dalam data import."]))
+            continue
+
+        seen_ids.add(item.id_matkul)
+        candidates.append((row, item, cpl_lines))
+
+    existing_ids = await load_existing_matkul_ids(session, (item.id_matkul for _, item, _ in candidates))
+    found_cpl = await load_existing_cpl_keys(session, (
+        (cpl_input.id_kurikulum, cpl_input.id_cpl)
+        for _, item, _ in candidates
+        for cpl_input in item.cpl_list
+    ))
+
+    valid: List[createMatkul] = []
+    for row, item, cpl_lines in candidates:
+        problems = []
+        if item.id_matkul in existing_ids:
+            problems.append("Mata kuliah dengan ID tersebut sudah ada.")
+
+        missing_cpl = [
+            f"{cpl_input.id_cpl} (kurikulum {cpl_input.id_kurikulum}){_cpl_line(cpl_lines, index)}"
+            for index, cpl_input in enumerate(item.cpl_list)
+            if (cpl_input.id_kurikulum, cpl_input.id_cpl) not in found_cpl
+        ]
+        if missing_cpl:
+            problems.append(f"CPL tidak ditemukan: {', '.join(dict.fromkeys(missing_cpl))}")
+
+        if problems:
+            errors.append(_row_error(row, item.id_matkul, problems))
+        else:
+            valid.append(item)
+
+    errors.sort(key=lambda error: error["row"])
+
+    if atomic and errors:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"message": "Import dibatalkan karena ada baris yang tidak valid.", "errors": errors}
+        )
+
+    now = timestamp_now()
+    matkul_rows = [
+        {
+            "id_matkul": item.id_matkul,
+            "mata_kuliah": item.mata_kuliah,
+            "sks": item.sks,
+            "semester": item.semester,
+            "created_at": now,
+            "updated_at": now
+        }
+        for item in valid
+    ]
+    relation_keys = dict.fromkeys(
+        (cpl_input.id_kurikulum, cpl_input.id_cpl, item.id_matkul)
+        for item in valid
+        for cpl_input in item.cpl_list
+    )
+    relation_rows = [
+        {"id_kurikulum": id_kurikulum, "id_cpl": id_cpl, "id_matkul": id_matkul}
+        for id_kurikulum, id_cpl, id_matkul in relation_keys
+    ]
+    affected_kurikulum = {row["id_kurikulum"] for row in relation_rows}
+
+    if matkul_rows:
+        try:
+            await session.exec(insert(MataKuliah), params=matkul_rows)
+            if relation_rows:
+                await session.exec(insert(CPLMataKuliah), params=relation_rows)
+            await bump_kurikulum_version(session, *affected_kurikulum, matkul_catalog=True)
+            await session.commit()
+        except IntegrityError:
+            await session.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Data berubah selama import (mata kuliah atau CPL bentrok). Silakan ulangi import."
+            )
+        read_model.invalidate(*affected_kurikulum)
+
+    return {
+        "message": f"Berhasil mengimpor {len(matkul_rows)} mata kuliah",
+        "inserted": len(matkul_rows),
+        "relations": len(relation_rows),
+        "failed": len(errors),
+        "errors": errors
+    }
+
+
 @router.delete(
     "/{id_matkul}", 
     status_code=status.HTTP_204_NO_CONTENT,
@@ -129,7 +406,7 @@ async def inputMatkul(data: createMatkul, session: Session = Depends(get_session
     response_description="Tidak ada konten (sukses)",
     dependencies=[Depends(require_kadep)]
 )
-async def deleteMatkul(id_matkul: str, session: Session = Depends(get_session)):
+async def deleteMatkul(id_matkul: str, session: AsyncSession = Depends(get_session)):
     """
     Menghapus mata kuliah dari database.
     
@@ -143,20 +420,24 @@ async def deleteMatkul(id_matkul: str, session: Session = Depends(get_session)):
     **Error:**
     - 404: Mata kuliah tidak ditemukan
     """
-    matkul = session.get(MataKuliah, id_matkul)
+    matkul = await session.get(MataKuliah, id_matkul)
     if not matkul:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, 
             detail="Mata kuliah tidak ditemukan"
         )
     
+    affected_kurikulum = await load_kurikulum_ids_by_matkul(session, id_matkul)
+
     delete_cpl_matkul = delete(CPLMataKuliah).where(CPLMataKuliah.id_matkul == id_matkul)
-    session.exec(delete_cpl_matkul)
+    await session.exec(delete_cpl_matkul)
     
     delete_matkul = delete(MataKuliah).where(MataKuliah.id_matkul == id_matkul)
-    session.exec(delete_matkul)
+    await session.exec(delete_matkul)
     
-    session.commit()
+    await bump_kurikulum_version(session, *affected_kurikulum, matkul_catalog=True)
+    await session.commit()
+    read_model.invalidate(*affected_kurikulum)
 
 
 @router.patch(
@@ -167,7 +448,7 @@ async def deleteMatkul(id_matkul: str, session: Session = Depends(get_session)):
     response_description="Data mata kuliah dan relasi CPL yang telah diupdate",
     dependencies=[Depends(require_kadep_or_dosen)]
 )
-async def updateMatkul(id_matkul: str, data: updateMatkul, session: Session = Depends(get_session)):
+async def updateMatkul(id_matkul: str, data: updateMatkul, session: AsyncSession = Depends(get_session)):
     """
     Mengupdate data mata kuliah yang sudah ada.
     
@@ -176,18 +457,20 @@ async def updateMatkul(id_matkul: str, data: updateMatkul, session: Session = De
     - **mata_kuliah** (opsional): Nama mata kuliah baru
     - **sks** (opsional): Jumlah SKS baru
     - **semester** (opsional): Semester baru
-    - **cpl_list** (opsional): Daftar CPL baru (akan mengganti semua relasi lama)
+    - **cpl_list** (opsional): Daftar CPL lengkap yang diinginkan (menggantikan relasi lama)
     
     **Catatan:**
     - Hanya field yang diisi yang akan diupdate
-    - Jika cpl_list diisi, semua relasi CPL lama akan dihapus dan diganti dengan yang baru
+    - Jika cpl_list diisi, hanya relasi yang berubah yang ditambah/dihapus;
+      relasi yang tetap ada tidak disentuh
     - Timestamp updated_at akan otomatis diupdate
     
     **Return:**
     - Data mata kuliah yang telah diupdate
     - Daftar relasi CPL terkini
+    - Relasi yang ditambahkan dan yang dihapus
     """
-    matkul = session.get(MataKuliah, id_matkul)
+    matkul = await session.get(MataKuliah, id_matkul)
     if not matkul:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, 
@@ -204,44 +487,69 @@ async def updateMatkul(id_matkul: str, data: updateMatkul, session: Session = De
         matkul.semester = data.semester
     
     matkul.updated_at = timestamp_now()
-    
+
+    current_keys = set((await session.exec(
+        select(CPLMataKuliah.id_kurikulum, CPLMataKuliah.id_cpl)
+        .where(CPLMataKuliah.id_matkul == id_matkul)
+    )).all())
+
+    # nama/sks/semester tampil di graf setiap kurikulum yang memakai matkul ini
+    affected_kurikulum = {id_kurikulum for id_kurikulum, _ in current_keys}
+    added_keys: List[Tuple[uuid.UUID, str]] = []
+    removed_keys: List[Tuple[uuid.UUID, str]] = []
+
     if data.cpl_list is not None:
-        
-        for cpl_input in data.cpl_list:
-            cpl_exists = session.exec(
-                select(CPL).where(
-                    CPL.id_kurikulum == cpl_input.id_kurikulum,
-                    CPL.id_cpl == cpl_input.id_cpl
+        submitted_keys = list(dict.fromkeys(
+            (cpl_input.id_kurikulum, cpl_input.id_cpl) for cpl_input in data.cpl_list
+        ))
+        added_keys = [key for key in submitted_keys if key not in current_keys]
+        removed_keys = sorted(current_keys.difference(submitted_keys), key=lambda key: (str(key[0]), key[1]))
+
+        # relasi yang sudah ada pasti menunjuk CPL yang ada; cukup cek yang baru
+        found_cpl = await load_existing_cpl_keys(session, added_keys)
+        missing_cpl = [key for key in added_keys if key not in found_cpl]
+
+        if missing_cpl:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="CPL tidak ditemukan: " + ", ".join(
+                    f"{id_cpl} di kurikulum {id_kurikulum}" for id_kurikulum, id_cpl in missing_cpl
                 )
-            ).first()
-            
-            if not cpl_exists:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail=f"CPL dengan ID {cpl_input.id_cpl} di kurikulum {cpl_input.id_kurikulum} tidak ditemukan."
+            )
+
+        affected_kurikulum.update(id_kurikulum for id_kurikulum, _ in added_keys)
+
+        if removed_keys:
+            await session.exec(
+                delete(CPLMataKuliah).where(
+                    CPLMataKuliah.id_matkul == id_matkul,
+                    tuple_(CPLMataKuliah.id_kurikulum, CPLMataKuliah.id_cpl).in_(removed_keys)
                 )
-         
-        delete_stmt = delete(CPLMataKuliah).where(
-            CPLMataKuliah.id_matkul == id_matkul
-        )
-        session.exec(delete_stmt)
-          
-        for cpl_input in data.cpl_list:
-            new_relation = CPLMataKuliah(
-                id_kurikulum=cpl_input.id_kurikulum,
-                id_cpl=cpl_input.id_cpl,
-                id_matkul=id_matkul
             )
-            session.add(new_relation)
-    
+
+        if added_keys:
+            await session.exec(insert(CPLMataKuliah), params=[
+                {"id_kurikulum": id_kurikulum, "id_cpl": id_cpl, "id_matkul": id_matkul}
+                for id_kurikulum, id_cpl in added_keys
+            ])
+
     session.add(matkul)
-    session.commit()
-    session.refresh(matkul)
-    
-    relations = session.exec(
-        select(CPLMataKuliah).where(CPLMataKuliah.id_matkul == id_matkul)
-    ).all()
-    
+    try:
+        await bump_kurikulum_version(session, *affected_kurikulum, matkul_catalog=True)
+        await session.commit()
+    except IntegrityError:
+        await session.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Relasi CPL mata kuliah berubah bersamaan oleh request lain. Silakan ulangi."
+        )
+    read_model.invalidate(*affected_kurikulum)
+
+    relation_keys = (current_keys - set(removed_keys)) | set(added_keys)
+
+    def relation(key: Tuple[uuid.UUID, str]) -> Dict[str, Any]:
+        return {"id_kurikulum": str(key[0]), "id_cpl": key[1], "id_matkul": id_matkul}
+
     return {
         "message": "Berhasil mengupdate mata kuliah",
         "matkul": {
@@ -253,13 +561,11 @@ async def updateMatkul(id_matkul: str, data: updateMatkul, session: Session = De
             "updated_at": matkul.updated_at
         },
         "relasi": [
-            {
-                "id_kurikulum": str(r.id_kurikulum),
-                "id_cpl": r.id_cpl,
-                "id_matkul": r.id_matkul
-            }
-            for r in relations
-        ]
+            relation(key)
+            for key in sorted(relation_keys, key=lambda key: (str(key[0]), key[1]))
+        ],
+        "relasi_ditambahkan": [relation(key) for key in added_keys],
+        "relasi_dihapus": [relation(key) for key in removed_keys]
     }
 
 
@@ -271,7 +577,7 @@ async def updateMatkul(id_matkul: str, data: updateMatkul, session: Session = De
     response_description="Data lengkap mata kuliah dengan CPL dan indikator",
     dependencies=[Depends(require_kadep_or_dosen)]
 )
-async def getDetailMatkul(id_matkul: str, session: Session = Depends(get_session)):
+async def getDetailMatkul(id_matkul: str, session: AsyncSession = Depends(get_session)):
     """
     Mengambil informasi detail mata kuliah.
     
@@ -286,48 +592,47 @@ async def getDetailMatkul(id_matkul: str, session: Session = Depends(get_session
       - Deskripsi CPL
       - Daftar indikator CPL (ID dan deskripsi)
     
+    **Sumber Data:**
+    - Mata kuliah dan relasinya: satu query (outer join cpl_matkul)
+    - CPL dan indikator: graf kurikulum di read model (tanpa query jika sudah dimuat)
+    
     **Error:**
     - 404: Mata kuliah tidak ditemukan
     """
-    matkul = session.get(MataKuliah, id_matkul)
-    if not matkul:
+    rows = (await session.exec(
+        select(MataKuliah, CPLMataKuliah.id_kurikulum, CPLMataKuliah.id_cpl)
+        .outerjoin(CPLMataKuliah, CPLMataKuliah.id_matkul == MataKuliah.id_matkul)
+        .where(MataKuliah.id_matkul == id_matkul)
+        .order_by(CPLMataKuliah.id_kurikulum, CPLMataKuliah.id_cpl)
+    )).all()
+    if not rows:
         raise HTTPException(
             status_code=404, 
             detail="Mata kuliah tidak ditemukan"
         )
 
-    cpl_rows = session.exec(
-        select(CPL, CPLMataKuliah.id_kurikulum)
-        .join(CPLMataKuliah, 
-              (CPL.id_kurikulum == CPLMataKuliah.id_kurikulum) & 
-              (CPL.id_cpl == CPLMataKuliah.id_cpl))
-        .where(CPLMataKuliah.id_matkul == id_matkul)
-    ).all()
-
+    matkul = rows[0][0]
     cpl_list = []
 
-    for cpl, id_kurikulum in cpl_rows:
-        
-        indikator_rows = session.exec(
-            select(IndikatorCPL).where(
-                IndikatorCPL.id_kurikulum == cpl.id_kurikulum,
-                IndikatorCPL.id_cpl == cpl.id_cpl
-            )
-        ).all()
-
-        indikator_list = [
-            {
-                "id_indikator": i.id_indikator,
-                "deskripsi": i.deskripsi
-            }
-            for i in indikator_rows
-        ]
+    for _, id_kurikulum, id_cpl in rows:
+        if id_kurikulum is None:
+            continue
+        graph = await read_model.get(id_kurikulum)
+        cpl = graph.cpl_by_id.get(id_cpl) if graph else None
+        if cpl is None:
+            continue
 
         cpl_list.append({
-            "id_kurikulum": str(cpl.id_kurikulum),
-            "id_cpl": cpl.id_cpl,
-            "deskripsi": cpl.deskripsi,
-            "indikator": indikator_list
+            "id_kurikulum": str(id_kurikulum),
+            "id_cpl": id_cpl,
+            "deskripsi": cpl["deskripsi"],
+            "indikator": [
+                {
+                    "id_indikator": i["id_indikator"],
+                    "deskripsi": i["deskripsi"]
+                }
+                for i in graph.indikator_by_cpl.get(id_cpl, [])
+            ]
         })
 
     return {
@@ -347,13 +652,34 @@ async def getDetailMatkul(id_matkul: str, session: Session = Depends(get_session
     "/", 
     status_code=status.HTTP_200_OK,
     summary="Daftar Semua Mata Kuliah",
-    description="Mengambil daftar semua mata kuliah beserta CPL yang terkait",
-    response_description="Daftar lengkap mata kuliah dengan CPL masing-masing",
+    description="Mengambil daftar mata kuliah per halaman beserta CPL yang terkait",
+    response_description="Daftar mata kuliah pada halaman ini dengan CPL masing-masing",
     dependencies=[Depends(require_kadep_or_dosen)]
 )
-async def getAllMatkul(session: Session = Depends(get_session)):
+async def getAllMatkul(
+    request: Request,
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    semester: Optional[int] = None,
+    sks: Optional[int] = None,
+    id_kurikulum: Optional[uuid.UUID] = None,
+    with_total: bool = False,
+    session: AsyncSession = Depends(get_session)
+):
     """
-    Mengambil daftar semua mata kuliah beserta CPL yang terkait.
+    Mengambil daftar mata kuliah beserta CPL yang terkait (keyset pagination).
+    
+    **Parameter Query:**
+    - **limit**: Jumlah data per halaman (default 50, maksimum 200)
+    - **cursor**: Nilai next_cursor dari halaman sebelumnya
+    - **semester** (opsional): Filter semester
+    - **sks** (opsional): Filter jumlah SKS
+    - **id_kurikulum** (opsional): Hanya mata kuliah yang memetakan CPL dari kurikulum ini
+    - **with_total**: Sertakan jumlah total data (menambah satu query COUNT)
+    
+    **Urutan:**
+    - id_matkul (stabil antar halaman)
     
     **Return:**
     - Daftar mata kuliah yang berisi:
@@ -362,33 +688,61 @@ async def getAllMatkul(session: Session = Depends(get_session)):
       - sks: Jumlah SKS
       - semester: Semester pengajaran
       - cpl: Daftar CPL yang terkait (id_kurikulum, id_cpl, deskripsi)
+    - **next_cursor**: Cursor halaman berikutnya (null jika sudah halaman terakhir)
+    - **total**: Jumlah total mata kuliah sesuai filter (null jika with_total=false)
+    
+    **Conditional Request:**
+    - Response membawa ETag dari version katalog matkul (satu lookup primary key)
+    - If-None-Match yang cocok mendapat 304 tanpa menjalankan query halaman
+    
+    **Error:**
+    - 304: Tidak berubah sejak ETag di If-None-Match
+    - 400: cursor tidak valid
     """
+    etag = make_etag("matkul", request.url.query, await load_catalog_version(session))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+
+    filters = []
+    if semester is not None:
+        filters.append(MataKuliah.semester == semester)
+    if sks is not None:
+        filters.append(MataKuliah.sks == sks)
+    if id_kurikulum is not None:
+        filters.append(
+            exists().where(
+                CPLMataKuliah.id_kurikulum == id_kurikulum,
+                CPLMataKuliah.id_matkul == MataKuliah.id_matkul
+            )
+        )
+
+    statement = select(MataKuliah).where(*filters)
+
+    if cursor:
+        (last_id_matkul,) = decode_cursor(cursor, [str])
+        statement = statement.where(MataKuliah.id_matkul > last_id_matkul)
+
+    rows = (await session.exec(
+        statement.order_by(MataKuliah.id_matkul).limit(limit + 1)
+    )).all()
+
+    page, next_cursor = split_page(rows, limit, lambda m: (m.id_matkul,))
     
-    all_matkul = session.exec(select(MataKuliah)).all()
+    cpl_by_matkul = await load_cpl_by_matkul(session, [m.id_matkul for m in page])
     
     result = []
     
-    for matkul in all_matkul:
-        
-        cpl_rows = session.exec(
-            select(CPL, CPLMataKuliah.id_kurikulum)
-            .join(CPLMataKuliah, 
-                  (CPL.id_kurikulum == CPLMataKuliah.id_kurikulum) & 
-                  (CPL.id_cpl == CPLMataKuliah.id_cpl))
-            .where(CPLMataKuliah.id_matkul == matkul.id_matkul)
-        ).all()
-        
-        
+    for matkul in page:
         cpl_list = [
             {
                 "id_kurikulum": str(cpl.id_kurikulum),
                 "id_cpl": cpl.id_cpl,
                 "deskripsi": cpl.deskripsi
             }
-            for cpl, _ in cpl_rows
+            for cpl in cpl_by_matkul.get(matkul.id_matkul, [])
         ]
         
-        
         result.append({
             "id_matkul": matkul.id_matkul,
             "mata_kuliah": matkul.mata_kuliah,
@@ -396,8 +750,16 @@ async def getAllMatkul(session: Session = Depends(get_session)):
             "semester": matkul.semester,
             "cpl": cpl_list
         })
+
+    total = None
+    if with_total:
+        total = (await session.exec(
+            select(func.count()).select_from(MataKuliah).where(*filters)
+        )).one()
     
     return {
         "message": "Berhasil mengambil semua mata kuliah",
-        "data": result
-    }
\ No newline at end of file
+        "data": result,
+        "next_cursor": next_cursor,
+        "total": total
+    }
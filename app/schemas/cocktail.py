@@ -0,0 +1,24 @@
+from sqlmodel import SQLModel
+from pydantic import field_validator
+from typing import List
+from app.config import settings
+
+
+class CocktailBatch(SQLModel):
+    ids: List[str]
+
+    @field_validator("ids", mode="before")
+    def strip_ids(cls, v):
+        if isinstance(v, list):
+            return [item.strip() if isinstance(item, str) else item for item in v]
+        return v
+
+    @field_validator("ids")
+    def check_ids(cls, v):
+        if not v:
+            raise ValueError("ids must not be empty")
+        if any(not item for item in v):
+            raise ValueError("ids must not contain blank values")
+        if len(set(v)) > settings.COCKTAIL_BATCH_MAX_IDS:
+            raise ValueError(f"at most {settings.COCKTAIL_BATCH_MAX_IDS} distinct ids per batch")
+        return v
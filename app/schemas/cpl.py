@@ -1,4 +1,6 @@
 from sqlmodel import SQLModel
+from typing import List
+from app.schemas.indikator import CreateIndikator
 
 class CreateCPL(SQLModel):
     id_cpl: str
@@ -7,5 +9,13 @@ class CreateCPL(SQLModel):
 class UpdateCPL(SQLModel):
     deskripsi: str
 
+class BulkCPLItem(SQLModel):
+    id_cpl: str
+    deskripsi: str
+    indikator: List[CreateIndikator] = []
+
+class BulkCPL(SQLModel):
+    cpl: List[BulkCPLItem]
+
   
     
\ No newline at end of file
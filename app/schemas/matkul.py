@@ -6,31 +6,31 @@ import uuid
 
 class CPLInput(SQLModel):
     id_kurikulum: uuid.UUID
-    id_cpl: str
+    id_cpl: str = Field(max_length=50)
 
 
 class createMatkul(SQLModel):
-    id_matkul: str
-    mata_kuliah: str
+    id_matkul: str = Field(max_length=50)
+    mata_kuliah: str = Field(max_length=255)
     sks: int
     semester: int
     cpl_list: List[CPLInput]  
 
     @field_validator("id_matkul", mode="before")
     def uppercase_id_matkul(cls, v):
-        return v.upper()
+        return v.upper() if isinstance(v, str) else v
     
     @field_validator("cpl_list", mode="before")
     def uppercase_id_cpls(cls, v):
         if isinstance(v, list):
             for item in v:
-                if isinstance(item, dict) and 'id_cpl' in item:
+                if isinstance(item, dict) and isinstance(item.get('id_cpl'), str):
                     item['id_cpl'] = item['id_cpl'].upper()
         return v
 
 
 class updateMatkul(SQLModel):
-    mata_kuliah: Optional[str] = None
+    mata_kuliah: Optional[str] = Field(default=None, max_length=255)
     sks: Optional[int] = None
     semester: Optional[int] = None
     cpl_list: Optional[List[CPLInput]] = None  
@@ -39,6 +39,6 @@ class updateMatkul(SQLModel):
     def uppercase_id_cpls(cls, v):
         if v is not None and isinstance(v, list):
             for item in v:
-                if isinstance(item, dict) and 'id_cpl' in item:
+                if isinstance(item, dict) and isinstance(item.get('id_cpl'), str):
                     item['id_cpl'] = item['id_cpl'].upper()
         return v
\ No newline at end of file
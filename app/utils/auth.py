@@ -1,15 +1,21 @@
 from datetime import datetime, timedelta, timezone
 from typing import Optional, List
+import hashlib
+import time
+import uuid
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlmodel import Session, select
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.db import get_session
 from app.models.user import User, RoleEnum
-from app.models.token_blacklist import TokenBlacklist
 from app.schemas.auth import TokenData
 from app.config import settings
+from app.utils.shared_cache import CacheNamespace
+from app.utils.revocation import revocation_key, revocation_store
+from app.utils.password_pool import password_pool, bcrypt_rounds
 
 
 SECRET_KEY = settings.SECRET_KEY
@@ -17,11 +23,27 @@ ALGORITHM = settings.ALGORITHM
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
 
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.BCRYPT_ROUNDS
+)
 
 
 security = HTTPBearer()
 
+
+# Hasil autentikasi per token (key: SHA-256 token, value: data user tanpa hash password)
+principal_cache = CacheNamespace("auth", ttl=settings.AUTH_CACHE_TTL_SECONDS)
+
+def token_digest(token: str) -> str:
+    """SHA-256 hex digest of a raw JWT, used as cache key"""
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+async def invalidate_principal(token: str):
+    """Drop the cached principal for a token (e.g. on logout)"""
+    await principal_cache.delete(token_digest(token))
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a plain password against its hash"""
     
@@ -32,6 +54,18 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
 
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password on the dedicated bcrypt pool"""
+    return await password_pool.run(verify_password, plain_password, hashed_password)
+
+async def hash_password_async(password: str) -> str:
+    """hash_password on the dedicated bcrypt pool"""
+    return await password_pool.run(hash_password, password)
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """True when the stored hash was made with a different bcrypt cost"""
+    return bcrypt_rounds(hashed_password) != settings.BCRYPT_ROUNDS
+
 def get_password_hash(password: str) -> str:
     """Hash a password"""
     
@@ -51,6 +85,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
         expire = datetime.now(timezone.utc) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     
     to_encode.update({"exp": expire})
+    to_encode.setdefault("jti", uuid.uuid4().hex)
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
@@ -82,27 +117,27 @@ def decode_token(token: str) -> TokenData:
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_session)
 ) -> User:
     """Get current authenticated user from token"""
     token = credentials.credentials
     
-    
-    blacklisted = session.exec(
-        select(TokenBlacklist).where(TokenBlacklist.token == token)
-    ).first()
-    
-    if blacklisted:
+    if await revocation_store.is_revoked(session, revocation_key(token)):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Token has been revoked (logged out)",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    digest = token_digest(token)
+    cached = await principal_cache.get(digest)
+    if cached is not None:
+        return User.model_validate({**cached, "password": ""})
+    
     token_data = decode_token(token)
     
     statement = select(User).where(User.user_id == token_data.user_id)
-    user = session.exec(statement).first()
+    user = (await session.exec(statement)).first()
     
     if user is None:
         raise HTTPException(
@@ -111,6 +146,15 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    # Entry tidak boleh hidup lebih lama dari token itu sendiri
+    exp = jwt.get_unverified_claims(token).get("exp")
+    if exp is not None:
+        await principal_cache.set(
+            digest,
+            user.model_dump(mode="json", exclude={"password"}),
+            ttl=exp - time.time()
+        )
+    
     return user
 
 async def get_current_kadep(
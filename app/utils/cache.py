@@ -0,0 +1,200 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+
+class TTLCache:
+    """
+    Cache in-process dengan batas ukuran (LRU) dan TTL per entry.
+
+    Aman dipakai dari event loop maupun threadpool. Entry yang kadaluarsa
+    dibuang saat diakses; jika penuh, entry yang paling lama tidak dipakai
+    dibuang lebih dulu.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0 or self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: Hashable) -> bool:
+        with self._lock:
+            return self._data.pop(key, None) is not None
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl_s": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+            }
+
+
+class SWRCache:
+    """
+    Cache async dengan stale-while-revalidate dan single-flight.
+
+    - Entry segar (umur < ttl) langsung dikembalikan.
+    - Entry basi (umur < ttl + stale_ttl) tetap dikembalikan, sementara satu
+      refresh berjalan di background.
+    - Entry yang lebih tua dari itu diperlakukan sebagai miss.
+    - Miss yang bersamaan pada key yang sama menunggu satu pemanggilan loader
+      yang sama (coalescing), sehingga upstream hanya dipanggil sekali.
+
+    Dipakai dari satu event loop per worker, jadi tidak butuh lock.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, stale_ttl: float = 0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._inflight: "dict[Hashable, asyncio.Future]" = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.loads = 0
+        self.load_errors = 0
+        self.evictions = 0
+
+    def peek(self, key: Hashable, max_age: Optional[float] = None) -> Optional[Any]:
+        """
+        Ambil value tanpa memicu load dan tanpa mengubah metrik.
+
+        Tanpa max_age, entry yang sudah melewati stale_ttl pun dikembalikan
+        (dipakai sebagai last-known-good saat upstream gagal).
+        """
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        stored_at, value = entry
+        if max_age is not None and time.monotonic() - stored_at >= max_age:
+            return None
+        return value
+
+    def set(self, key: Hashable, value: Any):
+        if self.maxsize <= 0:
+            return
+        self._data[key] = (time.monotonic(), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: Hashable) -> bool:
+        return self._data.pop(key, None) is not None
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        entry = self._data.get(key)
+        if entry is not None:
+            stored_at, value = entry
+            age = time.monotonic() - stored_at
+            if age < self.ttl:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return value
+            if age < self.ttl + self.stale_ttl:
+                self._data.move_to_end(key)
+                self.stale_hits += 1
+                if key not in self._inflight:
+                    self._start_load(key, loader)
+                return value
+            # entry terlalu tua tidak dibuang: tetap tersedia lewat peek()
+            # sampai tergeser LRU atau diganti hasil load berikutnya
+
+        future = self._inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            future = self._start_load(key, loader)
+        # shield: caller yang dibatalkan tidak ikut membatalkan load bersama
+        return await asyncio.shield(future)
+
+    def _start_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> "asyncio.Future":
+        self.loads += 1
+        future = asyncio.ensure_future(loader())
+        self._inflight[key] = future
+        future.add_done_callback(lambda f: self._finish_load(key, f))
+        return future
+
+    def _finish_load(self, key: Hashable, future: "asyncio.Future"):
+        self._inflight.pop(key, None)
+        if future.cancelled():
+            return
+        if future.exception() is not None:
+            # entry basi (jika ada) tetap dipakai sampai batas stale_ttl
+            self.load_errors += 1
+            return
+        self.set(key, future.result())
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.stale_hits + self.misses + self.coalesced
+        served = self.hits + self.stale_hits
+        return {
+            "entries": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl_s": self.ttl,
+            "stale_ttl_s": self.stale_ttl,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": round(served / lookups, 4) if lookups else 0.0,
+            "loads": self.loads,
+            "load_errors": self.load_errors,
+            "inflight": len(self._inflight),
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,91 @@
+import time
+from typing import Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpen(Exception):
+    """Dilempar saat breaker terbuka dan panggilan ditolak tanpa menyentuh upstream"""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"circuit '{name}' is open")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker sederhana per worker.
+
+    - closed: semua panggilan diteruskan; setelah `failure_threshold`
+      kegagalan beruntun breaker terbuka (trip).
+    - open: panggilan langsung ditolak selama `reset_timeout` detik.
+    - half_open: satu panggilan percobaan diizinkan; sukses menutup
+      breaker, gagal membukanya lagi.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self._probe_in_flight = False
+        self.trips = 0
+        self.rejected = 0
+        self.successes = 0
+        self.failures = 0
+
+    def before_call(self):
+        """Panggil sebelum request upstream; melempar CircuitOpen jika ditolak"""
+        if self.state == OPEN:
+            elapsed = time.monotonic() - self.opened_at
+            if elapsed < self.reset_timeout:
+                self.rejected += 1
+                raise CircuitOpen(self.name, self.reset_timeout - elapsed)
+            self.state = HALF_OPEN
+
+        if self.state == HALF_OPEN:
+            if self._probe_in_flight:
+                self.rejected += 1
+                raise CircuitOpen(self.name, self.reset_timeout)
+            self._probe_in_flight = True
+
+    def record_success(self):
+        self.successes += 1
+        self.consecutive_failures = 0
+        self._probe_in_flight = False
+        self.state = CLOSED
+        self.opened_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        self.consecutive_failures += 1
+        probe_failed = self.state == HALF_OPEN
+        self._probe_in_flight = False
+        if probe_failed or (self.state == CLOSED and self.consecutive_failures >= self.failure_threshold):
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+            self.trips += 1
+
+    def abandon(self):
+        """Panggilan dibatalkan sebelum ada hasil; lepaskan slot probe tanpa mengubah state"""
+        self._probe_in_flight = False
+
+    def stats(self) -> dict:
+        open_for = time.monotonic() - self.opened_at if self.opened_at is not None else None
+        return {
+            "name": self.name,
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "failure_threshold": self.failure_threshold,
+            "reset_timeout_s": self.reset_timeout,
+            "open_for_s": round(open_for, 1) if open_for is not None else None,
+            "trips": self.trips,
+            "rejected": self.rejected,
+            "successes": self.successes,
+            "failures": self.failures,
+        }
@@ -0,0 +1,118 @@
+"""
+Benchmark throughput dan tail latency proxy /api/cocktails.
+
+Jalankan stub upstream dan aplikasi terlebih dahulu:
+
+    python -m app.utils.cocktail_stub --port 9100
+    COCKTAIL_BASE_URL=http://127.0.0.1:9100/api/json/v1 uvicorn app.main:app --port 8000
+    python -m app.utils.cocktail_bench --url http://127.0.0.1:8000 --concurrency 1,10,50,100
+
+Setiap level konkurensi mengirim --requests request dengan campuran detail,
+pencarian nama dan by-letter, lalu melaporkan req/s serta p50/p95/p99/max.
+"""
+import asyncio
+import random
+import string
+import time
+from typing import List
+import httpx
+
+WORDS = ["blue", "red", "margarita", "mojito", "martini", "fizz", "sour", "royal", "mule", "punch"]
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def pick_path(rng: random.Random, id_range: int) -> str:
+    roll = rng.random()
+    if roll < 0.6:
+        return f"/api/cocktails/{10000 + rng.randrange(id_range)}"
+    if roll < 0.9:
+        return f"/api/cocktails/?name={rng.choice(WORDS)}"
+    return f"/api/cocktails/by-letter/{rng.choice(string.ascii_lowercase)}"
+
+
+async def run_level(url: str, concurrency: int, total: int, id_range: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    paths = [pick_path(rng, id_range) for _ in range(total)]
+    latencies: List[float] = []
+    statuses = {}
+    cursor = iter(paths)
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30.0) as client:
+        async def worker():
+            for path in cursor:
+                start = time.perf_counter()
+                try:
+                    res = await client.get(path)
+                    code = res.status_code
+                except httpx.HTTPError:
+                    code = "error"
+                latencies.append((time.perf_counter() - start) * 1000)
+                statuses[code] = statuses.get(code, 0) + 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*[worker() for _ in range(concurrency)])
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "requests": total,
+        "rps": total / elapsed if elapsed else 0.0,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "max": latencies[-1] if latencies else 0.0,
+        "statuses": statuses,
+    }
+
+
+async def main(url: str, levels: List[int], total: int, id_range: int, warmup: int):
+    if warmup:
+        await run_level(url, max(levels), warmup, id_range, seed=0)
+
+    results = []
+    for i, level in enumerate(levels):
+        results.append(await run_level(url, level, total, id_range, seed=i + 1))
+
+    print(f"\n  {'conc':>5} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}  status")
+    print("  " + "-"*56)
+    for r in results:
+        statuses = ", ".join(f"{k}:{v}" for k, v in sorted(r["statuses"].items(), key=lambda kv: str(kv[0])))
+        print(f"  {r['concurrency']:>5} {r['rps']:>9.1f} {r['p50']:>9.1f} {r['p95']:>9.1f} "
+              f"{r['p99']:>9.1f} {r['max']:>9.1f}  {statuses}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Cocktail Proxy Benchmark')
+    parser.add_argument('--url', default='http://127.0.0.1:8000',
+                       help='Base URL of the running API (default: http://127.0.0.1:8000)')
+    parser.add_argument('--concurrency', default='1,10,50,100',
+                       help='Comma separated concurrency levels (default: 1,10,50,100)')
+    parser.add_argument('--requests', type=int, default=1000,
+                       help='Requests per concurrency level (default: 1000)')
+    parser.add_argument('--id-range', type=int, default=600,
+                       help='Detail lookups pick ids from 10000 to 10000+N (match the stub --drinks)')
+    parser.add_argument('--warmup', type=int, default=0,
+                       help='Requests sent before measuring (set 0 to measure a cold cache)')
+    args = parser.parse_args()
+
+    levels = [int(level) for level in args.concurrency.split(",") if level.strip()]
+
+    print("\n" + "="*60)
+    print(" COCKTAIL PROXY BENCHMARK")
+    print("="*60)
+    print(f"  Target: {args.url}")
+    print(f"  Levels: {levels}, {args.requests} requests each, warmup: {args.warmup}")
+
+    asyncio.run(main(args.url, levels, args.requests, args.id_range, args.warmup))
+
+    print("\n" + "="*60 + "\n")
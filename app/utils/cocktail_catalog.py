@@ -0,0 +1,152 @@
+import asyncio
+import string
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Set
+from app.config import settings
+from app.utils.cocktail_service import fetch_cocktails_by_letter
+
+# upstream juga punya nama drink yang diawali angka (mis. "155 Belmont")
+LETTERS = string.ascii_lowercase + string.digits
+
+
+def trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class CocktailCatalog:
+    """
+    Katalog cocktail lokal yang dibangun dari endpoint by-letter (a-z dan 0-9).
+
+    Pencarian nama memakai indeks trigram: kandidat diambil dari irisan
+    posting list trigram query, lalu dicocokkan ulang dengan substring
+    (sama seperti search.php?s= di upstream). Query yang lebih pendek dari
+    3 karakter discan linear karena katalognya hanya ratusan entry.
+    """
+
+    def __init__(self):
+        self._by_letter: Dict[str, List[dict]] = {}
+        self._drinks: Dict[str, dict] = {}
+        self._names: Dict[str, str] = {}
+        self._trigram_index: Dict[str, Set[str]] = {}
+        self.loaded = False
+        self.last_refresh_at: Optional[datetime] = None
+        self.last_refresh_ms = 0.0
+        self.letters_failed: List[str] = []
+        self.local_hits = 0
+        self.fallbacks = 0
+
+    async def _fetch_letter(self, semaphore: asyncio.Semaphore, letter: str) -> Optional[List[dict]]:
+        async with semaphore:
+            try:
+                data = await fetch_cocktails_by_letter(letter)
+            except Exception:
+                return None
+            return (data or {}).get("drinks") or []
+
+    async def refresh(self):
+        """Ambil ulang a-z dan 0-9 dengan konkurensi terbatas lalu ganti indeks sekaligus"""
+        started = time.perf_counter()
+        semaphore = asyncio.Semaphore(settings.COCKTAIL_CATALOG_CONCURRENCY)
+        results = await asyncio.gather(*[self._fetch_letter(semaphore, letter) for letter in LETTERS])
+
+        by_letter = {}
+        failed = []
+        for letter, drinks in zip(LETTERS, results):
+            if drinks is None:
+                # huruf yang gagal tetap memakai data refresh sebelumnya
+                failed.append(letter)
+                drinks = self._by_letter.get(letter)
+                if drinks is None:
+                    continue
+            by_letter[letter] = drinks
+
+        drinks_by_id = {}
+        names = {}
+        index: Dict[str, Set[str]] = {}
+        for drinks in by_letter.values():
+            for drink in drinks:
+                drink_id = drink.get("idDrink")
+                name = (drink.get("strDrink") or "").lower()
+                if not drink_id or not name:
+                    continue
+                drinks_by_id[drink_id] = drink
+                names[drink_id] = name
+                for gram in trigrams(name):
+                    index.setdefault(gram, set()).add(drink_id)
+
+        self._by_letter = by_letter
+        self._drinks = drinks_by_id
+        self._names = names
+        self._trigram_index = index
+        self.letters_failed = failed
+        self.loaded = bool(drinks_by_id)
+        self.last_refresh_at = datetime.utcnow()
+        self.last_refresh_ms = (time.perf_counter() - started) * 1000
+        return len(drinks_by_id)
+
+    def search(self, name: str) -> Optional[dict]:
+        """
+        Cari cocktail berdasarkan nama di katalog lokal.
+
+        Mengembalikan response dengan format yang sama seperti upstream, atau
+        None jika katalog belum siap / tidak ada yang cocok (caller harus
+        fallback ke upstream).
+        """
+        query = name.strip().lower()
+        if not self.loaded or not query:
+            self.fallbacks += 1
+            return None
+
+        if len(query) >= 3:
+            grams = sorted(trigrams(query), key=lambda g: len(self._trigram_index.get(g, ())))
+            candidates = set(self._trigram_index.get(grams[0], ()))
+            for gram in grams[1:]:
+                if not candidates:
+                    break
+                candidates &= self._trigram_index.get(gram, set())
+        else:
+            candidates = self._names.keys()
+
+        matches = [drink_id for drink_id in candidates if query in self._names[drink_id]]
+        if not matches:
+            self.fallbacks += 1
+            return None
+
+        matches.sort(key=lambda drink_id: self._names[drink_id])
+        self.local_hits += 1
+        return {"drinks": [self._drinks[drink_id] for drink_id in matches]}
+
+    async def run(self):
+        """Loop background: bangun katalog lalu refresh sesuai jadwal"""
+        while True:
+            try:
+                count = await self.refresh()
+                print(f"✓ Cocktail catalogue refreshed: {count} drinks ({self.last_refresh_ms:.0f} ms)")
+                if self.letters_failed:
+                    print(f"⚠️  Cocktail catalogue letters failed: {''.join(self.letters_failed)}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"⚠️  Cocktail catalogue refresh failed: {e}")
+
+            # retry lebih cepat selama katalog belum pernah berhasil dibangun
+            delay = settings.COCKTAIL_CATALOG_REFRESH_SECONDS if self.loaded else settings.COCKTAIL_CATALOG_RETRY_SECONDS
+            await asyncio.sleep(delay)
+
+    def stats(self) -> dict:
+        lookups = self.local_hits + self.fallbacks
+        return {
+            "loaded": self.loaded,
+            "drinks": len(self._drinks),
+            "trigrams": len(self._trigram_index),
+            "letters_failed": self.letters_failed,
+            "last_refresh_at": self.last_refresh_at.isoformat() if self.last_refresh_at else None,
+            "last_refresh_ms": round(self.last_refresh_ms, 1),
+            "local_hits": self.local_hits,
+            "fallbacks": self.fallbacks,
+            "local_hit_rate": round(self.local_hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+cocktail_catalog = CocktailCatalog()
@@ -1,29 +1,271 @@
+import asyncio
+import random
 import httpx
-from app.config import COCKTAIL_API_KEY, COCKTAIL_BASE_URL
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+from app.config import settings, COCKTAIL_API_KEY, COCKTAIL_BASE_URL
+from app.utils.cache import SWRCache
+from app.utils.circuit_breaker import CircuitBreaker
+from app.utils.disk_cache import DiskCache
+from app.utils.shared_cache import CacheNamespace, cache_backend
 
-async def fetch_cocktail_list(name: str):
-    url = f"{COCKTAIL_BASE_URL}/{COCKTAIL_API_KEY}/search.php"
-    params = {"s": name}
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
 
-    async with httpx.AsyncClient() as client:
-        res = await client.get(url, params=params)
-        res.raise_for_status()
-        return res.json()
+_client: Optional[httpx.AsyncClient] = None
+
+cocktail_cache = SWRCache(
+    maxsize=settings.COCKTAIL_CACHE_MAX_ENTRIES,
+    ttl=settings.COCKTAIL_CACHE_TTL_SECONDS,
+    stale_ttl=settings.COCKTAIL_CACHE_STALE_SECONDS
+)
+
+# cache bersama antar worker/host, dipakai jika backend-nya shared (redis)
+shared_cache = CacheNamespace("cocktail", ttl=settings.COCKTAIL_CACHE_TTL_SECONDS)
+
+# cache persisten opsional (L3), aktif jika COCKTAIL_DISK_CACHE_PATH diisi.
+# TTL-nya dibatasi TTL in-memory: refresh SWR membaca disk lebih dulu, jadi
+# TTL disk yang lebih panjang akan memperlambat kesegaran data dari upstream
+disk_cache = DiskCache(
+    settings.COCKTAIL_DISK_CACHE_PATH,
+    ttl=min(settings.COCKTAIL_DISK_CACHE_TTL_SECONDS, settings.COCKTAIL_CACHE_TTL_SECONDS),
+    retain=settings.COCKTAIL_DISK_CACHE_RETAIN_SECONDS
+)
+
+upstream_breaker = CircuitBreaker(
+    "cocktail",
+    failure_threshold=settings.COCKTAIL_BREAKER_FAILURE_THRESHOLD,
+    reset_timeout=settings.COCKTAIL_BREAKER_RESET_SECONDS
+)
+
+upstream_stats = {
+    "calls": 0,
+    "attempts": 0,
+    "retries": 0,
+    "deadline_exceeded": 0,
+    "served_cached_on_error": 0,
+}
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _build_client() -> httpx.AsyncClient:
+    http2 = settings.COCKTAIL_HTTP2
+    if http2 and not _http2_available():
+        print("⚠️  COCKTAIL_HTTP2 aktif tetapi paket h2 tidak terpasang, memakai HTTP/1.1")
+        http2 = False
+
+    return httpx.AsyncClient(
+        base_url=f"{COCKTAIL_BASE_URL}/{COCKTAIL_API_KEY}",
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=settings.COCKTAIL_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.COCKTAIL_MAX_KEEPALIVE,
+            keepalive_expiry=settings.COCKTAIL_KEEPALIVE_EXPIRY
+        ),
+        timeout=httpx.Timeout(
+            connect=settings.COCKTAIL_CONNECT_TIMEOUT,
+            read=settings.COCKTAIL_READ_TIMEOUT,
+            write=settings.COCKTAIL_READ_TIMEOUT,
+            pool=settings.COCKTAIL_POOL_TIMEOUT
+        )
+    )
+
+
+async def start_client():
+    """Buat client bersama dan buka cache persisten (dipanggil saat startup aplikasi)"""
+    global _client
+    if _client is None:
+        _client = _build_client()
+    if settings.COCKTAIL_DISK_CACHE_PATH:
+        disk_cache.open()
+
+
+async def close_client():
+    """Tutup client bersama beserta koneksi keep-alive-nya (saat shutdown)"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+    disk_cache.close()
+
+
+def get_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None:
+        _client = _build_client()
+    return _client
+
+
+def _is_retryable(exc: Exception) -> bool:
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code in RETRYABLE_STATUS
+    return isinstance(exc, httpx.TransportError)
+
+
+async def _request_json(path: str, params: dict):
+    """GET dengan retry + jittered exponential backoff (full jitter)"""
+    attempts = max(1, settings.COCKTAIL_RETRY_ATTEMPTS)
+    for attempt in range(attempts):
+        upstream_stats["attempts"] += 1
+        try:
+            res = await get_client().get(path, params=params)
+            res.raise_for_status()
+            return res.json()
+        except (httpx.TransportError, httpx.HTTPStatusError) as e:
+            if attempt + 1 >= attempts or not _is_retryable(e):
+                raise
+
+        backoff = min(
+            settings.COCKTAIL_RETRY_BACKOFF_MAX,
+            settings.COCKTAIL_RETRY_BACKOFF_BASE * (2 ** attempt)
+        )
+        upstream_stats["retries"] += 1
+        await asyncio.sleep(random.uniform(0, backoff))
+
+
+async def _get_json(path: str, params: dict):
+    """
+    Satu panggilan logis ke upstream: dijaga circuit breaker dan dibatasi
+    deadline total (termasuk semua retry dan backoff).
+    """
+    upstream_breaker.before_call()
+    upstream_stats["calls"] += 1
+    try:
+        async with asyncio.timeout(settings.COCKTAIL_DEADLINE_SECONDS):
+            data = await _request_json(path, params)
+    except TimeoutError:
+        upstream_stats["deadline_exceeded"] += 1
+        upstream_breaker.record_failure()
+        raise
+    except httpx.HTTPStatusError as e:
+        # 4xx berarti upstream sehat, hanya request-nya yang ditolak
+        if e.response.status_code >= 500 or e.response.status_code == 429:
+            upstream_breaker.record_failure()
+        else:
+            upstream_breaker.record_success()
+        raise
+    except asyncio.CancelledError:
+        upstream_breaker.abandon()
+        raise
+    except Exception:
+        upstream_breaker.record_failure()
+        raise
+
+    upstream_breaker.record_success()
+    return data
 
-async def fetch_cocktail_detail(cocktail_id: str):
-    url = f"{COCKTAIL_BASE_URL}/{COCKTAIL_API_KEY}/lookup.php"
-    params = {"i": cocktail_id}
 
-    async with httpx.AsyncClient() as client:
-        res = await client.get(url, params=params)
-        res.raise_for_status()
-        return res.json()
+def cache_key(path: str, params: dict) -> tuple:
+    return (path, tuple(sorted(params.items())))
+
+
+def disk_key(path: str, params: dict) -> str:
+    return f"{path}?{urlencode(sorted(params.items()))}"
+
+
+async def _load_json(path: str, params: dict):
+    """Loader untuk cache in-memory: cek cache bersama, cache persisten, baru upstream"""
+    key = disk_key(path, params)
+    if cache_backend.shared:
+        cached = await shared_cache.get(key)
+        if cached is not None:
+            return cached
+
+    cached = await disk_cache.get(key)
+    if cached is None:
+        cached = await _get_json(path, params)
+        await disk_cache.set(key, cached)
+
+    if cache_backend.shared:
+        await shared_cache.set(key, cached)
+    return cached
+
+
+async def _cached_get_json(path: str, params: dict):
+    key = cache_key(path, params)
+    try:
+        return await cocktail_cache.get_or_load(key, lambda: _load_json(path, params))
+    except Exception:
+        # upstream gagal / breaker terbuka: pakai data terakhir yang pernah berhasil
+        cached = cocktail_cache.peek(key)
+        if cached is None:
+            cached = await disk_cache.get(disk_key(path, params), allow_expired=True)
+        if cached is None:
+            raise
+        upstream_stats["served_cached_on_error"] += 1
+        return cached
+
+
+def upstream_status() -> dict:
+    return {
+        **upstream_stats,
+        "breaker": upstream_breaker.stats(),
+        "config": {
+            "deadline_s": settings.COCKTAIL_DEADLINE_SECONDS,
+            "retry_attempts": settings.COCKTAIL_RETRY_ATTEMPTS,
+            "connect_timeout_s": settings.COCKTAIL_CONNECT_TIMEOUT,
+            "read_timeout_s": settings.COCKTAIL_READ_TIMEOUT,
+        },
+    }
+
+
+async def fetch_cocktail_list(name: str):
+    return await _cached_get_json("/search.php", {"s": name.strip().lower()})
+
+async def fetch_cocktail_detail(cocktail_id: str):
+    return await _cached_get_json("/lookup.php", {"i": cocktail_id.strip()})
 
 async def fetch_cocktails_by_letter(letter: str):
-    url = f"{COCKTAIL_BASE_URL}/{COCKTAIL_API_KEY}/search.php"
-    params = {"f": letter}
+    return await _cached_get_json("/search.php", {"f": letter.lower()})
+
+
+async def fetch_cocktail_details(cocktail_ids: List[str]) -> Tuple[Dict[str, Optional[dict]], List[str]]:
+    """
+    Ambil detail banyak cocktail sekaligus.
+
+    ID diduplikasi dulu, lalu yang masih segar di cache in-memory langsung
+    dipakai; sisanya diambil paralel lewat fetch_cocktail_detail dengan
+    konkurensi dibatasi COCKTAIL_BATCH_CONCURRENCY. Entry basi ikut jalur
+    itu agar dikembalikan sambil memicu refresh di background (SWR).
+
+    Return (results, failed): results memetakan id ke drink (None jika
+    tidak ditemukan), failed berisi id yang gagal diambil dari upstream.
+    """
+    unique_ids = list(dict.fromkeys(cocktail_id.strip() for cocktail_id in cocktail_ids))
+    results: Dict[str, Optional[dict]] = {}
+    failed: List[str] = []
+    pending = []
+
+    for cocktail_id in unique_ids:
+        cached = cocktail_cache.peek(cache_key("/lookup.php", {"i": cocktail_id}), max_age=cocktail_cache.ttl)
+        if cached is not None:
+            results[cocktail_id] = _first_drink(cached)
+        else:
+            pending.append(cocktail_id)
+
+    semaphore = asyncio.Semaphore(settings.COCKTAIL_BATCH_CONCURRENCY)
+
+    async def fetch_one(cocktail_id: str):
+        async with semaphore:
+            try:
+                data = await fetch_cocktail_detail(cocktail_id)
+            except Exception:
+                failed.append(cocktail_id)
+                return
+        results[cocktail_id] = _first_drink(data)
+
+    await asyncio.gather(*[fetch_one(cocktail_id) for cocktail_id in pending])
+
+    ordered = {cocktail_id: results[cocktail_id] for cocktail_id in unique_ids if cocktail_id in results}
+    return ordered, [cocktail_id for cocktail_id in unique_ids if cocktail_id in failed]
+
 
-    async with httpx.AsyncClient() as client:
-        res = await client.get(url, params=params)
-        res.raise_for_status()
-        return res.json()
\ No newline at end of file
+def _first_drink(data) -> Optional[dict]:
+    drinks = (data or {}).get("drinks") or []
+    return drinks[0] if drinks else None
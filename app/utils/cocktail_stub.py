@@ -0,0 +1,157 @@
+"""
+Stub lokal untuk upstream TheCocktailDB (search.php dan lookup.php).
+
+Dipakai untuk benchmark / development tanpa akses jaringan. Jalankan stub,
+lalu arahkan aplikasi ke stub lewat COCKTAIL_BASE_URL:
+
+    python -m app.utils.cocktail_stub --port 9100 --latency-ms 80 --error-rate 0.01
+    COCKTAIL_BASE_URL=http://127.0.0.1:9100/api/json/v1 uvicorn app.main:app
+
+Stub juga bisa dijalankan langsung dengan uvicorn; katalog dibangun saat
+startup dari konfigurasi default (atau env COCKTAIL_STUB_*):
+
+    COCKTAIL_STUB_DRINKS=2000 uvicorn app.utils.cocktail_stub:app --port 9100
+
+Endpoint yang didukung (API key di path bebas):
+    /api/json/v1/{key}/search.php?s=<nama>   pencarian substring nama
+    /api/json/v1/{key}/search.php?f=<huruf>  daftar berdasarkan huruf awal
+    /api/json/v1/{key}/lookup.php?i=<id>     detail berdasarkan idDrink
+
+Stub sengaja tidak mengimpor app.config agar bisa jalan tanpa .env.
+"""
+import asyncio
+import os
+import random
+import string
+from typing import Dict, List, Optional
+from fastapi import FastAPI, Response
+
+WORDS = [
+    "Blue", "Red", "Golden", "Frozen", "Spiced", "Smoky", "Sour", "Royal",
+    "Tropical", "Midnight", "Velvet", "Wild", "Old", "Lucky", "Electric",
+    "Margarita", "Mojito", "Martini", "Negroni", "Daiquiri", "Mule", "Fizz",
+    "Sling", "Punch", "Spritz", "Collins", "Julep", "Smash", "Cooler", "Flip"
+]
+
+
+class StubConfig:
+    latency_ms: float = float(os.getenv("COCKTAIL_STUB_LATENCY_MS", "50"))
+    jitter_ms: float = float(os.getenv("COCKTAIL_STUB_JITTER_MS", "20"))
+    error_rate: float = float(os.getenv("COCKTAIL_STUB_ERROR_RATE", "0"))
+    drinks: int = int(os.getenv("COCKTAIL_STUB_DRINKS", "600"))
+    payload_bytes: int = int(os.getenv("COCKTAIL_STUB_PAYLOAD_BYTES", "1500"))
+
+
+config = StubConfig()
+app = FastAPI(title="Cocktail Upstream Stub")
+
+_catalogue: List[dict] = []
+_by_id: Dict[str, dict] = {}
+
+
+def build_catalogue(count: int, payload_bytes: int):
+    """Bangun katalog deterministik berisi `count` drink dengan ukuran payload kira-kira `payload_bytes`"""
+    rng = random.Random(42)
+    drinks = []
+    for i in range(count):
+        name = f"{rng.choice(WORDS)} {rng.choice(WORDS)} {i}"
+        drink = {
+            "idDrink": str(10000 + i),
+            "strDrink": name,
+            "strCategory": rng.choice(["Cocktail", "Ordinary Drink", "Shot", "Punch / Party Drink"]),
+            "strAlcoholic": rng.choice(["Alcoholic", "Non alcoholic"]),
+            "strGlass": rng.choice(["Cocktail glass", "Highball glass", "Old-fashioned glass"]),
+            "strDrinkThumb": f"https://example.invalid/images/{10000 + i}.jpg",
+        }
+        for n in range(1, 16):
+            drink[f"strIngredient{n}"] = rng.choice(WORDS) if n <= 5 else None
+            drink[f"strMeasure{n}"] = f"{n} oz" if n <= 5 else None
+        filler = max(0, payload_bytes - len(str(drink)))
+        drink["strInstructions"] = "".join(rng.choice(string.ascii_lowercase + " ") for _ in range(filler))
+        drinks.append(drink)
+
+    _catalogue[:] = drinks
+    _by_id.clear()
+    _by_id.update({drink["idDrink"]: drink for drink in drinks})
+
+
+@app.on_event("startup")
+def ensure_catalogue():
+    """Jalan lewat `uvicorn app.utils.cocktail_stub:app` juga harus punya katalog"""
+    if not _catalogue:
+        build_catalogue(config.drinks, config.payload_bytes)
+    if not _catalogue:
+        raise RuntimeError("Cocktail stub catalogue is empty; set --drinks / COCKTAIL_STUB_DRINKS >= 1")
+
+
+async def _simulate() -> Optional[Response]:
+    delay = config.latency_ms + random.uniform(-config.jitter_ms, config.jitter_ms)
+    if delay > 0:
+        await asyncio.sleep(delay / 1000)
+    if config.error_rate and random.random() < config.error_rate:
+        return Response(status_code=503, content="stub injected error")
+    return None
+
+
+@app.get("/api/json/v1/{api_key}/search.php")
+async def search(s: Optional[str] = None, f: Optional[str] = None):
+    error = await _simulate()
+    if error is not None:
+        return error
+
+    if f is not None:
+        prefix = f.lower()[:1]
+        drinks = [d for d in _catalogue if d["strDrink"].lower().startswith(prefix)]
+    else:
+        query = (s or "").lower()
+        drinks = [d for d in _catalogue if query in d["strDrink"].lower()]
+    return {"drinks": drinks or None}
+
+
+@app.get("/api/json/v1/{api_key}/lookup.php")
+async def lookup(i: str = ""):
+    error = await _simulate()
+    if error is not None:
+        return error
+
+    drink = _by_id.get(i)
+    return {"drinks": [drink] if drink else None}
+
+
+if __name__ == "__main__":
+    import argparse
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description='Cocktail Upstream Stub')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=9100)
+    parser.add_argument('--latency-ms', type=float, default=config.latency_ms,
+                       help='Base latency per request in milliseconds')
+    parser.add_argument('--jitter-ms', type=float, default=config.jitter_ms,
+                       help='Uniform +/- jitter added to the base latency')
+    parser.add_argument('--error-rate', type=float, default=config.error_rate,
+                       help='Fraction of requests answered with 503 (0.0 - 1.0)')
+    parser.add_argument('--drinks', type=int, default=config.drinks,
+                       help='Number of drinks in the generated catalogue')
+    parser.add_argument('--payload-bytes', type=int, default=config.payload_bytes,
+                       help='Approximate JSON size per drink')
+    args = parser.parse_args()
+    if args.drinks < 1:
+        parser.error("--drinks must be at least 1")
+
+    config.latency_ms = args.latency_ms
+    config.jitter_ms = args.jitter_ms
+    config.error_rate = args.error_rate
+    config.drinks = args.drinks
+    config.payload_bytes = args.payload_bytes
+    build_catalogue(config.drinks, config.payload_bytes)
+
+    print("\n" + "="*60)
+    print(" COCKTAIL UPSTREAM STUB")
+    print("="*60)
+    print(f"  Drinks: {config.drinks} (~{config.payload_bytes} bytes each)")
+    print(f"  Latency: {config.latency_ms} ms +/- {config.jitter_ms} ms, error rate: {config.error_rate}")
+    print(f"  COCKTAIL_BASE_URL=http://{args.host}:{args.port}/api/json/v1")
+    print("="*60 + "\n")
+
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
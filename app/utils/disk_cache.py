@@ -0,0 +1,151 @@
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+PRUNE_EVERY_WRITES = 500
+
+
+class DiskCache:
+    """
+    Cache persisten berbasis file SQLite (mode WAL).
+
+    Satu file dipakai bersama oleh semua worker di host yang sama dan tetap
+    ada setelah restart, sehingga worker baru langsung hangat. Waktu
+    kadaluarsa memakai jam dinding (time.time) karena dibagi antar proses.
+    Akses SQLite dijalankan di thread agar tidak memblokir event loop, dan
+    error SQLite tidak pernah menggagalkan request (hanya dihitung).
+    """
+
+    def __init__(self, path: Optional[str], ttl: float, retain: float = 0):
+        self.path = path
+        self.ttl = ttl
+        self.retain = retain
+        self._lock = threading.Lock()
+        # counter diubah dari thread worker dan event loop; lock terpisah agar
+        # event loop tidak ikut menunggu query SQLite yang sedang jalan
+        self._stats_lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self.hits = 0
+        self.expired_hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.errors = 0
+        self.pruned = 0
+
+    def open(self):
+        if not self.path:
+            return
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS http_cache ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " stored_at REAL NOT NULL,"
+            " expires_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_http_cache_expires_at ON http_cache (expires_at)")
+        self._conn = conn
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _count(self, counter: str, amount: int = 1):
+        with self._stats_lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+    def _get(self, key: str, allow_expired: bool) -> Optional[Any]:
+        with self._lock:
+            # bisa saja close() menang balapan dengan thread ini
+            if self._conn is None:
+                return None
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM http_cache WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            self._count("misses")
+            return None
+        value, expires_at = row
+        if expires_at <= time.time():
+            if not allow_expired:
+                self._count("misses")
+                return None
+            self._count("expired_hits")
+        else:
+            self._count("hits")
+        return json.loads(value)
+
+    def _set(self, key: str, value: Any):
+        now = time.time()
+        payload = json.dumps(value, separators=(",", ":"))
+        with self._lock:
+            if self._conn is None:
+                return
+            self._conn.execute(
+                "INSERT OR REPLACE INTO http_cache (key, value, stored_at, expires_at) VALUES (?, ?, ?, ?)",
+                (key, payload, now, now + self.ttl)
+            )
+            with self._stats_lock:
+                self.writes += 1
+                prune = self.writes % PRUNE_EVERY_WRITES == 0
+            if prune:
+                # entry kadaluarsa disimpan `retain` detik sebagai cadangan saat upstream gagal
+                cursor = self._conn.execute(
+                    "DELETE FROM http_cache WHERE expires_at < ?", (now - self.retain,)
+                )
+                self._count("pruned", cursor.rowcount)
+
+    def _row_count(self) -> Optional[int]:
+        with self._lock:
+            if self._conn is None:
+                return None
+            return self._conn.execute("SELECT COUNT(*) FROM http_cache").fetchone()[0]
+
+    async def get(self, key: str, allow_expired: bool = False) -> Optional[Any]:
+        if self._conn is None:
+            return None
+        try:
+            return await asyncio.to_thread(self._get, key, allow_expired)
+        except (sqlite3.Error, ValueError):
+            self._count("errors")
+            return None
+
+    async def set(self, key: str, value: Any):
+        if self._conn is None:
+            return
+        try:
+            await asyncio.to_thread(self._set, key, value)
+        except sqlite3.Error:
+            self._count("errors")
+
+    async def stats(self) -> dict:
+        rows = None
+        if self._conn is not None:
+            try:
+                rows = await asyncio.to_thread(self._row_count)
+            except sqlite3.Error:
+                self._count("errors")
+        with self._stats_lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self._conn is not None,
+                "path": self.path,
+                "rows": rows,
+                "ttl_s": self.ttl,
+                "hits": self.hits,
+                "expired_hits": self.expired_hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "writes": self.writes,
+                "pruned": self.pruned,
+                "errors": self.errors,
+            }
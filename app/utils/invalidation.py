@@ -0,0 +1,138 @@
+import asyncio
+import uuid
+from datetime import datetime
+from typing import Optional
+from sqlalchemy.engine import make_url
+from sqlmodel import select, func
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.config import settings
+from app.db import async_engine, get_async_database_url
+from app.utils.loaders import chunked
+from app.utils.read_model import read_model
+
+CHANNEL = "curriculum_invalidate"
+
+# payload NOTIFY dibatasi 8000 byte; satu UUID + koma = 37 byte
+MAX_IDS_PER_MESSAGE = 150
+
+
+def is_postgres() -> bool:
+    return async_engine is not None and async_engine.dialect.name == "postgresql"
+
+
+def listener_enabled() -> bool:
+    return settings.CACHE_INVALIDATION_LISTEN and is_postgres()
+
+
+async def publish_invalidation(session: AsyncSession, *id_kurikulum_list: uuid.UUID):
+    """
+    Kirim NOTIFY berisi id kurikulum yang berubah.
+
+    Dipanggil di dalam transaksi penulisan (sebelum commit): PostgreSQL baru
+    mengirim notifikasi saat commit dan membuangnya jika rollback.
+    """
+    if not is_postgres():
+        return
+    ids = sorted({str(id_kurikulum) for id_kurikulum in id_kurikulum_list})
+    for chunk in chunked(ids, MAX_IDS_PER_MESSAGE):
+        await session.exec(select(func.pg_notify(CHANNEL, ",".join(chunk))))
+
+
+class InvalidationListener:
+    """
+    LISTEN per worker yang membuang graf kurikulum saat worker lain menulis.
+
+    Notifikasi yang terkirim saat koneksi listener putus tidak bisa diambil
+    lagi, jadi selama terputus read model ditangguhkan (tidak menyimpan
+    graf) dan dikosongkan penuh; caching aktif kembali setelah LISTEN
+    terpasang lagi.
+    """
+
+    def __init__(self):
+        self.connected = False
+        self.connects = 0
+        self.disconnects = 0
+        self.messages = 0
+        self.evicted_ids = 0
+        self.last_error: Optional[str] = None
+        self.last_message_at: Optional[datetime] = None
+
+    def _dsn(self) -> str:
+        # database yang sama dengan async engine (ASYNC_DATABASE_URL jika diset)
+        url = make_url(get_async_database_url())
+        return url.set(drivername="postgresql").render_as_string(hide_password=False)
+
+    def _on_notify(self, connection, pid: int, channel: str, payload: str):
+        ids = []
+        for part in payload.split(","):
+            try:
+                ids.append(uuid.UUID(part))
+            except ValueError:
+                continue
+        self.messages += 1
+        self.evicted_ids += len(ids)
+        self.last_message_at = datetime.utcnow()
+        read_model.invalidate(*ids)
+
+    async def _listen(self, connection):
+        lost = asyncio.Event()
+        connection.add_termination_listener(lambda _: lost.set())
+        await connection.add_listener(CHANNEL, self._on_notify)
+
+        # LISTEN sudah aktif: aman untuk mulai caching lagi dari keadaan kosong
+        read_model.resume()
+        self.connected = True
+        self.connects += 1
+        print("✓ Invalidation listener connected")
+
+        while not lost.is_set():
+            try:
+                await asyncio.wait_for(lost.wait(), timeout=settings.CACHE_INVALIDATION_PING_SECONDS)
+            except asyncio.TimeoutError:
+                # koneksi yang mati diam-diam (mis. NAT / failover) baru ketahuan saat dipakai
+                await asyncio.wait_for(connection.execute("SELECT 1"), timeout=10)
+        raise ConnectionError("listener connection closed")
+
+    async def run(self):
+        """Loop background: LISTEN, reconnect dengan backoff jika koneksi putus"""
+        import asyncpg
+
+        read_model.suspend()
+        delay = 1.0
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(self._dsn(), timeout=10)
+                delay = 1.0
+                await self._listen(connection)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+                print(f"⚠️  Invalidation listener disconnected: {self.last_error}")
+            finally:
+                if self.connected:
+                    self.connected = False
+                    self.disconnects += 1
+                read_model.suspend()
+                if connection is not None and not connection.is_closed():
+                    connection.terminate()
+
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30.0)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": listener_enabled(),
+            "channel": CHANNEL,
+            "connected": self.connected,
+            "connects": self.connects,
+            "disconnects": self.disconnects,
+            "messages": self.messages,
+            "evicted_ids": self.evicted_ids,
+            "last_message_at": self.last_message_at.isoformat() if self.last_message_at else None,
+            "last_error": self.last_error,
+        }
+
+
+invalidation_listener = InvalidationListener()
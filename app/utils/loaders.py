@@ -0,0 +1,87 @@
+from collections import defaultdict
+from typing import Dict, Iterable, List, Set, Tuple
+import uuid
+from sqlalchemy import tuple_
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.models.cpl import CPL
+from app.models.cpl_matkul import CPLMataKuliah
+from app.models.matkul import MataKuliah
+
+CPLKey = Tuple[uuid.UUID, str]
+
+# Batas jumlah nilai per klausa IN (asyncpg membatasi 32767 parameter per query)
+IN_CHUNK_SIZE = 5000
+
+
+def chunked(items: List, size: int = IN_CHUNK_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+async def load_cpl_by_matkul(
+    session: AsyncSession,
+    id_matkul_list: Iterable[str]
+) -> Dict[str, List[CPL]]:
+    """
+    Memuat CPL untuk banyak mata kuliah sekaligus.
+
+    Satu query JOIN cpl_matkul -> cpl per potongan IN, hasilnya dikelompokkan
+    per id_matkul di Python. Mata kuliah tanpa CPL tidak muncul di dict.
+    """
+    ids = list(dict.fromkeys(id_matkul_list))
+    grouped: Dict[str, List[CPL]] = defaultdict(list)
+
+    for chunk in chunked(ids):
+        rows = (await session.exec(
+            select(CPLMataKuliah.id_matkul, CPL)
+            .join(CPL,
+                  (CPL.id_kurikulum == CPLMataKuliah.id_kurikulum) &
+                  (CPL.id_cpl == CPLMataKuliah.id_cpl))
+            .where(CPLMataKuliah.id_matkul.in_(chunk))
+            .order_by(CPLMataKuliah.id_matkul, CPL.id_kurikulum, CPL.id_cpl)
+        )).all()
+
+        for id_matkul, cpl in rows:
+            grouped[id_matkul].append(cpl)
+
+    return grouped
+
+
+async def load_kurikulum_ids_by_matkul(session: AsyncSession, id_matkul: str) -> Set[uuid.UUID]:
+    """Kurikulum yang terhubung ke satu mata kuliah (lewat cpl_matkul)"""
+    rows = (await session.exec(
+        select(CPLMataKuliah.id_kurikulum)
+        .where(CPLMataKuliah.id_matkul == id_matkul)
+        .distinct()
+    )).all()
+    return set(rows)
+
+
+async def load_existing_cpl_keys(session: AsyncSession, cpl_keys: Iterable[CPLKey]) -> Set[CPLKey]:
+    """Pasangan (id_kurikulum, id_cpl) yang benar-benar ada, dicek dengan tuple IN per potongan"""
+    keys = list(dict.fromkeys(cpl_keys))
+    found: Set[CPLKey] = set()
+
+    for chunk in chunked(keys, IN_CHUNK_SIZE // 2):
+        rows = (await session.exec(
+            select(CPL.id_kurikulum, CPL.id_cpl)
+            .where(tuple_(CPL.id_kurikulum, CPL.id_cpl).in_(chunk))
+        )).all()
+        found.update((id_kurikulum, id_cpl) for id_kurikulum, id_cpl in rows)
+
+    return found
+
+
+async def load_existing_matkul_ids(session: AsyncSession, id_matkul_list: Iterable[str]) -> Set[str]:
+    """id_matkul yang sudah ada di database"""
+    ids = list(dict.fromkeys(id_matkul_list))
+    found: Set[str] = set()
+
+    for chunk in chunked(ids):
+        rows = (await session.exec(
+            select(MataKuliah.id_matkul).where(MataKuliah.id_matkul.in_(chunk))
+        )).all()
+        found.update(rows)
+
+    return found
@@ -4,9 +4,390 @@ from pathlib import Path
 root_dir = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(root_dir))
 
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+from sqlalchemy import Column, DateTime, MetaData, String, Table, delete, insert, select
+from sqlalchemy.engine import Connection
 from app.db import init_db, drop_db, engine
 from sqlmodel import text, inspect
 
+# ================= REVISION ENGINE =================
+# create_all hanya membuat tabel yang belum ada. Perubahan pada tabel yang sudah
+# ada (index, kolom, constraint) ditulis sebagai revisi berurutan di REVISIONS;
+# revisi yang sudah dijalankan dicatat di tabel schema_revision.
+
+REVISION_TABLE = "schema_revision"
+MIGRATION_LOCK_KEY = 0x6D696772  # pg_advisory_lock, satu proses migrasi dalam satu waktu
+
+revision_table = Table(
+    REVISION_TABLE,
+    MetaData(),
+    Column("revision", String(32), primary_key=True),
+    Column("description", String(255), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+@dataclass
+class Step:
+    """
+    One migration step: a SQL statement (optionally with a PostgreSQL variant)
+    or a Python callable for data changes.
+
+    online=True steps run outside a transaction on PostgreSQL (required for
+    CREATE/DROP INDEX CONCURRENTLY), so they must be idempotent: a revision
+    interrupted halfway is simply run again. A failed concurrent build leaves
+    an INVALID index behind; drop it before retrying.
+    """
+    sql: Optional[str] = None
+    postgresql: Optional[str] = None
+    run: Optional[Callable[[Connection], None]] = None
+    description: str = ""
+    only_if: Optional[Callable[[Connection], bool]] = None
+    online: bool = False
+
+    def statement(self, dialect: str) -> Optional[str]:
+        if dialect == "postgresql" and self.postgresql:
+            return self.postgresql
+        return self.sql
+
+
+@dataclass
+class Revision:
+    revision: str
+    description: str
+    upgrade: List[Step]
+    downgrade: Optional[List[Step]] = field(default=None)  # None = tidak bisa di-downgrade
+    only_if: Optional[Callable[[Connection], bool]] = None  # False = cukup dicatat, skema sudah sesuai
+
+
+def create_index(name: str, table: str, *columns: str) -> Step:
+    cols = ", ".join(columns)
+    return Step(
+        sql=f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({cols})",
+        postgresql=f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} ({cols})",
+        online=True,
+    )
+
+
+def drop_index(name: str) -> Step:
+    return Step(
+        sql=f"DROP INDEX IF EXISTS {name}",
+        postgresql=f"DROP INDEX CONCURRENTLY IF EXISTS {name}",
+        online=True,
+    )
+
+
+def has_column(table: str, column: str) -> Callable[[Connection], bool]:
+    def check(conn: Connection) -> bool:
+        inspector = inspect(conn)
+        if not inspector.has_table(table):
+            return False
+        return column in {col["name"] for col in inspector.get_columns(table)}
+    return check
+
+
+def missing_column(table: str, column: str) -> Callable[[Connection], bool]:
+    present = has_column(table, column)
+    return lambda conn: not present(conn)
+
+
+def _copy_token_blacklist(conn: Connection):
+    """Token lama belum punya jti, key-nya SHA-256 dari token (sama dengan revocation_key)"""
+    from app.utils.revocation import revocation_key
+
+    rows = conn.execute(text(
+        "SELECT token, blacklisted_at, expires_at, user_id FROM token_blacklist"
+    )).all()
+    params = {}
+    for token, blacklisted_at, expires_at, user_id in rows:
+        params[revocation_key(token)] = {
+            "token_key": revocation_key(token),
+            "blacklisted_at": blacklisted_at,
+            "expires_at": expires_at,
+            "user_id": user_id,
+        }
+    if params:
+        conn.execute(text(
+            "INSERT INTO token_blacklist_new (token_key, blacklisted_at, expires_at, user_id) "
+            "VALUES (:token_key, :blacklisted_at, :expires_at, :user_id)"
+        ), list(params.values()))
+
+
+REVISIONS: List[Revision] = [
+    Revision(
+        "0001",
+        "Index cpl_matkul.id_matkul",
+        upgrade=[create_index("ix_cpl_matkul_id_matkul", "cpl_matkul", "id_matkul")],
+        downgrade=[drop_index("ix_cpl_matkul_id_matkul")],
+    ),
+    Revision(
+        "0002",
+        "Index kurikulum.status_kurikulum and kurikulum.created_at",
+        upgrade=[
+            create_index("ix_kurikulum_status_kurikulum", "kurikulum", "status_kurikulum"),
+            create_index("ix_kurikulum_created_at", "kurikulum", "created_at"),
+        ],
+        downgrade=[
+            drop_index("ix_kurikulum_created_at"),
+            drop_index("ix_kurikulum_status_kurikulum"),
+        ],
+    ),
+    Revision(
+        "0003",
+        "Index mata_kuliah.sks and mata_kuliah.semester",
+        upgrade=[
+            create_index("ix_mata_kuliah_sks", "mata_kuliah", "sks"),
+            create_index("ix_mata_kuliah_semester", "mata_kuliah", "semester"),
+        ],
+        downgrade=[
+            drop_index("ix_mata_kuliah_semester"),
+            drop_index("ix_mata_kuliah_sks"),
+        ],
+    ),
+    Revision(
+        "0004",
+        "Key token_blacklist by token_key, index blacklisted_at and expires_at",
+        # hash token tidak bisa dibalik, jadi revisi ini tidak punya downgrade
+        only_if=has_column("token_blacklist", "token"),
+        upgrade=[
+            Step(
+                sql=(
+                    "CREATE TABLE token_blacklist_new ("
+                    "token_key VARCHAR(64) NOT NULL PRIMARY KEY, "
+                    "blacklisted_at DATETIME NOT NULL, "
+                    "expires_at DATETIME NOT NULL, "
+                    "user_id VARCHAR(25) NOT NULL REFERENCES users (user_id))"
+                ),
+                postgresql=(
+                    "CREATE TABLE token_blacklist_new ("
+                    "token_key VARCHAR(64) NOT NULL, "
+                    "blacklisted_at TIMESTAMP WITHOUT TIME ZONE NOT NULL, "
+                    "expires_at TIMESTAMP WITHOUT TIME ZONE NOT NULL, "
+                    "user_id VARCHAR(25) NOT NULL, "
+                    "CONSTRAINT token_blacklist_new_pkey PRIMARY KEY (token_key), "
+                    "CONSTRAINT token_blacklist_new_user_id_fkey "
+                    "FOREIGN KEY (user_id) REFERENCES users (user_id))"
+                ),
+            ),
+            Step(
+                run=_copy_token_blacklist,
+                description="copy token_blacklist rows, keyed by SHA-256 of the token",
+            ),
+            Step(sql="DROP TABLE token_blacklist"),
+            Step(sql="ALTER TABLE token_blacklist_new RENAME TO token_blacklist"),
+            Step(postgresql="ALTER TABLE token_blacklist RENAME CONSTRAINT token_blacklist_new_pkey TO token_blacklist_pkey"),
+            Step(postgresql="ALTER TABLE token_blacklist RENAME CONSTRAINT token_blacklist_new_user_id_fkey TO token_blacklist_user_id_fkey"),
+            Step(sql="CREATE INDEX ix_token_blacklist_blacklisted_at ON token_blacklist (blacklisted_at)"),
+            Step(sql="CREATE INDEX ix_token_blacklist_expires_at ON token_blacklist (expires_at)"),
+        ],
+    ),
+    Revision(
+        "0005",
+        "Add kurikulum.version",
+        # default konstan: di PostgreSQL 11+ hanya mengubah katalog, tanpa rewrite tabel
+        upgrade=[Step(
+            sql="ALTER TABLE kurikulum ADD COLUMN version INTEGER DEFAULT 1 NOT NULL",
+            only_if=missing_column("kurikulum", "version"),
+        )],
+        downgrade=[Step(
+            sql="ALTER TABLE kurikulum DROP COLUMN version",
+            only_if=has_column("kurikulum", "version"),
+        )],
+    ),
+]
+
+
+def _revision_index(revision: str) -> int:
+    """Posisi revisi di REVISIONS; 'base' = sebelum revisi pertama (-1)"""
+    if revision == "base":
+        return -1
+    if revision == "head":
+        return len(REVISIONS) - 1
+    for i, rev in enumerate(REVISIONS):
+        if rev.revision == revision:
+            return i
+    raise ValueError(f"Unknown revision '{revision}'. Known: base, head, {', '.join(r.revision for r in REVISIONS)}")
+
+
+def applied_revisions(conn: Connection) -> Dict[str, datetime]:
+    if not inspect(conn).has_table(REVISION_TABLE):
+        return {}
+    rows = conn.execute(select(revision_table.c.revision, revision_table.c.applied_at)).all()
+    return {revision: applied_at for revision, applied_at in rows}
+
+
+def pending_revisions(applied: Dict[str, datetime], target: str = "head") -> List[Revision]:
+    end = _revision_index(target)
+    return [rev for rev in REVISIONS[:end + 1] if rev.revision not in applied]
+
+
+def current_revision(applied: Dict[str, datetime]) -> str:
+    done = [rev.revision for rev in REVISIONS if rev.revision in applied]
+    return done[-1] if done else "base"
+
+
+@contextmanager
+def _migration_lock():
+    """Cegah dua proses migrasi berjalan bersamaan (PostgreSQL advisory lock)"""
+    if engine.dialect.name != "postgresql":
+        yield
+        return
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+        try:
+            yield
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_KEY})
+
+
+def _render_step(conn: Connection, step: Step, dialect: str) -> Optional[str]:
+    if step.only_if is not None and not step.only_if(conn):
+        return f"-- skipped (already applied): {step.description or step.statement(dialect)}"
+    if step.run is not None:
+        return f"-- python: {step.description}"
+    statement = step.statement(dialect)
+    if statement is None:
+        return None
+    prefix = "-- outside transaction\n" if step.online and dialect == "postgresql" else ""
+    return f"{prefix}{statement};"
+
+
+def _run_step(conn: Connection, step: Step, dialect: str):
+    if step.only_if is not None and not step.only_if(conn):
+        return
+    if step.run is not None:
+        step.run(conn)
+        return
+    statement = step.statement(dialect)
+    if statement is not None:
+        conn.execute(text(statement))
+
+
+def _apply(steps: List[Step], record: Callable[[Connection], None]):
+    """
+    Jalankan langkah satu revisi. Tanpa langkah online semuanya satu transaksi
+    (DDL PostgreSQL transaksional); dengan langkah online tiap langkah berdiri
+    sendiri dan revisi baru dicatat setelah semua langkah berhasil.
+    """
+    dialect = engine.dialect.name
+    if not (dialect == "postgresql" and any(step.online for step in steps)):
+        with engine.begin() as conn:
+            for step in steps:
+                _run_step(conn, step, dialect)
+            record(conn)
+        return
+
+    for step in steps:
+        if step.online:
+            with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+                _run_step(conn, step, dialect)
+        else:
+            with engine.begin() as conn:
+                _run_step(conn, step, dialect)
+    with engine.begin() as conn:
+        record(conn)
+
+
+def _print_plan(title: str, plan: List[Revision], steps_of: Callable[[Revision], List[Step]]):
+    dialect = engine.dialect.name
+    print(f"-- {title} ({dialect})")
+    with engine.connect() as conn:
+        for rev in plan:
+            print(f"\n-- Revision {rev.revision}: {rev.description}")
+            if rev.only_if is not None and not rev.only_if(conn):
+                print("-- skipped (schema already matches), revision is only recorded")
+                continue
+            for step in steps_of(rev):
+                rendered = _render_step(conn, step, dialect)
+                if rendered:
+                    print(rendered)
+    print()
+
+
+def upgrade(target: str = "head", dry_run: bool = False) -> List[str]:
+    """Jalankan revisi yang belum tercatat sampai target (urut naik)"""
+    with _migration_lock():
+        with engine.connect() as conn:
+            plan = pending_revisions(applied_revisions(conn), target)
+
+        if not plan:
+            print("  ✓ Schema is up to date")
+            return []
+
+        if dry_run:
+            _print_plan(f"upgrade to {target}", plan, lambda rev: rev.upgrade)
+            return [rev.revision for rev in plan]
+
+        revision_table.create(engine, checkfirst=True)
+        for rev in plan:
+            print(f"  → {rev.revision}: {rev.description}")
+            with engine.connect() as conn:
+                needed = rev.only_if is None or rev.only_if(conn)
+            _apply(rev.upgrade if needed else [], lambda conn, rev=rev: conn.execute(insert(revision_table).values(
+                revision=rev.revision, description=rev.description, applied_at=datetime.utcnow()
+            )))
+            print(f"  ✓ {rev.revision} applied" if needed else f"  ✓ {rev.revision} recorded (schema already matches)")
+        return [rev.revision for rev in plan]
+
+
+def downgrade(target: str, dry_run: bool = False) -> List[str]:
+    """Batalkan revisi tercatat yang lebih baru dari target (urut turun)"""
+    start = _revision_index(target)
+    with _migration_lock():
+        with engine.connect() as conn:
+            applied = applied_revisions(conn)
+        plan = [rev for rev in reversed(REVISIONS[start + 1:]) if rev.revision in applied]
+
+        if not plan:
+            print(f"  ✓ Nothing to downgrade (current: {current_revision(applied)})")
+            return []
+
+        irreversible = [rev.revision for rev in plan if rev.downgrade is None]
+        if irreversible:
+            raise RuntimeError(f"Revision(s) {', '.join(irreversible)} cannot be downgraded")
+
+        if dry_run:
+            _print_plan(f"downgrade to {target}", plan, lambda rev: rev.downgrade)
+            return [rev.revision for rev in plan]
+
+        for rev in plan:
+            print(f"  → {rev.revision}: {rev.description}")
+            _apply(rev.downgrade, lambda conn, rev=rev: conn.execute(
+                delete(revision_table).where(revision_table.c.revision == rev.revision)
+            ))
+            print(f"  ✓ {rev.revision} reverted")
+        return [rev.revision for rev in plan]
+
+
+def stamp(target: str = "head"):
+    """Catat revisi sebagai sudah dijalankan tanpa mengeksekusinya (database baru dari create_all)"""
+    revision_table.create(engine, checkfirst=True)
+    with engine.begin() as conn:
+        for rev in pending_revisions(applied_revisions(conn), target):
+            conn.execute(insert(revision_table).values(
+                revision=rev.revision, description=rev.description, applied_at=datetime.utcnow()
+            ))
+
+
+def drop_revision_table():
+    revision_table.drop(engine, checkfirst=True)
+
+
+def show_revisions():
+    """Print revision history with applied status"""
+    with engine.connect() as conn:
+        applied = applied_revisions(conn)
+    print(f"  Current revision: {current_revision(applied)}")
+    for rev in REVISIONS:
+        if rev.revision in applied:
+            print(f"    ✓ {rev.revision} {rev.description} (applied {applied[rev.revision]:%Y-%m-%d %H:%M:%S})")
+        else:
+            print(f"    · {rev.revision} {rev.description} (pending)")
+
+
 def check_tables():
     """Check existing tables in database"""
     try:
@@ -44,8 +425,15 @@ def show_table_info():
     except Exception as e:
         print(f"Error showing table info: {e}")
 
-def migrate():
-    """Run migration - create/update tables"""
+def migrate(target: str = "head", dry_run: bool = False):
+    """Run migration - create missing tables, then apply pending revisions"""
+    if dry_run:
+        print("\n" + "="*60)
+        print(" DATABASE MIGRATION (DRY RUN)")
+        print("="*60 + "\n")
+        upgrade(target, dry_run=True)
+        return
+
     print("\n" + "="*60)
     print(" DATABASE MIGRATION")
     print("="*60 + "\n")
@@ -71,6 +459,14 @@ def migrate():
                 print(f"  ✓ {table} (existing)")
             else:
                 print(f"  ✓ {table} (new)")
+
+        print("\n📦 Applying schema revisions...")
+        if not [table for table in tables_before if table != REVISION_TABLE]:
+            # create_all baru saja membuat skema terkini; revisi cukup dicatat
+            stamp()
+            print(f"  ✓ New database, stamped at revision {REVISIONS[-1].revision}")
+        else:
+            upgrade(target)
         
         print("\n" + "="*60)
         print(" ✅ MIGRATION COMPLETED SUCCESSFULLY!")
@@ -104,9 +500,11 @@ def reset():
         print("\n🗑️  Dropping all tables...")
         try:
             drop_db()
+            drop_revision_table()
             
             print("🔧 Creating tables...")
             init_db()
+            stamp()
             
             print("\n📋 New tables:")
             tables_after = check_tables()
@@ -134,11 +532,17 @@ def status():
     
     try:
         with engine.connect() as conn:
-            result = conn.execute(text("SELECT version()"))
-            version = result.fetchone()[0]
-            print(f"✅ Database connection: OK")
-            print(f"Database: PostgreSQL")
-            print(f"Version: {version.split(',')[0]}\n")
+            print("✅ Database connection: OK")
+            if engine.dialect.name == "postgresql":
+                version = conn.execute(text("SELECT version()")).fetchone()[0]
+                print("Database: PostgreSQL")
+                print(f"Version: {version.split(',')[0]}\n")
+            else:
+                print(f"Database: {engine.dialect.name}\n")
+
+        print("📦 Schema revisions:")
+        show_revisions()
+        print()
         
         tables = check_tables()
         print(f"📊 Total tables: {len(tables)}\n")
@@ -180,6 +584,7 @@ def drop():
         print("\n🗑️  Dropping all tables...")
         try:
             drop_db()
+            drop_revision_table()
             
             remaining = check_tables()
             if not remaining:
@@ -202,6 +607,25 @@ def drop():
     else:
         print("\n❌ Drop cancelled.")
 
+def downgrade_cli(target: str, dry_run: bool = False):
+    """Revert schema revisions down to target"""
+    print("\n" + "="*60)
+    print(f" DATABASE DOWNGRADE TO {target}" + (" (DRY RUN)" if dry_run else ""))
+    print("="*60 + "\n")
+
+    try:
+        downgrade(target, dry_run=dry_run)
+        if not dry_run:
+            print("\n" + "="*60)
+            print(" ✅ DOWNGRADE COMPLETED SUCCESSFULLY!")
+            print("="*60 + "\n")
+    except Exception as e:
+        print(f"\n❌ Error during downgrade: {e}")
+        print("\n" + "="*60)
+        print(" ❌ DOWNGRADE FAILED!")
+        print("="*60 + "\n")
+        raise
+
 def help_text():
     """Show help information"""
     print("\n" + "="*60)
@@ -209,14 +633,19 @@ def help_text():
     print("="*60 + "\n")
     print("Usage: python -m app.utils.migrate [command]\n")
     print("Available commands:")
-    print("  (no args)    Run migration (create/update tables)")
-    print("  --status     Show database status and table information")
+    print("  (no args)        Run migration (create tables + apply pending revisions)")
+    print("  --upgrade REV    Apply revisions up to REV (default: head)")
+    print("  --downgrade REV  Revert revisions newer than REV ('base' = all)")
+    print("  --dry-run        Print the SQL for --upgrade/--downgrade without running it")
+    print("  --status         Show database status, revisions and table information")
     print("  --reset      Drop all tables and recreate")
     print("  --drop       Drop all tables only")
     print("  --help       Show this help message")
     print("\nExamples:")
     print("  python -m app.utils.migrate")
     print("  python -m app.utils.migrate --status")
+    print("  python -m app.utils.migrate --dry-run")
+    print("  python -m app.utils.migrate --downgrade 0003")
     print("  python -m app.utils.migrate --reset")
     print("\n" + "="*60 + "\n")
 
@@ -230,6 +659,8 @@ if __name__ == "__main__":
 Examples:
   python -m app.utils.migrate              
   python -m app.utils.migrate --status     
+  python -m app.utils.migrate --dry-run    
+  python -m app.utils.migrate --downgrade 0003 --dry-run
   python -m app.utils.migrate --reset      
   python -m app.utils.migrate --drop       
         """
@@ -241,6 +672,12 @@ Examples:
                        help='Show database status and table information')
     parser.add_argument('--drop', action='store_true', 
                        help='Drop all tables only')
+    parser.add_argument('--upgrade', metavar='REV', default='head',
+                       help='Apply revisions up to REV (default: head)')
+    parser.add_argument('--downgrade', metavar='REV',
+                       help="Revert revisions newer than REV ('base' = all)")
+    parser.add_argument('--dry-run', action='store_true',
+                       help='Print migration SQL without executing it')
     parser.add_argument('--help-text', action='store_true',
                        help='Show detailed help information')
     
@@ -255,8 +692,10 @@ Examples:
             reset()
         elif args.drop:
             drop()
+        elif args.downgrade:
+            downgrade_cli(args.downgrade, dry_run=args.dry_run)
         else:
-            migrate()
+            migrate(args.upgrade, dry_run=args.dry_run)
     except KeyboardInterrupt:
         print("\n\n⚠️  Operation cancelled by user")
     except Exception as e:
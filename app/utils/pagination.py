@@ -0,0 +1,53 @@
+import base64
+import json
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+from fastapi import HTTPException, status
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encode nilai sort key baris terakhir menjadi cursor opaque (base64url)"""
+    raw = json.dumps([str(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, parsers: Sequence[Callable[[str], Any]]) -> List[Any]:
+    """
+    Decode cursor menjadi nilai sort key.
+
+    parsers berisi fungsi konversi untuk tiap kolom sort key
+    (misalnya uuid.UUID, datetime.fromisoformat, str).
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(values, list) or len(values) != len(parsers):
+            raise ValueError("panjang cursor tidak sesuai")
+        if not all(isinstance(value, str) for value in values):
+            # encode_cursor selalu menulis string; nilai lain berarti cursor dirakit sendiri
+            raise ValueError("nilai cursor harus string")
+        return [parse(value) for parse, value in zip(parsers, values)]
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="cursor tidak valid"
+        )
+
+
+def split_page(
+    rows: Sequence[Any],
+    limit: int,
+    sort_key: Callable[[Any], Tuple]
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Potong hasil query (yang diambil dengan LIMIT limit + 1) menjadi satu halaman.
+
+    Return tuple (baris halaman ini, next_cursor). next_cursor bernilai None
+    jika tidak ada halaman berikutnya.
+    """
+    page = list(rows[:limit])
+    if len(rows) <= limit or not page:
+        return page, None
+    return page, encode_cursor(sort_key(page[-1]))
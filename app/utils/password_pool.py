@@ -0,0 +1,151 @@
+import sys
+from pathlib import Path
+
+if __name__ == "__main__":
+    root_dir = Path(__file__).parent.parent.parent
+    sys.path.insert(0, str(root_dir))
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Optional
+from app.config import settings
+
+
+class PasswordPoolBusy(Exception):
+    """Antrian hash password sudah penuh"""
+
+
+class PasswordHashPool:
+    """
+    Executor khusus untuk bcrypt.
+
+    bcrypt melepas GIL, jadi thread biasa sudah berjalan paralel; yang penting
+    adalah poolnya terpisah dari threadpool anyio milik FastAPI sehingga
+    lonjakan login tidak menghabiskan slot endpoint sync lain. Jumlah job
+    yang menunggu dibatasi max_queue; kelebihannya ditolak (PasswordPoolBusy).
+    """
+
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.peak_pending = 0
+        self.submitted = 0
+        self.rejected = 0
+        self.completed = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers,
+                thread_name_prefix="bcrypt"
+            )
+        return self._executor
+
+    async def run(self, fn: Callable[..., Any], *args) -> Any:
+        with self._lock:
+            if self.pending >= self.workers + self.max_queue:
+                self.rejected += 1
+                raise PasswordPoolBusy()
+            self.pending += 1
+            self.submitted += 1
+            self.peak_pending = max(self.peak_pending, self.pending)
+
+        start = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), partial(fn, *args))
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.pending -= 1
+                self.completed += 1
+                self.total_seconds += elapsed
+                self.max_seconds = max(self.max_seconds, elapsed)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "pending": self.pending,
+                "peak_pending": self.peak_pending,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "avg_ms": round(self.total_seconds / self.completed * 1000, 2) if self.completed else 0.0,
+                "max_ms": round(self.max_seconds * 1000, 2),
+                "bcrypt_rounds": settings.BCRYPT_ROUNDS,
+            }
+
+
+password_pool = PasswordHashPool(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE
+)
+
+
+def bcrypt_rounds(hashed_password: str) -> Optional[int]:
+    """Ambil cost dari hash bcrypt ($2b$12$...), None jika bukan bcrypt"""
+    parts = hashed_password.split("$")
+    if len(parts) < 4 or not parts[1].startswith("2"):
+        return None
+    try:
+        return int(parts[2])
+    except ValueError:
+        return None
+
+
+def calibrate(target_ms: float, min_rounds: int = 10, max_rounds: int = 16, samples: int = 3) -> int:
+    """Pilih cost bcrypt tertinggi yang waktu hash-nya masih <= target_ms"""
+    from passlib.hash import bcrypt
+
+    chosen = min_rounds
+    print(f"\n  Target latency: {target_ms:.0f} ms per hash\n")
+    for rounds in range(min_rounds, max_rounds + 1):
+        hasher = bcrypt.using(rounds=rounds)
+        timings = []
+        for _ in range(samples):
+            start = time.perf_counter()
+            hasher.hash("calibration-password")
+            timings.append((time.perf_counter() - start) * 1000)
+        elapsed = sorted(timings)[len(timings) // 2]
+        marker = "✓" if elapsed <= target_ms else "✗"
+        print(f"  {marker} rounds={rounds:2d}  {elapsed:8.1f} ms")
+        if elapsed > target_ms:
+            break
+        chosen = rounds
+    return chosen
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Bcrypt Cost Calibration')
+    parser.add_argument('--target-ms', type=float, default=250.0,
+                       help='Target latency per hash in milliseconds (default: 250)')
+    parser.add_argument('--samples', type=int, default=3,
+                       help='Number of samples per cost (median is used)')
+    args = parser.parse_args()
+
+    print("\n" + "="*60)
+    print(" BCRYPT COST CALIBRATION")
+    print("="*60)
+
+    rounds = calibrate(args.target_ms, samples=args.samples)
+
+    print(f"\n  Recommended: BCRYPT_ROUNDS={rounds} (current: {settings.BCRYPT_ROUNDS})")
+    print("  Stored hashes with a different cost are rehashed on next login.")
+    print("\n" + "="*60 + "\n")
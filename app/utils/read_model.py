@@ -0,0 +1,269 @@
+import asyncio
+import sys
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.config import settings
+from app.db import async_session
+from app.models.kurikulum import Kurikulum
+from app.models.cpl import CPL
+from app.models.indikator import IndikatorCPL
+from app.models.matkul import MataKuliah
+from app.models.cpl_matkul import CPLMataKuliah
+from app.utils.shared_cache import CacheNamespace, cache_backend
+
+# batas entry generation per kurikulum; lewat dari ini diganti satu kenaikan epoch
+GENERATION_LIMIT = 4096
+
+# L2 di backend bersama; key memuat version sehingga tidak perlu diinvalidasi
+graph_cache = CacheNamespace("kurikulum_graph", ttl=settings.READ_MODEL_SHARED_TTL_SECONDS)
+
+
+@dataclass
+class KurikulumGraph:
+    """
+    Snapshot read-only satu kurikulum beserta CPL, indikator dan mata
+    kuliahnya. Semua nilai sudah bertipe JSON (model_dump mode json) agar
+    sama persis baik dari database maupun dari cache bersama.
+    """
+    kurikulum: dict
+    cpl: List[dict]
+    indikator_by_cpl: Dict[str, List[dict]]
+    matkul_by_cpl: Dict[str, List[dict]]
+    cpl_by_id: Dict[str, dict] = field(init=False)
+    approx_bytes: int = field(init=False)
+
+    def __post_init__(self):
+        self.cpl_by_id = {c["id_cpl"]: c for c in self.cpl}
+        self.approx_bytes = _approx_size(
+            [self.kurikulum, self.cpl, self.indikator_by_cpl, self.matkul_by_cpl]
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "kurikulum": self.kurikulum,
+            "cpl": self.cpl,
+            "indikator_by_cpl": self.indikator_by_cpl,
+            "matkul_by_cpl": self.matkul_by_cpl,
+        }
+
+
+def _approx_size(obj) -> int:
+    """Perkiraan ukuran memori (sys.getsizeof rekursif untuk dict/list)"""
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(_approx_size(k) + _approx_size(v) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple)):
+        size += sum(_approx_size(item) for item in obj)
+    return size
+
+
+async def load_kurikulum_graph(session: AsyncSession, id_kurikulum: uuid.UUID) -> Optional[KurikulumGraph]:
+    """Memuat graf satu kurikulum dengan 4 query (kurikulum, cpl, indikator, relasi+matkul)"""
+    kurikulum = await session.get(Kurikulum, id_kurikulum)
+    if kurikulum is None:
+        return None
+
+    cpl_rows = (await session.exec(
+        select(CPL)
+        .where(CPL.id_kurikulum == id_kurikulum)
+        .order_by(CPL.id_cpl)
+    )).all()
+
+    indikator_rows = (await session.exec(
+        select(IndikatorCPL)
+        .where(IndikatorCPL.id_kurikulum == id_kurikulum)
+        .order_by(IndikatorCPL.id_cpl, IndikatorCPL.id_indikator)
+    )).all()
+
+    matkul_rows = (await session.exec(
+        select(CPLMataKuliah.id_cpl, MataKuliah)
+        .join(MataKuliah, MataKuliah.id_matkul == CPLMataKuliah.id_matkul)
+        .where(CPLMataKuliah.id_kurikulum == id_kurikulum)
+        .order_by(CPLMataKuliah.id_cpl, MataKuliah.id_matkul)
+    )).all()
+
+    indikator_by_cpl: Dict[str, List[dict]] = {}
+    for row in indikator_rows:
+        indikator_by_cpl.setdefault(row.id_cpl, []).append(row.model_dump(mode="json"))
+
+    matkul_by_cpl: Dict[str, List[dict]] = {}
+    for id_cpl, matkul in matkul_rows:
+        matkul_by_cpl.setdefault(id_cpl, []).append(matkul.model_dump(mode="json"))
+
+    return KurikulumGraph(
+        kurikulum=kurikulum.model_dump(mode="json"),
+        cpl=[row.model_dump(mode="json") for row in cpl_rows],
+        indikator_by_cpl=indikator_by_cpl,
+        matkul_by_cpl=matkul_by_cpl
+    )
+
+
+class CurriculumReadModel:
+    """
+    Read model in-process untuk graf kurikulum, dimuat lazy per kurikulum.
+
+    - Endpoint baca memakai get(); miss bersamaan untuk kurikulum yang sama
+      hanya memuat sekali (single-flight) dengan session sendiri.
+    - Setiap create/patch/delete di router memanggil invalidate() setelah
+      commit. Load yang sedang berjalan saat invalidasi tidak disimpan
+      (dicek lewat generation per kurikulum dan epoch global yang naik
+      setiap clear()), jadi data lama tidak masuk kembali.
+    - Worker lain dibersihkan lewat LISTEN/NOTIFY (app.utils.invalidation);
+      TTL tetap membatasi umur entry sebagai pengaman.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._graphs: "OrderedDict[uuid.UUID, tuple[float, KurikulumGraph]]" = OrderedDict()
+        self._inflight: "dict[uuid.UUID, asyncio.Future]" = {}
+        self._generation: Dict[uuid.UUID, int] = {}
+        self._epoch = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.loads = 0
+        self.load_seconds = 0.0
+        self.invalidations = 0
+        self.evictions = 0
+        self.suspended = False
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0 and self.ttl > 0 and not self.suspended
+
+    def cached_version(self, id_kurikulum: uuid.UUID) -> Optional[int]:
+        """Version kurikulum dari graf yang masih segar di memori, tanpa memicu load"""
+        entry = self._graphs.get(id_kurikulum)
+        if entry is None or time.monotonic() - entry[0] >= self.ttl:
+            return None
+        return entry[1].kurikulum["version"]
+
+    async def get(self, id_kurikulum: uuid.UUID) -> Optional[KurikulumGraph]:
+        entry = self._graphs.get(id_kurikulum)
+        if entry is not None:
+            loaded_at, graph = entry
+            if time.monotonic() - loaded_at < self.ttl:
+                self._graphs.move_to_end(id_kurikulum)
+                self.hits += 1
+                return graph
+            del self._graphs[id_kurikulum]
+
+        future = self._inflight.get(id_kurikulum)
+        if future is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            future = asyncio.ensure_future(self._load(id_kurikulum))
+            self._inflight[id_kurikulum] = future
+            future.add_done_callback(lambda f: self._forget(id_kurikulum, f))
+        return await asyncio.shield(future)
+
+    async def _load(self, id_kurikulum: uuid.UUID) -> Optional[KurikulumGraph]:
+        epoch = self._epoch
+        generation = self._generation.get(id_kurikulum, 0)
+        started = time.perf_counter()
+        async with async_session() as session:
+            graph = await self._load_graph(session, id_kurikulum)
+        self.loads += 1
+        self.load_seconds += time.perf_counter() - started
+
+        if (
+            graph is not None
+            and self.enabled
+            and self._epoch == epoch
+            and self._generation.get(id_kurikulum, 0) == generation
+        ):
+            self._graphs[id_kurikulum] = (time.monotonic(), graph)
+            self._graphs.move_to_end(id_kurikulum)
+            while len(self._graphs) > self.maxsize:
+                self._graphs.popitem(last=False)
+                self.evictions += 1
+        return graph
+
+    async def _load_graph(self, session: AsyncSession, id_kurikulum: uuid.UUID) -> Optional[KurikulumGraph]:
+        if not cache_backend.shared:
+            return await load_kurikulum_graph(session, id_kurikulum)
+
+        # dengan backend bersama: cek version (lookup PK), lalu ambil graf
+        # versi itu dari worker/host lain sebelum memuat dari database
+        version = (await session.exec(
+            select(Kurikulum.version).where(Kurikulum.id_kurikulum == id_kurikulum)
+        )).first()
+        if version is None:
+            return None
+
+        data = await graph_cache.get(f"{id_kurikulum}:{version}")
+        if data is not None:
+            return KurikulumGraph(**data)
+
+        graph = await load_kurikulum_graph(session, id_kurikulum)
+        if graph is not None:
+            await graph_cache.set(f"{id_kurikulum}:{graph.kurikulum['version']}", graph.to_dict())
+        return graph
+
+    def _forget(self, id_kurikulum: uuid.UUID, future: "asyncio.Future"):
+        if self._inflight.get(id_kurikulum) is future:
+            del self._inflight[id_kurikulum]
+        if not future.cancelled():
+            future.exception()
+
+    def invalidate(self, *id_kurikulum_list: uuid.UUID):
+        """Buang graf kurikulum yang berubah; panggil setelah commit"""
+        if len(self._generation) + len(id_kurikulum_list) > GENERATION_LIMIT:
+            # epoch baru membatalkan semua load yang sedang jalan, jadi
+            # generation per kurikulum boleh dibuang
+            self._epoch += 1
+            self._generation.clear()
+        for id_kurikulum in id_kurikulum_list:
+            self._generation[id_kurikulum] = self._generation.get(id_kurikulum, 0) + 1
+            self._graphs.pop(id_kurikulum, None)
+            self._inflight.pop(id_kurikulum, None)
+            self.invalidations += 1
+
+    def clear(self):
+        """Kosongkan semua graf; load yang mulai sebelum ini tidak akan disimpan"""
+        self._epoch += 1
+        self._generation.clear()
+        self._graphs.clear()
+        self._inflight.clear()
+
+    def suspend(self):
+        """Kosongkan dan berhenti menyimpan graf (invalidasi antar worker sedang tidak terjamin)"""
+        self.suspended = True
+        self.clear()
+
+    def resume(self):
+        self.clear()
+        self.suspended = False
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "enabled": self.enabled,
+            "suspended": self.suspended,
+            "entries": len(self._graphs),
+            "maxsize": self.maxsize,
+            "ttl_s": self.ttl,
+            "approx_bytes": sum(graph.approx_bytes for _, graph in self._graphs.values()),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "loads": self.loads,
+            "avg_load_ms": round(self.load_seconds / self.loads * 1000, 2) if self.loads else 0.0,
+            "invalidations": self.invalidations,
+            "evictions": self.evictions,
+            "shared": graph_cache.stats() if cache_backend.shared else None,
+        }
+
+
+read_model = CurriculumReadModel(
+    maxsize=settings.READ_MODEL_MAX_KURIKULUM,
+    ttl=settings.READ_MODEL_TTL_SECONDS
+)
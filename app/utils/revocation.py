@@ -0,0 +1,182 @@
+import asyncio
+import hashlib
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+from jose import JWTError, jwt
+from sqlmodel import select, delete
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.config import settings
+from app.db import async_session
+from app.models.token_blacklist import TokenBlacklist
+
+# Toleransi selisih jam antar worker/host saat refresh incremental
+REFRESH_OVERLAP = timedelta(seconds=60)
+
+# Salinan in-memory dianggap basi setelah sekian kali interval refresh tanpa refresh sukses
+STALE_AFTER_REFRESHES = 2
+
+
+def revocation_key(token: str) -> str:
+    """
+    Key pendek untuk revocation: claim jti, atau SHA-256 hex dari token
+    untuk token lama yang diterbitkan sebelum jti ditambahkan.
+    """
+    try:
+        jti = jwt.get_unverified_claims(token).get("jti")
+    except JWTError:
+        jti = None
+    if jti:
+        return str(jti)[:64]
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+class RevocationStore:
+    """
+    Salinan in-memory dari token_blacklist yang belum kadaluarsa.
+
+    Dimuat penuh saat startup, lalu di-refresh secara incremental
+    (berdasarkan blacklisted_at) agar revocation dari worker lain ikut
+    terlihat. Selama refresh terakhir masih baru, pengecekan token tidak
+    menyentuh database sama sekali. Jika refresh gagal terus (database
+    putus dsb.), salinan dianggap basi dan token yang tidak ada di memori
+    dicek lagi ke tabel per request.
+    """
+
+    def __init__(self):
+        self._revoked: Dict[str, datetime] = {}
+        self._watermark: Optional[datetime] = None
+        self.loaded = False
+        self._refreshed_at: Optional[float] = None
+        self.memory_lookups = 0
+        self.stale_lookups = 0
+        self.db_lookups = 0
+        self.swept = 0
+
+    def add(self, key: str, expires_at: datetime):
+        self._revoked[key] = expires_at
+
+    def is_revoked_locally(self, key: str) -> bool:
+        expires_at = self._revoked.get(key)
+        if expires_at is None:
+            return False
+        if expires_at <= datetime.utcnow():
+            self._revoked.pop(key, None)
+            return False
+        return True
+
+    def refresh_age(self) -> Optional[float]:
+        """Detik sejak load/refresh terakhir yang sukses"""
+        if self._refreshed_at is None:
+            return None
+        return time.monotonic() - self._refreshed_at
+
+    @property
+    def stale(self) -> bool:
+        age = self.refresh_age()
+        return age is None or age > settings.REVOCATION_REFRESH_SECONDS * STALE_AFTER_REFRESHES
+
+    async def is_revoked(self, session: AsyncSession, key: str) -> bool:
+        if self.loaded:
+            if self.is_revoked_locally(key):
+                self.memory_lookups += 1
+                return True
+            if not self.stale:
+                self.memory_lookups += 1
+                return False
+            self.stale_lookups += 1
+
+        self.db_lookups += 1
+        row = (await session.exec(
+            select(TokenBlacklist.token_key).where(TokenBlacklist.token_key == key)
+        )).first()
+        return row is not None
+
+    async def load(self, session: AsyncSession):
+        """Muat ulang semua entry yang belum kadaluarsa"""
+        now = datetime.utcnow()
+        rows = (await session.exec(
+            select(TokenBlacklist.token_key, TokenBlacklist.expires_at, TokenBlacklist.blacklisted_at)
+            .where(TokenBlacklist.expires_at > now)
+        )).all()
+
+        self._revoked = {key: expires_at for key, expires_at, _ in rows}
+        self._watermark = max((b for _, _, b in rows), default=now)
+        self.loaded = True
+        self._refreshed_at = time.monotonic()
+
+    async def refresh(self, session: AsyncSession):
+        """Ambil entry baru sejak refresh terakhir (termasuk dari worker lain)"""
+        if self._watermark is None:
+            await self.load(session)
+            return
+
+        rows = (await session.exec(
+            select(TokenBlacklist.token_key, TokenBlacklist.expires_at, TokenBlacklist.blacklisted_at)
+            .where(
+                TokenBlacklist.blacklisted_at > self._watermark - REFRESH_OVERLAP,
+                TokenBlacklist.expires_at > datetime.utcnow()
+            )
+        )).all()
+
+        for key, expires_at, blacklisted_at in rows:
+            self._revoked[key] = expires_at
+            if blacklisted_at > self._watermark:
+                self._watermark = blacklisted_at
+        self._refreshed_at = time.monotonic()
+
+    async def sweep(self, session: AsyncSession) -> int:
+        """Hapus entry yang sudah kadaluarsa dari tabel dan dari memori"""
+        now = datetime.utcnow()
+        result = await session.exec(
+            delete(TokenBlacklist).where(TokenBlacklist.expires_at <= now)
+        )
+        await session.commit()
+
+        for key in [k for k, exp in self._revoked.items() if exp <= now]:
+            self._revoked.pop(key, None)
+
+        deleted = result.rowcount or 0
+        self.swept += deleted
+        return deleted
+
+    async def run(self):
+        """Loop background: refresh berkala dan sweep entry kadaluarsa"""
+        last_sweep = 0.0
+        loop = asyncio.get_running_loop()
+
+        while True:
+            try:
+                async with async_session() as session:
+                    if not self.loaded:
+                        await self.load(session)
+                    else:
+                        await self.refresh(session)
+
+                    if loop.time() - last_sweep >= settings.REVOCATION_SWEEP_SECONDS:
+                        deleted = await self.sweep(session)
+                        last_sweep = loop.time()
+                        if deleted:
+                            print(f"✓ Token blacklist sweep: {deleted} expired entries removed")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"⚠️  Revocation store refresh failed: {e}")
+
+            await asyncio.sleep(settings.REVOCATION_REFRESH_SECONDS)
+
+    def stats(self) -> dict:
+        age = self.refresh_age()
+        return {
+            "loaded": self.loaded,
+            "stale": self.stale,
+            "last_refresh_age_s": None if age is None else round(age, 1),
+            "entries": len(self._revoked),
+            "memory_lookups": self.memory_lookups,
+            "stale_lookups": self.stale_lookups,
+            "db_lookups": self.db_lookups,
+            "swept": self.swept,
+        }
+
+
+revocation_store = RevocationStore()
@@ -0,0 +1,206 @@
+import uuid
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Dict, Iterable, List, Optional
+from app.config import settings
+from app.utils.cache import TTLCache
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - fallback ke json bawaan
+    orjson = None
+    import json
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(value: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value, default=_json_default)
+    return json.dumps(value, default=_json_default, separators=(",", ":")).encode("utf-8")
+
+
+def loads(data: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class MemoryBackend:
+    """Backend in-process: satu TTLCache per worker, tidak dibagi antar worker"""
+
+    name = "memory"
+    shared = False
+
+    def __init__(self, maxsize: int, max_ttl: float):
+        self._cache = TTLCache(maxsize=maxsize, ttl=max_ttl)
+
+    async def get_many(self, keys: List[str]) -> List[Optional[bytes]]:
+        return [self._cache.get(key) for key in keys]
+
+    async def set_many(self, items: Dict[str, bytes], ttl: float):
+        for key, value in items.items():
+            self._cache.set(key, value, ttl=ttl)
+
+    async def delete_many(self, keys: List[str]):
+        for key in keys:
+            self._cache.delete(key)
+
+    async def close(self):
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        return {"backend": self.name, **self._cache.stats()}
+
+
+class RedisBackend:
+    """
+    Backend protokol Redis (Redis, Valkey, KeyDB, ...), dibagi semua worker
+    dan host. Butuh paket `redis` (opsional).
+    """
+
+    name = "redis"
+    shared = True
+
+    def __init__(self, url: str, timeout: float):
+        import redis.asyncio as redis
+
+        self.url = url
+        self._client = redis.from_url(
+            url,
+            socket_timeout=timeout,
+            socket_connect_timeout=timeout
+        )
+
+    async def get_many(self, keys: List[str]) -> List[Optional[bytes]]:
+        return await self._client.mget(keys)
+
+    async def set_many(self, items: Dict[str, bytes], ttl: float):
+        pipe = self._client.pipeline(transaction=False)
+        for key, value in items.items():
+            pipe.set(key, value, px=max(1, int(ttl * 1000)))
+        await pipe.execute()
+
+    async def delete_many(self, keys: List[str]):
+        await self._client.delete(*keys)
+
+    async def close(self):
+        await self._client.aclose()
+
+    def stats(self) -> dict:
+        return {"backend": self.name, "url": self.url.split("@")[-1]}
+
+
+def _build_backend():
+    if settings.CACHE_BACKEND == "redis":
+        try:
+            return RedisBackend(settings.CACHE_REDIS_URL, settings.CACHE_OP_TIMEOUT)
+        except ImportError:
+            print("⚠️  CACHE_BACKEND=redis tetapi paket redis tidak terpasang, memakai memory")
+    elif settings.CACHE_BACKEND != "memory":
+        print(f"⚠️  CACHE_BACKEND '{settings.CACHE_BACKEND}' tidak dikenal, memakai memory")
+    return MemoryBackend(settings.CACHE_MEMORY_MAX_ENTRIES, settings.CACHE_MEMORY_MAX_TTL_SECONDS)
+
+
+cache_backend = _build_backend()
+
+
+class CacheNamespace:
+    """
+    Akses cache untuk satu namespace: key diberi prefix
+    `<CACHE_KEY_PREFIX>:<namespace>:`, value diserialisasi JSON (orjson).
+
+    Error backend (mis. Redis tidak bisa dihubungi) dihitung dan
+    diperlakukan sebagai miss, tidak pernah menggagalkan request.
+    """
+
+    def __init__(self, namespace: str, ttl: float):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.errors = 0
+
+    def _key(self, key: str) -> str:
+        return f"{settings.CACHE_KEY_PREFIX}:{self.namespace}:{key}"
+
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        keys = list(keys)
+        if not keys or self.ttl <= 0:
+            return {}
+        try:
+            raw = await cache_backend.get_many([self._key(key) for key in keys])
+        except Exception:
+            self.errors += 1
+            return {}
+
+        found = {}
+        for key, data in zip(keys, raw):
+            if data is None:
+                continue
+            try:
+                found[key] = loads(data)
+            except ValueError:
+                self.errors += 1
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    async def get(self, key: str) -> Optional[Any]:
+        return (await self.get_many([key])).get(key)
+
+    async def set_many(self, items: Dict[str, Any], ttl: Optional[float] = None):
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if not items or ttl <= 0:
+            return
+        try:
+            await cache_backend.set_many(
+                {self._key(key): dumps(value) for key, value in items.items()}, ttl
+            )
+            self.writes += len(items)
+        except Exception:
+            self.errors += 1
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        await self.set_many({key: value}, ttl=ttl)
+
+    async def delete(self, *keys: str):
+        if not keys:
+            return
+        try:
+            await cache_backend.delete_many([self._key(key) for key in keys])
+        except Exception:
+            self.errors += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "namespace": self.namespace,
+            "ttl_s": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "writes": self.writes,
+            "errors": self.errors,
+        }
+
+
+async def close_cache_backend():
+    await cache_backend.close()
+
+
+def cache_backend_stats() -> dict:
+    return {
+        "shared": cache_backend.shared,
+        "codec": "orjson" if orjson is not None else "json",
+        **cache_backend.stats()
+    }
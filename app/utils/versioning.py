@@ -0,0 +1,95 @@
+import hashlib
+import uuid
+from typing import Optional
+from fastapi import Request, Response, status
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import select, update
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.models.catalog_version import CatalogVersion
+from app.models.kurikulum import Kurikulum
+from app.utils.invalidation import publish_invalidation
+
+# daftar mata kuliah memuat data matkul dan CPL dari semua kurikulum
+MATKUL_CATALOG = "matkul"
+
+
+async def bump_catalog_version(session: AsyncSession, name: str = MATKUL_CATALOG):
+    """Naikkan version katalog (upsert satu baris, dibuat saat pertama kali dipakai)"""
+    dialect = postgresql if session.bind.dialect.name == "postgresql" else sqlite
+    statement = dialect.insert(CatalogVersion).values(name=name, version=1)
+    await session.exec(statement.on_conflict_do_update(
+        index_elements=[CatalogVersion.name],
+        set_={"version": CatalogVersion.version + 1}
+    ))
+
+
+async def load_catalog_version(session: AsyncSession, name: str = MATKUL_CATALOG) -> int:
+    """Version katalog lewat lookup primary key (0 jika belum pernah berubah)"""
+    version = (await session.exec(
+        select(CatalogVersion.version).where(CatalogVersion.name == name)
+    )).first()
+    return version or 0
+
+
+async def bump_kurikulum_version(
+    session: AsyncSession,
+    *id_kurikulum_list: uuid.UUID,
+    matkul_catalog: bool = False
+):
+    """
+    Naikkan version kurikulum yang berubah dan umumkan ke worker lain (NOTIFY),
+    di transaksi yang sama dengan perubahannya (panggil sebelum commit).
+
+    matkul_catalog=True hanya untuk perubahan yang mengubah isi GET /matkul/
+    (data matkul, relasinya, atau data CPL yang ikut ditampilkan); baris
+    katalog itu satu untuk seluruh sistem, jadi penulisan lain tidak
+    boleh ikut mengantre di lock-nya.
+    """
+    if matkul_catalog:
+        await bump_catalog_version(session)
+    ids = list(set(id_kurikulum_list))
+    if not ids:
+        return
+    await session.exec(
+        update(Kurikulum)
+        .where(Kurikulum.id_kurikulum.in_(ids))
+        .values(version=Kurikulum.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    await publish_invalidation(session, *ids)
+
+
+async def load_kurikulum_version(session: AsyncSession, id_kurikulum: uuid.UUID) -> Optional[int]:
+    """Ambil version saja (lookup primary key), tanpa memuat graf kurikulum"""
+    return (await session.exec(
+        select(Kurikulum.version).where(Kurikulum.id_kurikulum == id_kurikulum)
+    )).first()
+
+
+def make_etag(*parts) -> str:
+    """ETag kuat dari bagian-bagian validator"""
+    digest = hashlib.sha1(":".join(str(p) for p in parts).encode()).hexdigest()[:24]
+    return f'"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Cek If-None-Match (perbandingan weak sesuai RFC 9110)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in header.split(",")]
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def not_modified(etag: str) -> Response:
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": "private, no-cache"}
+    )
+
+
+def set_etag(response: Response, etag: str):
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"
@@ -0,0 +1,44 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# Settings dibaca saat import, jadi env harus diset sebelum modul app di-import
+_db_path = Path(tempfile.mkdtemp()) / "test.db"
+os.environ["DATABASE_URL"] = f"sqlite:///{_db_path}"
+os.environ["ASYNC_DATABASE_URL"] = f"sqlite+aiosqlite:///{_db_path}"
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("COCKTAIL_API_KEY", "1")
+os.environ.setdefault("COCKTAIL_BASE_URL", "http://127.0.0.1:9/api/json/v1")
+os.environ["COCKTAIL_CATALOG_ENABLED"] = "false"
+os.environ["CACHE_BACKEND"] = "memory"
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlmodel import SQLModel  # noqa: E402
+from app.db import engine, init_db  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.user import User, RoleEnum  # noqa: E402
+from app.utils.auth import get_current_user  # noqa: E402
+from app.utils.read_model import read_model  # noqa: E402
+
+
+@pytest.fixture
+def db():
+    """Skema kosong untuk setiap test"""
+    SQLModel.metadata.drop_all(engine)
+    init_db()
+    read_model.clear()
+    yield engine
+
+
+@pytest.fixture
+def client(db):
+    kadep = User(user_id="1234567890", nama="Kadep", password="", role=RoleEnum.kadep)
+    app.dependency_overrides[get_current_user] = lambda: kadep
+    with TestClient(app) as c:
+        yield c
+    app.dependency_overrides.clear()
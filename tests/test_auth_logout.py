@@ -0,0 +1,68 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from sqlmodel import Session
+
+from app.config import settings
+from app.db import async_session
+from app.models.token_blacklist import TokenBlacklist
+from app.models.user import RoleEnum, User
+from app.utils.auth import create_access_token
+from app.utils.revocation import STALE_AFTER_REFRESHES, RevocationStore, revocation_key, revocation_store
+
+
+def test_logout_of_token_revoked_by_another_worker(db, client):
+    token = create_access_token({"sub": "1234567890", "nama": "Kadep", "role": "kadep"})
+    key = revocation_key(token)
+    with Session(db) as session:
+        session.add(User(user_id="1234567890", nama="Kadep", password="x", role=RoleEnum.kadep))
+        session.add(TokenBlacklist(
+            token_key=key,
+            user_id="1234567890",
+            expires_at=datetime.utcnow() + timedelta(hours=1)
+        ))
+        session.commit()
+
+    # salinan lokal belum melihat revoke dari worker lain
+    revocation_store._revoked.pop(key, None)
+    assert not revocation_store.is_revoked_locally(key)
+
+    headers = {"Authorization": f"Bearer {token}"}
+    response = client.post("/auth/logout", headers=headers)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Token already revoked"
+    assert revocation_store.is_revoked_locally(key)
+
+
+def test_stale_store_checks_the_table_on_memory_miss(db):
+    async def scenario():
+        store = RevocationStore()
+        async with async_session() as session:
+            await store.load(session)
+
+        with Session(db) as session:
+            session.add(User(user_id="1234567890", nama="Kadep", password="x", role=RoleEnum.kadep))
+            session.add(TokenBlacklist(
+                token_key="revoked-elsewhere",
+                user_id="1234567890",
+                expires_at=datetime.utcnow() + timedelta(hours=1)
+            ))
+            session.commit()
+
+        async with async_session() as session:
+            # refresh masih baru: salinan di memori dipercaya
+            assert not store.stale
+            assert not await store.is_revoked(session, "revoked-elsewhere")
+
+            # refresh gagal terus sampai melewati batas: miss dicek ke tabel
+            store._refreshed_at -= settings.REVOCATION_REFRESH_SECONDS * STALE_AFTER_REFRESHES + 1
+            assert store.stale
+            assert await store.is_revoked(session, "revoked-elsewhere")
+            assert not await store.is_revoked(session, "never-revoked")
+            assert store.stats()["stale_lookups"] == 2
+
+            await store.refresh(session)
+            assert not store.stale
+            assert store.is_revoked_locally("revoked-elsewhere")
+
+    asyncio.run(scenario())
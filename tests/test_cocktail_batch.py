@@ -0,0 +1,40 @@
+import asyncio
+
+from app.utils import cocktail_service
+from app.utils.cache import SWRCache
+from app.utils.cocktail_service import cache_key, fetch_cocktail_details
+
+
+def drink(cocktail_id, name):
+    return {"drinks": [{"idDrink": cocktail_id, "strDrink": name}]}
+
+
+def test_batch_serves_stale_ids_and_refreshes_them(monkeypatch):
+    cache = SWRCache(maxsize=100, ttl=60, stale_ttl=60)
+    monkeypatch.setattr(cocktail_service, "cocktail_cache", cache)
+    loaded = []
+
+    async def fake_load_json(path, params):
+        loaded.append(params["i"])
+        return drink(params["i"], f"baru {params['i']}")
+
+    monkeypatch.setattr(cocktail_service, "_load_json", fake_load_json)
+
+    async def scenario():
+        cache.set(cache_key("/lookup.php", {"i": "1"}), drink("1", "segar"))
+        cache.set(cache_key("/lookup.php", {"i": "2"}), drink("2", "basi"))
+        stored_at, value = cache._data[cache_key("/lookup.php", {"i": "2"})]
+        cache._data[cache_key("/lookup.php", {"i": "2"})] = (stored_at - 90, value)
+
+        results, failed = await fetch_cocktail_details(["1", "2", "3", "2"])
+        assert failed == []
+        assert {k: v["strDrink"] for k, v in results.items()} == {"1": "segar", "2": "basi", "3": "baru 3"}
+        assert list(results) == ["1", "2", "3"]
+
+        # entry basi dikembalikan apa adanya, refresh-nya berjalan di background
+        await asyncio.sleep(0)
+        assert sorted(loaded) == ["2", "3"]
+        assert cache.stale_hits == 1
+        assert cache.peek(cache_key("/lookup.php", {"i": "2"}))["drinks"][0]["strDrink"] == "baru 2"
+
+    asyncio.run(scenario())
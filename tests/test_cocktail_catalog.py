@@ -0,0 +1,21 @@
+import asyncio
+
+from app.utils import cocktail_catalog as catalog_module
+from app.utils.cocktail_catalog import CocktailCatalog
+
+
+def test_catalogue_includes_names_starting_with_a_digit(monkeypatch):
+    upstream = {
+        "b": [{"idDrink": "1", "strDrink": "Belmont Breeze"}],
+        "1": [{"idDrink": "2", "strDrink": "155 Belmont"}],
+    }
+
+    async def fake_fetch(letter):
+        return {"drinks": upstream.get(letter)}
+
+    monkeypatch.setattr(catalog_module, "fetch_cocktails_by_letter", fake_fetch)
+    catalog = CocktailCatalog()
+    assert asyncio.run(catalog.refresh()) == 2
+
+    result = catalog.search("belmont")
+    assert [drink["strDrink"] for drink in result["drinks"]] == ["155 Belmont", "Belmont Breeze"]
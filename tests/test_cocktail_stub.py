@@ -0,0 +1,16 @@
+from fastapi.testclient import TestClient
+
+from app.utils import cocktail_stub
+
+
+def test_stub_builds_catalogue_when_served_by_uvicorn(monkeypatch):
+    monkeypatch.setattr(cocktail_stub.config, "latency_ms", 0.0)
+    monkeypatch.setattr(cocktail_stub.config, "jitter_ms", 0.0)
+    monkeypatch.setattr(cocktail_stub.config, "drinks", 50)
+    cocktail_stub._catalogue.clear()
+    cocktail_stub._by_id.clear()
+
+    with TestClient(cocktail_stub.app) as client:
+        response = client.get("/api/json/v1/1/lookup.php", params={"i": "10000"})
+        assert response.json()["drinks"][0]["idDrink"] == "10000"
+        assert len(cocktail_stub._catalogue) == 50
@@ -0,0 +1,107 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from app.config import settings
+from app.utils import cocktail_service
+from app.utils.cache import SWRCache
+from app.utils.circuit_breaker import CLOSED, OPEN, CircuitBreaker
+from app.utils.cocktail_service import cache_key
+
+
+class Upstream:
+    """Upstream palsu lewat httpx.MockTransport; perilakunya diganti per skenario"""
+
+    def __init__(self):
+        self.calls = 0
+        self.status = 200
+        self.delay = 0.0
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        self.calls += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.status != 200:
+            return httpx.Response(self.status, json={"error": "upstream"})
+        cocktail_id = request.url.params["i"]
+        return httpx.Response(200, json={"drinks": [{"idDrink": cocktail_id, "strDrink": f"baru {cocktail_id}"}]})
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    fake = Upstream()
+    monkeypatch.setattr(cocktail_service, "_client", httpx.AsyncClient(
+        transport=httpx.MockTransport(fake.handle), base_url="http://upstream/key"
+    ))
+    monkeypatch.setattr(cocktail_service, "upstream_breaker", CircuitBreaker(
+        "cocktail", failure_threshold=2, reset_timeout=0.2
+    ))
+    monkeypatch.setattr(cocktail_service, "cocktail_cache", SWRCache(maxsize=100, ttl=60, stale_ttl=60))
+    monkeypatch.setattr(settings, "COCKTAIL_RETRY_ATTEMPTS", 1)
+    monkeypatch.setattr(settings, "COCKTAIL_DEADLINE_SECONDS", 1.0)
+    return fake
+
+
+def test_breaker_trips_rejects_and_recovers(client, upstream):
+    upstream.status = 500
+    assert client.get("/api/cocktails/1").status_code == 500
+    assert client.get("/api/cocktails/2").status_code == 500
+    assert cocktail_service.upstream_breaker.state == OPEN
+
+    # breaker terbuka: ditolak tanpa menyentuh upstream
+    response = client.get("/api/cocktails/3")
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+    assert upstream.calls == 2
+
+    # setelah reset_timeout satu probe half-open diizinkan; sukses menutup breaker
+    time.sleep(0.25)
+    upstream.status = 200
+    response = client.get("/api/cocktails/4")
+    assert response.status_code == 200
+    assert response.json()["drinks"][0]["idDrink"] == "4"
+    assert cocktail_service.upstream_breaker.state == CLOSED
+    assert client.get("/api/cocktails/5").status_code == 200
+    assert upstream.calls == 4
+
+
+def test_failed_probe_reopens_the_breaker(client, upstream):
+    upstream.status = 503
+    client.get("/api/cocktails/1")
+    client.get("/api/cocktails/2")
+    time.sleep(0.25)
+    assert client.get("/api/cocktails/3").status_code == 500
+    assert cocktail_service.upstream_breaker.state == OPEN
+    assert client.get("/api/cocktails/4").status_code == 503
+    assert upstream.calls == 3
+
+
+def test_deadline_exceeded_is_504(client, upstream, monkeypatch):
+    monkeypatch.setattr(settings, "COCKTAIL_DEADLINE_SECONDS", 0.05)
+    upstream.delay = 0.5
+    response = client.get("/api/cocktails/1")
+    assert response.status_code == 504
+    assert cocktail_service.upstream_stats["deadline_exceeded"] >= 1
+    assert cocktail_service.upstream_breaker.consecutive_failures == 1
+
+
+def test_falls_back_to_last_good_response(client, upstream):
+    assert client.get("/api/cocktails/7").json()["drinks"][0]["strDrink"] == "baru 7"
+
+    # entry sudah melewati ttl + stale_ttl, lalu upstream gagal
+    cache = cocktail_service.cocktail_cache
+    key = cache_key("/lookup.php", {"i": "7"})
+    stored_at, value = cache._data[key]
+    cache._data[key] = (stored_at - 1000, value)
+    served_before = cocktail_service.upstream_stats["served_cached_on_error"]
+    upstream.status = 502
+
+    response = client.get("/api/cocktails/7")
+    assert response.status_code == 200
+    assert response.json()["drinks"][0]["strDrink"] == "baru 7"
+    assert cocktail_service.upstream_stats["served_cached_on_error"] == served_before + 1
+
+    # tanpa data lama tidak ada fallback
+    assert client.get("/api/cocktails/8").status_code == 500
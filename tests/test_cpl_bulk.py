@@ -0,0 +1,96 @@
+import uuid
+
+import pytest
+from sqlmodel import Session, func, select
+
+from app.models.cpl import CPL
+from app.models.indikator import IndikatorCPL
+from app.models.kurikulum import Kurikulum
+
+
+def seed_kurikulum(engine):
+    id_kurikulum = uuid.uuid4()
+    with Session(engine) as session:
+        session.add(Kurikulum(id_kurikulum=id_kurikulum, nama_kurikulum="K"))
+        session.add(CPL(id_kurikulum=id_kurikulum, id_cpl="CPL-09", deskripsi="lama"))
+        session.commit()
+    return id_kurikulum
+
+
+def row_counts(engine):
+    with Session(engine) as session:
+        return (
+            session.exec(select(func.count()).select_from(CPL)).one(),
+            session.exec(select(func.count()).select_from(IndikatorCPL)).one(),
+        )
+
+
+def cpl(id_cpl, *id_indikator, deskripsi="d"):
+    return {
+        "id_cpl": id_cpl,
+        "deskripsi": deskripsi,
+        "indikator": [{"id_indikator": i, "deskripsi": f"ind {i}"} for i in id_indikator],
+    }
+
+
+def test_valid_tree_is_inserted(db, client):
+    id_kurikulum = seed_kurikulum(db)
+    response = client.post(f"/cpl/{id_kurikulum}/bulk", json={"cpl": [
+        cpl("CPL-01", "IND-01-01", "IND-01-02"),
+        cpl("CPL-02", "IND-02-01"),
+        cpl("CPL-03"),
+    ]})
+    assert response.status_code == 201
+    assert (response.json()["cpl"], response.json()["indikator"]) == (3, 3)
+    assert row_counts(db) == (4, 3)
+
+    with Session(db) as session:
+        assert session.get(Kurikulum, id_kurikulum).version == 2
+
+    detail = client.get(f"/cpl/{id_kurikulum}/CPL-01").json()
+    assert [i["id_indikator"] for i in detail["indikator"]] == ["IND-01-01", "IND-01-02"]
+
+
+@pytest.mark.parametrize("items, expected", [
+    (
+        [cpl("CPL-01", "IND-01-01"), cpl("CPL-01")],
+        [("cpl[1]", "id_cpl sudah digunakan. Gunakan id_cpl lain.")],
+    ),
+    (
+        [cpl("CPL-01", "IND-01-01", "IND-01-02", "IND-01-01")],
+        [("cpl[0].indikator[2]", "id_indikator sudah digunakan untuk CPL ini. Gunakan id_indikator lain.")],
+    ),
+    (
+        [cpl("CPL-01"), cpl("CPL-09", "IND-09-01")],
+        [("cpl[1]", "id_cpl sudah digunakan. Gunakan id_cpl lain.")],
+    ),
+    (
+        [cpl("CPL-1", "IND-01-01"), cpl("cpl-02"), cpl("CPL-03", "IND-3-01", "IND-03-01x"), cpl("CPL-04", deskripsi=" ")],
+        [
+            ("cpl[0]", "Format id_cpl tidak valid. Gunakan pola 'CPL-XX' (dua digit)."),
+            ("cpl[1]", "Format id_cpl tidak valid. Gunakan pola 'CPL-XX' (dua digit)."),
+            ("cpl[2].indikator[0]", "Format id_indikator tidak valid. Gunakan pola 'IND-XX-YY', XX sesuai no CPL."),
+            ("cpl[2].indikator[1]", "Format id_indikator tidak valid. Gunakan pola 'IND-XX-YY', XX sesuai no CPL."),
+            ("cpl[3]", "deskripsi tidak boleh kosong."),
+        ],
+    ),
+], ids=["duplicate-cpl", "duplicate-indikator", "cpl-exists", "bad-format"])
+def test_invalid_items_write_nothing(db, client, items, expected):
+    id_kurikulum = seed_kurikulum(db)
+    response = client.post(f"/cpl/{id_kurikulum}/bulk", json={"cpl": items})
+    assert response.status_code == 400
+    errors = response.json()["detail"]["errors"]
+    assert [(error["path"], message) for error in errors for message in error["errors"]] == expected
+
+    assert row_counts(db) == (1, 0)
+    with Session(db) as session:
+        assert session.get(Kurikulum, id_kurikulum).version == 1
+
+
+def test_unknown_kurikulum_and_empty_payload(db, client):
+    response = client.post(f"/cpl/{uuid.uuid4()}/bulk", json={"cpl": [cpl("CPL-01")]})
+    assert response.status_code == 404
+
+    id_kurikulum = seed_kurikulum(db)
+    assert client.post(f"/cpl/{id_kurikulum}/bulk", json={"cpl": []}).status_code == 400
+    assert row_counts(db) == (1, 0)
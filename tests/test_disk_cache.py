@@ -0,0 +1,47 @@
+import asyncio
+
+from app.config import settings
+from app.utils.cocktail_service import disk_cache as service_disk_cache
+from app.utils.disk_cache import DiskCache
+
+
+def test_disk_ttl_never_exceeds_memory_ttl():
+    assert service_disk_cache.ttl <= settings.COCKTAIL_CACHE_TTL_SECONDS
+
+
+def test_get_set_stats_and_expiry(tmp_path):
+    async def scenario():
+        cache = DiskCache(str(tmp_path / "cache.db"), ttl=60, retain=0)
+        cache.open()
+        await cache.set("a", {"drinks": [1]})
+        assert await cache.get("a") == {"drinks": [1]}
+        assert await cache.get("missing") is None
+
+        expired = DiskCache(cache.path, ttl=-1)
+        expired.open()
+        await expired.set("b", {"drinks": [2]})
+        assert await cache.get("b") is None
+        assert await cache.get("b", allow_expired=True) == {"drinks": [2]}
+
+        stats = await cache.stats()
+        assert stats["rows"] == 2
+        assert (stats["hits"], stats["misses"], stats["expired_hits"]) == (1, 2, 1)
+        cache.close()
+        expired.close()
+
+    asyncio.run(scenario())
+
+
+def test_close_while_reads_are_in_flight(tmp_path):
+    async def scenario():
+        cache = DiskCache(str(tmp_path / "cache.db"), ttl=60)
+        cache.open()
+        await cache.set("a", {"x": 1})
+        reads = [asyncio.create_task(cache.get("a")) for _ in range(50)]
+        await asyncio.sleep(0)
+        cache.close()
+        results = await asyncio.gather(*reads)
+        assert all(result in (None, {"x": 1}) for result in results)
+        assert (await cache.stats())["rows"] is None
+
+    asyncio.run(scenario())
@@ -0,0 +1,64 @@
+import uuid
+
+from sqlmodel import Session, select
+
+from app.models.cpl import CPL
+from app.models.kurikulum import Kurikulum
+from app.models.matkul import MataKuliah
+
+
+def seed_kurikulum(engine):
+    id_kurikulum = uuid.uuid4()
+    with Session(engine) as session:
+        session.add(Kurikulum(id_kurikulum=id_kurikulum, nama_kurikulum="K"))
+        session.add(CPL(id_kurikulum=id_kurikulum, id_cpl="CPL-01", deskripsi="a"))
+        session.commit()
+    return id_kurikulum
+
+
+def test_too_long_values_are_row_errors(db, client):
+    id_kurikulum = seed_kurikulum(db)
+    cpl = [{"id_kurikulum": str(id_kurikulum), "id_cpl": "CPL-01"}]
+    response = client.post("/matkul/bulk", json=[
+        {"id_matkul": "MK-01", "mata_kuliah": "Basis Data", "sks": 3, "semester": 1, "cpl_list": cpl},
+        {"id_matkul": "MK-02", "mata_kuliah": "x" * 256, "sks": 3, "semester": 1, "cpl_list": cpl},
+        {"id_matkul": "M" * 51, "mata_kuliah": "Jaringan", "sks": 3, "semester": 1, "cpl_list": cpl},
+        {"id_matkul": "MK-04", "mata_kuliah": "Etika", "sks": 2, "semester": 1,
+         "cpl_list": [{"id_kurikulum": str(id_kurikulum), "id_cpl": "C" * 51}]},
+    ])
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["inserted"], body["failed"]) == (1, 3)
+    assert [error["row"] for error in body["errors"]] == [2, 3, 4]
+    assert body["errors"][0]["errors"][0].startswith("mata_kuliah:")
+    assert body["errors"][1]["errors"][0].startswith("id_matkul:")
+    assert body["errors"][2]["errors"][0].startswith("cpl_list.0.id_cpl:")
+
+    with Session(db) as session:
+        assert session.exec(select(MataKuliah.id_matkul)).all() == ["MK-01"]
+
+
+def test_csv_errors_point_at_the_cpl_line(db, client):
+    id_kurikulum = seed_kurikulum(db)
+    csv = "\n".join([
+        "id_matkul,mata_kuliah,sks,semester,id_kurikulum,id_cpl",
+        f"MK-01,Basis Data,3,1,{id_kurikulum},CPL-01",
+        f"MK-02,Jaringan,3,1,{id_kurikulum},CPL-01",
+        f"MK-01,Basis Data,3,1,{id_kurikulum},CPL-09",
+        f"MK-01,Basis Data,3,1,{id_kurikulum},{'C' * 51}",
+    ])
+    response = client.post("/matkul/bulk", content=csv, headers={"Content-Type": "text/csv"})
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["inserted"], body["failed"]) == (1, 1)
+    error = body["errors"][0]
+    assert (error["row"], error["id_matkul"]) == (2, "MK-01")
+    assert error["errors"] == [
+        "cpl_list.2.id_cpl: String should have at most 50 characters (baris 5)"
+    ]
+
+    csv = "\n".join(csv.splitlines()[:4])
+    response = client.post("/matkul/bulk", content=csv, headers={"Content-Type": "text/csv"})
+    error = response.json()["errors"][0]
+    assert error["row"] == 2
+    assert error["errors"] == [f"CPL tidak ditemukan: CPL-09 (kurikulum {id_kurikulum}) (baris 4)"]
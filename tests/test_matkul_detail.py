@@ -0,0 +1,53 @@
+import uuid
+
+from sqlmodel import Session
+
+from app.models.cpl import CPL
+from app.models.cpl_matkul import CPLMataKuliah
+from app.models.indikator import IndikatorCPL
+from app.models.kurikulum import Kurikulum
+from app.models.matkul import MataKuliah
+from helpers import count_queries
+
+
+def test_detail_matkul_is_served_from_the_read_model(db, client):
+    k1, k2 = sorted([uuid.uuid4(), uuid.uuid4()])
+    with Session(db) as session:
+        session.add(Kurikulum(id_kurikulum=k1, nama_kurikulum="K1"))
+        session.add(Kurikulum(id_kurikulum=k2, nama_kurikulum="K2"))
+        session.add(CPL(id_kurikulum=k1, id_cpl="CPL-01", deskripsi="k1 satu"))
+        session.add(CPL(id_kurikulum=k1, id_cpl="CPL-02", deskripsi="k1 dua"))
+        session.add(CPL(id_kurikulum=k2, id_cpl="CPL-01", deskripsi="k2 satu"))
+        session.add(IndikatorCPL(id_kurikulum=k1, id_cpl="CPL-01", id_indikator="IND-01-01", deskripsi="i1"))
+        session.add(IndikatorCPL(id_kurikulum=k2, id_cpl="CPL-01", id_indikator="IND-01-09", deskripsi="i9"))
+        session.add(MataKuliah(id_matkul="MK-01", mata_kuliah="Basis Data", sks=3, semester=2))
+        session.add(MataKuliah(id_matkul="MK-02", mata_kuliah="Tanpa CPL", sks=2, semester=1))
+        for id_kurikulum, id_cpl in [(k1, "CPL-01"), (k1, "CPL-02"), (k2, "CPL-01")]:
+            session.add(CPLMataKuliah(id_kurikulum=id_kurikulum, id_cpl=id_cpl, id_matkul="MK-01"))
+        session.commit()
+
+    response = client.get("/matkul/MK-01")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["mata_kuliah"]["mata_kuliah"] == "Basis Data"
+    assert body["cpl"] == [
+        {"id_kurikulum": str(k1), "id_cpl": "CPL-01", "deskripsi": "k1 satu",
+         "indikator": [{"id_indikator": "IND-01-01", "deskripsi": "i1"}]},
+        {"id_kurikulum": str(k1), "id_cpl": "CPL-02", "deskripsi": "k1 dua", "indikator": []},
+        {"id_kurikulum": str(k2), "id_cpl": "CPL-01", "deskripsi": "k2 satu",
+         "indikator": [{"id_indikator": "IND-01-09", "deskripsi": "i9"}]},
+    ]
+
+    # graf kedua kurikulum sudah dimuat: cukup satu query untuk matkul + relasinya
+    with count_queries() as statements:
+        assert client.get("/matkul/MK-01").json() == body
+    assert len(statements) == 1
+
+    # CPL berubah lewat API: graf di-invalidate, detail ikut berubah
+    client.patch(f"/cpl/{k2}/CPL-01", json={"deskripsi": "k2 baru"})
+    assert client.get("/matkul/MK-01").json()["cpl"][2]["deskripsi"] == "k2 baru"
+
+    response = client.get("/matkul/MK-02")
+    assert response.status_code == 200
+    assert response.json()["cpl"] == []
+    assert client.get("/matkul/MK-99").status_code == 404
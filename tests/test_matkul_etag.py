@@ -0,0 +1,78 @@
+import uuid
+
+from sqlmodel import Session
+
+from app.models.cpl import CPL
+from app.models.kurikulum import Kurikulum
+from helpers import count_queries
+
+
+def etag_of(client):
+    response = client.get("/matkul/")
+    assert response.status_code == 200
+    return response.headers["etag"]
+
+
+def test_matkul_list_etag_is_one_lookup_and_changes_on_writes(db, client):
+    id_kurikulum = uuid.uuid4()
+    with Session(db) as session:
+        session.add(Kurikulum(id_kurikulum=id_kurikulum, nama_kurikulum="K"))
+        session.add(CPL(id_kurikulum=id_kurikulum, id_cpl="CPL-01", deskripsi="a"))
+        session.commit()
+
+    etag = etag_of(client)
+    with count_queries() as statements:
+        response = client.get("/matkul/", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert len(statements) == 1
+    assert "catalog_version" in statements[0]
+
+    # matkul tanpa relasi CPL tidak menyentuh kurikulum mana pun
+    created = client.post("/matkul/", json={
+        "id_matkul": "MK-001", "mata_kuliah": "A", "sks": 3, "semester": 1, "cpl_list": []
+    })
+    assert created.status_code == 201
+    after_create = etag_of(client)
+    assert after_create != etag
+
+    client.patch("/matkul/MK-001", json={"cpl_list": [{"id_kurikulum": str(id_kurikulum), "id_cpl": "CPL-01"}]})
+    after_patch = etag_of(client)
+    assert after_patch != after_create
+
+    client.patch(f"/cpl/{id_kurikulum}/CPL-01", json={"deskripsi": "b"})
+    assert etag_of(client) != after_patch
+
+
+def test_writes_outside_matkul_list_keep_the_etag(db, client):
+    id_kurikulum = uuid.uuid4()
+    with Session(db) as session:
+        session.add(Kurikulum(id_kurikulum=id_kurikulum, nama_kurikulum="K"))
+        session.add(CPL(id_kurikulum=id_kurikulum, id_cpl="CPL-01", deskripsi="a"))
+        session.add(CPL(id_kurikulum=id_kurikulum, id_cpl="CPL-02", deskripsi="b"))
+        session.add(CPL(id_kurikulum=id_kurikulum, id_cpl="CPL-03", deskripsi="c"))
+        session.commit()
+    created = client.post("/matkul/", json={
+        "id_matkul": "MK-001", "mata_kuliah": "A", "sks": 3, "semester": 1,
+        "cpl_list": [{"id_kurikulum": str(id_kurikulum), "id_cpl": "CPL-01"}]
+    })
+    assert created.status_code == 201
+
+    etag = etag_of(client)
+    response = client.post(f"/indikator/{id_kurikulum}/CPL-03", json={
+        "id_indikator": "IND-03-01", "deskripsi": "i"
+    })
+    assert response.status_code == 201
+    # CPL-02 tidak dipetakan ke mata kuliah mana pun
+    assert client.patch(f"/cpl/{id_kurikulum}/CPL-02", json={"deskripsi": "c"}).status_code == 200
+    assert client.delete(f"/cpl/{id_kurikulum}/CPL-02").status_code == 204
+    assert client.patch(f"/kurikulum/{id_kurikulum}", json={"revisi": "2"}).status_code == 200
+    assert etag_of(client) == etag
+
+    with Session(db) as session:
+        assert session.get(Kurikulum, id_kurikulum).version == 6
+
+    # deskripsi sama tidak mengubah daftar; deskripsi baru CPL yang dipetakan mengubahnya
+    client.patch(f"/cpl/{id_kurikulum}/CPL-01", json={"deskripsi": "a"})
+    assert etag_of(client) == etag
+    client.patch(f"/cpl/{id_kurikulum}/CPL-01", json={"deskripsi": "a2"})
+    assert etag_of(client) != etag
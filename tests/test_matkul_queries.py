@@ -0,0 +1,44 @@
+import uuid
+
+from sqlmodel import Session
+
+from app.models.cpl import CPL
+from app.models.cpl_matkul import CPLMataKuliah
+from app.models.kurikulum import Kurikulum
+from app.models.matkul import MataKuliah
+from helpers import count_queries
+
+
+def seed_matkul(engine, id_kurikulum, start, count):
+    with Session(engine) as session:
+        for i in range(start, start + count):
+            id_matkul = f"MK-{i:03d}"
+            session.add(MataKuliah(id_matkul=id_matkul, mata_kuliah=f"Matkul {i}", sks=3, semester=1))
+            session.add(CPLMataKuliah(id_kurikulum=id_kurikulum, id_cpl="CPL-01", id_matkul=id_matkul))
+            session.add(CPLMataKuliah(id_kurikulum=id_kurikulum, id_cpl="CPL-02", id_matkul=id_matkul))
+        session.commit()
+
+
+def test_list_matkul_query_count_does_not_grow_with_page_size(db, client):
+    id_kurikulum = uuid.uuid4()
+    with Session(db) as session:
+        session.add(Kurikulum(id_kurikulum=id_kurikulum, nama_kurikulum="K"))
+        session.add(CPL(id_kurikulum=id_kurikulum, id_cpl="CPL-01", deskripsi="a"))
+        session.add(CPL(id_kurikulum=id_kurikulum, id_cpl="CPL-02", deskripsi="b"))
+        session.commit()
+
+    seed_matkul(db, id_kurikulum, 0, 1)
+    with count_queries() as single:
+        response = client.get("/matkul/", params={"limit": 100})
+    assert response.status_code == 200
+    assert len(response.json()["data"]) == 1
+
+    seed_matkul(db, id_kurikulum, 1, 59)
+    with count_queries() as many:
+        response = client.get("/matkul/", params={"limit": 100})
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert len(data) == 60
+    assert all(len(item["cpl"]) == 2 for item in data)
+
+    assert len(many) == len(single)
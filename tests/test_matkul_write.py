@@ -0,0 +1,138 @@
+import uuid
+
+from sqlalchemy import text
+from sqlmodel import Session, select
+
+from app.models.cpl import CPL
+from app.models.cpl_matkul import CPLMataKuliah
+from app.models.kurikulum import Kurikulum
+from app.models.matkul import MataKuliah
+from app.routers import matkul as matkul_router
+from helpers import count_queries
+
+
+def seed_cpl(engine, *id_cpl_list):
+    id_kurikulum = uuid.uuid4()
+    with Session(engine) as session:
+        session.add(Kurikulum(id_kurikulum=id_kurikulum, nama_kurikulum="K"))
+        for id_cpl in id_cpl_list:
+            session.add(CPL(id_kurikulum=id_kurikulum, id_cpl=id_cpl, deskripsi=id_cpl))
+        session.commit()
+    return id_kurikulum
+
+
+def relation_rows(engine, id_matkul):
+    with Session(engine) as session:
+        return session.exec(
+            select(CPLMataKuliah).where(CPLMataKuliah.id_matkul == id_matkul)
+        ).all()
+
+
+def payload(id_matkul, cpl_keys):
+    return {
+        "id_matkul": id_matkul, "mata_kuliah": "Basis Data", "sks": 3, "semester": 2,
+        "cpl_list": [{"id_kurikulum": str(k), "id_cpl": c} for k, c in cpl_keys],
+    }
+
+
+def test_create_lists_every_missing_cpl(db, client):
+    id_kurikulum = seed_cpl(db, "CPL-01")
+    other = uuid.uuid4()
+    response = client.post("/matkul/", json=payload("MK-01", [
+        (id_kurikulum, "CPL-01"),
+        (id_kurikulum, "CPL-07"),
+        (other, "CPL-01"),
+        (id_kurikulum, "CPL-07"),
+    ]))
+    assert response.status_code == 404
+    assert response.json()["detail"] == (
+        f"CPL tidak ditemukan: CPL-07 di kurikulum {id_kurikulum}, CPL-01 di kurikulum {other}"
+    )
+    with Session(db) as session:
+        assert session.get(MataKuliah, "MK-01") is None
+
+
+def test_create_collapses_duplicate_pairs(db, client):
+    id_kurikulum = seed_cpl(db, "CPL-01", "CPL-02")
+    response = client.post("/matkul/", json=payload("mk-01", [
+        (id_kurikulum, "cpl-01"),
+        (id_kurikulum, "CPL-02"),
+        (id_kurikulum, "CPL-01"),
+    ]))
+    assert response.status_code == 201
+    body = response.json()
+    assert body["matkul"]["id_matkul"] == "MK-01"
+    assert [r["id_cpl"] for r in body["relasi"]] == ["CPL-01", "CPL-02"]
+    assert sorted(r.id_cpl for r in relation_rows(db, "MK-01")) == ["CPL-01", "CPL-02"]
+
+
+def test_create_duplicate_id_matkul(db, client, monkeypatch):
+    id_kurikulum = seed_cpl(db, "CPL-01")
+    assert client.post("/matkul/", json=payload("MK-01", [(id_kurikulum, "CPL-01")])).status_code == 201
+
+    # sudah ada sebelum request: ditolak oleh pengecekan awal
+    response = client.post("/matkul/", json=payload("MK-01", []))
+    assert response.status_code == 400
+
+    # dibuat request lain setelah pengecekan awal: constraint di commit -> 409, bukan 500
+    load_existing_cpl_keys = matkul_router.load_existing_cpl_keys
+
+    async def racing_load(session, keys):
+        with Session(db) as other:
+            other.add(MataKuliah(id_matkul="MK-02", mata_kuliah="Lain", sks=2, semester=1))
+            other.commit()
+        return await load_existing_cpl_keys(session, keys)
+
+    monkeypatch.setattr(matkul_router, "load_existing_cpl_keys", racing_load)
+    response = client.post("/matkul/", json=payload("MK-02", [(id_kurikulum, "CPL-01")]))
+    assert response.status_code == 409
+    assert relation_rows(db, "MK-02") == []
+    with Session(db) as session:
+        assert session.get(MataKuliah, "MK-02").mata_kuliah == "Lain"
+
+
+def relation_rowids(engine, id_matkul):
+    with Session(engine) as session:
+        rows = session.connection().execute(
+            text("SELECT id_cpl, rowid FROM cpl_matkul WHERE id_matkul = :id_matkul"),
+            {"id_matkul": id_matkul}
+        ).all()
+    return dict(rows)
+
+
+def test_patch_applies_only_the_relation_diff(db, client):
+    id_kurikulum = seed_cpl(db, "CPL-01", "CPL-02", "CPL-03")
+    created = client.post("/matkul/", json=payload("MK-01", [
+        (id_kurikulum, "CPL-01"), (id_kurikulum, "CPL-02")
+    ]))
+    assert created.status_code == 201
+    before = relation_rowids(db, "MK-01")
+
+    with count_queries() as statements:
+        response = client.patch("/matkul/MK-01", json={
+            "sks": 4,
+            "cpl_list": [
+                {"id_kurikulum": str(id_kurikulum), "id_cpl": "CPL-02"},
+                {"id_kurikulum": str(id_kurikulum), "id_cpl": "CPL-03"},
+            ]
+        })
+    assert response.status_code == 200
+    body = response.json()
+    assert body["matkul"]["sks"] == 4
+
+    def relation(id_cpl):
+        return {"id_kurikulum": str(id_kurikulum), "id_cpl": id_cpl, "id_matkul": "MK-01"}
+
+    assert body["relasi_ditambahkan"] == [relation("CPL-03")]
+    assert body["relasi_dihapus"] == [relation("CPL-01")]
+    assert body["relasi"] == [relation("CPL-02"), relation("CPL-03")]
+
+    assert sorted(r.id_cpl for r in relation_rows(db, "MK-01")) == ["CPL-02", "CPL-03"]
+    # baris yang tidak berubah tidak dihapus lalu dimasukkan ulang
+    assert relation_rowids(db, "MK-01")["CPL-02"] == before["CPL-02"]
+    relation_writes = [s for s in statements if "cpl_matkul" in s and s.startswith(("INSERT", "DELETE"))]
+    assert len(relation_writes) == 2
+
+    # cpl_list yang sama persis: tidak ada relasi yang ditulis
+    response = client.patch("/matkul/MK-01", json={"cpl_list": body["relasi"]})
+    assert (response.json()["relasi_ditambahkan"], response.json()["relasi_dihapus"]) == ([], [])
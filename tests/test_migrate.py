@@ -0,0 +1,169 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlmodel import SQLModel, inspect, text
+
+from app.utils import migrate
+from app.utils.auth import create_access_token
+from app.utils.revocation import revocation_key
+
+# Skema seperti sebelum revisi apa pun (model di commit awal), versi SQLite
+BASELINE_SCHEMA = [
+    """CREATE TABLE users (
+        user_id VARCHAR(25) NOT NULL PRIMARY KEY,
+        nama VARCHAR(255) NOT NULL,
+        password VARCHAR(255) NOT NULL,
+        role VARCHAR(6) NOT NULL,
+        created_at DATETIME NOT NULL,
+        updated_at DATETIME NOT NULL)""",
+    """CREATE TABLE kurikulum (
+        id_kurikulum CHAR(32) NOT NULL PRIMARY KEY,
+        nama_kurikulum VARCHAR(255) NOT NULL,
+        revisi VARCHAR(50),
+        status_kurikulum VARCHAR(8),
+        created_at DATETIME NOT NULL,
+        updated_at DATETIME NOT NULL)""",
+    """CREATE TABLE cpl (
+        id_kurikulum CHAR(32) NOT NULL REFERENCES kurikulum (id_kurikulum),
+        id_cpl VARCHAR(50) NOT NULL,
+        deskripsi VARCHAR NOT NULL,
+        PRIMARY KEY (id_kurikulum, id_cpl))""",
+    """CREATE TABLE indikator_cpl (
+        id_kurikulum CHAR(32) NOT NULL,
+        id_cpl VARCHAR(50) NOT NULL,
+        id_indikator VARCHAR(50) NOT NULL,
+        deskripsi VARCHAR NOT NULL,
+        PRIMARY KEY (id_kurikulum, id_cpl, id_indikator),
+        FOREIGN KEY (id_kurikulum, id_cpl) REFERENCES cpl (id_kurikulum, id_cpl))""",
+    """CREATE TABLE mata_kuliah (
+        id_matkul VARCHAR(50) NOT NULL PRIMARY KEY,
+        mata_kuliah VARCHAR(255) NOT NULL,
+        sks INTEGER NOT NULL,
+        semester INTEGER NOT NULL,
+        created_at DATETIME NOT NULL,
+        updated_at DATETIME NOT NULL)""",
+    """CREATE TABLE cpl_matkul (
+        id_kurikulum CHAR(32) NOT NULL,
+        id_cpl VARCHAR(50) NOT NULL,
+        id_matkul VARCHAR(50) NOT NULL,
+        PRIMARY KEY (id_kurikulum, id_cpl, id_matkul),
+        FOREIGN KEY (id_kurikulum, id_cpl) REFERENCES cpl (id_kurikulum, id_cpl),
+        FOREIGN KEY (id_matkul) REFERENCES mata_kuliah (id_matkul))""",
+    """CREATE TABLE token_blacklist (
+        id CHAR(32) NOT NULL PRIMARY KEY,
+        token VARCHAR NOT NULL,
+        blacklisted_at DATETIME NOT NULL,
+        expires_at DATETIME NOT NULL,
+        user_id VARCHAR(25) NOT NULL REFERENCES users (user_id))""",
+    "CREATE UNIQUE INDEX ix_token_blacklist_token ON token_blacklist (token)",
+]
+
+LEGACY_TOKEN = "header.payload-tanpa-jti.signature"
+
+
+@pytest.fixture
+def baseline(db):
+    """Database dengan skema awal dan sedikit data, tanpa tabel schema_revision"""
+    SQLModel.metadata.drop_all(db)
+    migrate.drop_revision_table()
+    now = datetime(2024, 5, 1, 8, 0, 0)
+    jti_token = create_access_token({"sub": "1234567890"})
+    with db.begin() as conn:
+        for statement in BASELINE_SCHEMA:
+            conn.execute(text(statement))
+        conn.execute(text(
+            "INSERT INTO users VALUES ('1234567890', 'Kadep', 'x', 'kadep', :now, :now)"
+        ), {"now": now})
+        conn.execute(text(
+            "INSERT INTO kurikulum VALUES ('0123456789abcdef0123456789abcdef', 'K', NULL, 'aktif', :now, :now)"
+        ), {"now": now})
+        conn.execute(text(
+            "INSERT INTO token_blacklist VALUES (:id, :token, :now, :expires, '1234567890')"
+        ), [
+            {"id": "a" * 32, "token": LEGACY_TOKEN, "now": now, "expires": now + timedelta(days=1)},
+            {"id": "b" * 32, "token": jti_token, "now": now, "expires": now + timedelta(days=2)},
+        ])
+    yield {"jti_token": jti_token, "now": now}
+    migrate.drop_revision_table()
+
+
+def schema_snapshot(engine):
+    inspector = inspect(engine)
+    snapshot = {}
+    for table in sorted(inspector.get_table_names()):
+        snapshot[table] = (
+            [col["name"] for col in inspector.get_columns(table)],
+            sorted(index["name"] for index in inspector.get_indexes(table)),
+        )
+    return snapshot
+
+
+def applied(engine):
+    with engine.connect() as conn:
+        return sorted(migrate.applied_revisions(conn))
+
+
+def test_dry_run_writes_nothing(baseline, db, capsys):
+    before = schema_snapshot(db)
+    plan = migrate.upgrade(dry_run=True)
+    assert plan == [rev.revision for rev in migrate.REVISIONS]
+    assert schema_snapshot(db) == before
+    assert migrate.REVISION_TABLE not in before
+
+    output = capsys.readouterr().out
+    assert "CREATE INDEX IF NOT EXISTS ix_cpl_matkul_id_matkul ON cpl_matkul (id_matkul);" in output
+    assert "-- python: copy token_blacklist rows" in output
+    assert "ALTER TABLE kurikulum ADD COLUMN version INTEGER DEFAULT 1 NOT NULL;" in output
+
+    with db.connect() as conn:
+        assert conn.execute(text("SELECT count(*) FROM token_blacklist")).scalar() == 2
+
+
+def test_upgrade_from_baseline(baseline, db):
+    migrate.migrate()
+    assert applied(db) == [rev.revision for rev in migrate.REVISIONS]
+
+    inspector = inspect(db)
+    columns = {col["name"] for col in inspector.get_columns("token_blacklist")}
+    assert columns == {"token_key", "blacklisted_at", "expires_at", "user_id"}
+    assert {"ix_token_blacklist_blacklisted_at", "ix_token_blacklist_expires_at"} <= {
+        index["name"] for index in inspector.get_indexes("token_blacklist")
+    }
+    assert "ix_cpl_matkul_id_matkul" in {index["name"] for index in inspector.get_indexes("cpl_matkul")}
+    assert "catalog_version" in inspector.get_table_names()
+
+    with db.connect() as conn:
+        rows = conn.execute(text(
+            "SELECT token_key, expires_at FROM token_blacklist ORDER BY expires_at"
+        )).all()
+        version = conn.execute(text("SELECT version FROM kurikulum")).scalar()
+    assert [key for key, _ in rows] == [revocation_key(LEGACY_TOKEN), revocation_key(baseline["jti_token"])]
+    assert len(rows[0][0]) == 64
+    assert version == 1
+
+    # dijalankan lagi: tidak ada revisi tertunda
+    assert migrate.upgrade() == []
+
+
+def test_downgrade_stops_at_irreversible_0004(baseline, db, capsys):
+    migrate.migrate()
+
+    with pytest.raises(RuntimeError, match="0004"):
+        migrate.downgrade("0003")
+    with pytest.raises(RuntimeError, match="0004"):
+        migrate.downgrade("base", dry_run=True)
+    # penolakan terjadi sebelum langkah apa pun dijalankan
+    assert applied(db) == [rev.revision for rev in migrate.REVISIONS]
+    assert "version" in {col["name"] for col in inspect(db).get_columns("kurikulum")}
+
+    capsys.readouterr()
+    assert migrate.downgrade("0004", dry_run=True) == ["0005"]
+    assert "ALTER TABLE kurikulum DROP COLUMN version;" in capsys.readouterr().out
+    assert "version" in {col["name"] for col in inspect(db).get_columns("kurikulum")}
+
+    assert migrate.downgrade("0004") == ["0005"]
+    assert "version" not in {col["name"] for col in inspect(db).get_columns("kurikulum")}
+    assert applied(db) == ["0001", "0002", "0003", "0004"]
+
+    assert migrate.upgrade() == ["0005"]
+    assert "version" in {col["name"] for col in inspect(db).get_columns("kurikulum")}
@@ -0,0 +1,144 @@
+import base64
+import json
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlmodel import Session
+
+from app.models.cpl import CPL
+from app.models.cpl_matkul import CPLMataKuliah
+from app.models.kurikulum import Kurikulum, StatusEnum
+from app.models.matkul import MataKuliah
+from app.utils.pagination import encode_cursor
+
+
+def raw_cursor(value):
+    return base64.urlsafe_b64encode(json.dumps(value).encode("utf-8")).decode("ascii").rstrip("=")
+
+
+ENDPOINTS = [
+    "/kurikulum/",
+    "/matkul/",
+    "/cpl/kurikulum-aktif",
+    f"/cpl/kurikulum-aktif?id_kurikulum={uuid.uuid4()}",
+]
+
+BAD_CURSORS = [
+    "WzUsICJDUEwtMDEiXQ",
+    "bukan base64!",
+    "é",
+    raw_cursor({"id": "x"}),
+    raw_cursor([None, None]),
+    raw_cursor([5]),
+    raw_cursor(["a", "b", "c"]),
+    raw_cursor([[1], {"a": 1}]),
+    encode_cursor(["bukan-tanggal", "bukan-uuid"]),
+]
+
+
+def page_all(client, url, params):
+    """Ikuti next_cursor sampai habis; kembalikan semua halaman"""
+    pages = []
+    cursor = None
+    while True:
+        query = dict(params, **({"cursor": cursor} if cursor else {}))
+        response = client.get(url, params=query)
+        assert response.status_code == 200, response.text
+        body = response.json()
+        pages.append(body)
+        cursor = body["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+@pytest.mark.parametrize("cursor", BAD_CURSORS)
+@pytest.mark.parametrize("url", ENDPOINTS)
+def test_malformed_cursor_is_400(db, client, url, cursor):
+    response = client.get(url, params={"cursor": cursor})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "cursor tidak valid"
+
+
+def test_kurikulum_pages_and_status_filter(db, client):
+    start = datetime(2024, 1, 1)
+    with Session(db) as session:
+        for i in range(7):
+            session.add(Kurikulum(
+                nama_kurikulum=f"K{i}",
+                status_kurikulum=StatusEnum.aktif if i % 2 == 0 else StatusEnum.nonaktif,
+                created_at=start + timedelta(days=i % 3)
+            ))
+        session.commit()
+
+    pages = page_all(client, "/kurikulum/", {"limit": 3, "with_total": True})
+    assert [len(page["data"]) for page in pages] == [3, 3, 1]
+    assert all(page["total"] == 7 for page in pages)
+    names = [k["nama_kurikulum"] for page in pages for k in page["data"]]
+    assert sorted(names) == [f"K{i}" for i in range(7)]
+
+    pages = page_all(client, "/kurikulum/", {"limit": 2, "status_kurikulum": "aktif"})
+    data = [k for page in pages for k in page["data"]]
+    assert sorted(k["nama_kurikulum"] for k in data) == ["K0", "K2", "K4", "K6"]
+    assert pages[-1]["next_cursor"] is None
+    assert pages[0]["total"] is None
+
+
+def test_matkul_pages_and_filters(db, client):
+    id_kurikulum, other_kurikulum = uuid.uuid4(), uuid.uuid4()
+    with Session(db) as session:
+        session.add(Kurikulum(id_kurikulum=id_kurikulum, nama_kurikulum="K"))
+        session.add(Kurikulum(id_kurikulum=other_kurikulum, nama_kurikulum="L"))
+        session.add(CPL(id_kurikulum=id_kurikulum, id_cpl="CPL-01", deskripsi="a"))
+        session.add(CPL(id_kurikulum=other_kurikulum, id_cpl="CPL-01", deskripsi="b"))
+        for i in range(9):
+            id_matkul = f"MK-{i:02d}"
+            session.add(MataKuliah(id_matkul=id_matkul, mata_kuliah=f"M{i}", sks=2 + i % 2, semester=1 + i % 3))
+            session.add(CPLMataKuliah(
+                id_kurikulum=id_kurikulum if i < 5 else other_kurikulum,
+                id_cpl="CPL-01",
+                id_matkul=id_matkul
+            ))
+        session.commit()
+
+    pages = page_all(client, "/matkul/", {"limit": 4, "with_total": True})
+    assert [len(page["data"]) for page in pages] == [4, 4, 1]
+    assert [m["id_matkul"] for page in pages for m in page["data"]] == [f"MK-{i:02d}" for i in range(9)]
+    assert pages[0]["total"] == 9
+
+    def ids(params):
+        return [m["id_matkul"] for page in page_all(client, "/matkul/", params) for m in page["data"]]
+
+    assert ids({"limit": 2, "semester": 1}) == ["MK-00", "MK-03", "MK-06"]
+    assert ids({"limit": 2, "sks": 3}) == ["MK-01", "MK-03", "MK-05", "MK-07"]
+    assert ids({"limit": 2, "id_kurikulum": str(id_kurikulum)}) == [f"MK-{i:02d}" for i in range(5)]
+    assert ids({"limit": 2, "id_kurikulum": str(other_kurikulum), "sks": 2}) == ["MK-06", "MK-08"]
+
+    response = client.get("/matkul/", params={"semester": 1, "with_total": True})
+    assert response.json()["total"] == 3
+
+
+@pytest.mark.parametrize("from_read_model", [False, True], ids=["query", "read-model"])
+def test_active_cpl_pages(db, client, from_read_model):
+    aktif, nonaktif = uuid.uuid4(), uuid.uuid4()
+    with Session(db) as session:
+        session.add(Kurikulum(id_kurikulum=aktif, nama_kurikulum="A", status_kurikulum=StatusEnum.aktif))
+        session.add(Kurikulum(id_kurikulum=nonaktif, nama_kurikulum="N", status_kurikulum=StatusEnum.nonaktif))
+        for i in range(5):
+            session.add(CPL(id_kurikulum=aktif, id_cpl=f"CPL-{i:02d}", deskripsi=f"a{i}"))
+            session.add(CPL(id_kurikulum=nonaktif, id_cpl=f"CPL-{i:02d}", deskripsi=f"n{i}"))
+        session.commit()
+
+    params = {"limit": 2, "with_total": True}
+    if from_read_model:
+        params["id_kurikulum"] = str(aktif)
+    pages = page_all(client, "/cpl/kurikulum-aktif", params)
+    assert [len(page["data"]) for page in pages] == [2, 2, 1]
+    assert pages[0]["total"] == 5
+    data = [c for page in pages for c in page["data"]]
+    assert [c["id_cpl"] for c in data] == [f"CPL-{i:02d}" for i in range(5)]
+    assert {c["kurikulum"]["id_kurikulum"] for c in data} == {str(aktif)}
+
+    response = client.get("/cpl/kurikulum-aktif", params={"id_kurikulum": str(nonaktif)})
+    assert response.json()["data"] == []
+    assert response.json()["next_cursor"] is None
@@ -0,0 +1,62 @@
+import asyncio
+import uuid
+
+from app.config import settings
+from app.utils import read_model as read_model_module
+from app.utils.invalidation import InvalidationListener
+from app.utils.read_model import CurriculumReadModel, KurikulumGraph
+
+
+def make_graph(id_kurikulum):
+    return KurikulumGraph(
+        kurikulum={"id_kurikulum": str(id_kurikulum), "version": 1},
+        cpl=[],
+        indikator_by_cpl={},
+        matkul_by_cpl={},
+    )
+
+
+def test_load_started_before_suspend_is_not_stored(db):
+    async def scenario():
+        model = CurriculumReadModel(maxsize=8, ttl=60)
+        id_kurikulum = uuid.uuid4()
+        started = asyncio.Event()
+        release = asyncio.Event()
+
+        async def slow_load_graph(session, id_kurikulum):
+            started.set()
+            await release.wait()
+            return make_graph(id_kurikulum)
+
+        model._load_graph = slow_load_graph
+        pending = asyncio.ensure_future(model.get(id_kurikulum))
+        await started.wait()
+
+        # koneksi listener putus lalu tersambung lagi selama load berjalan
+        model.suspend()
+        model.resume()
+        release.set()
+
+        assert (await pending) is not None
+        assert model.stats()["entries"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_generation_map_is_bounded(monkeypatch):
+    monkeypatch.setattr(read_model_module, "GENERATION_LIMIT", 10)
+    model = CurriculumReadModel(maxsize=8, ttl=60)
+    epoch = model._epoch
+    for _ in range(25):
+        model.invalidate(uuid.uuid4())
+    assert len(model._generation) <= 10
+    assert model._epoch > epoch
+
+
+def test_listener_dsn_follows_async_database_url(monkeypatch):
+    monkeypatch.setattr(settings, "ASYNC_DATABASE_URL", "postgresql+asyncpg://u:p@replica:5432/obe")
+    monkeypatch.setattr(settings, "DATABASE_URL", "postgresql://u:p@primary:5432/obe")
+    assert InvalidationListener()._dsn() == "postgresql://u:p@replica:5432/obe"
+
+    monkeypatch.setattr(settings, "ASYNC_DATABASE_URL", None)
+    assert InvalidationListener()._dsn() == "postgresql://u:p@primary:5432/obe"
@@ -0,0 +1,159 @@
+import asyncio
+import uuid
+from datetime import datetime
+
+import pytest
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlmodel import Session
+
+from app.config import settings
+from app.db import async_session
+from app.models.user import RoleEnum, User
+from app.utils import shared_cache
+from app.utils.auth import create_access_token, get_current_user, principal_cache
+from app.utils.shared_cache import CacheNamespace, MemoryBackend, RedisBackend
+
+
+def make_memory_backend():
+    return MemoryBackend(maxsize=128, max_ttl=60)
+
+
+def make_redis_backend():
+    fakeredis = pytest.importorskip("fakeredis")
+    backend = RedisBackend("redis://cache:6379/0", timeout=1)
+    backend._client = fakeredis.FakeAsyncRedis()
+    return backend
+
+
+@pytest.fixture(params=[make_memory_backend, make_redis_backend], ids=["memory", "redis"])
+def use_backend(request, monkeypatch):
+    """Pasang backend baru sebagai cache_backend; dipanggil di dalam event loop test"""
+    def install():
+        backend = request.param()
+        monkeypatch.setattr(shared_cache, "cache_backend", backend)
+        return backend
+    return install
+
+
+def test_get_set_and_bulk(use_backend):
+    async def scenario():
+        use_backend()
+        cache = CacheNamespace("matkul", ttl=60)
+        assert await cache.get("a") is None
+
+        await cache.set("a", {"sks": 3})
+        await cache.set_many({"b": [1, 2], "c": "tiga"})
+        assert await cache.get("a") == {"sks": 3}
+        assert await cache.get_many(["a", "b", "c", "d"]) == {
+            "a": {"sks": 3}, "b": [1, 2], "c": "tiga"
+        }
+
+        await cache.delete("a", "b")
+        assert await cache.get_many(["a", "b", "c"]) == {"c": "tiga"}
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["writes"], stats["errors"]) == (5, 4, 3, 0)
+
+    asyncio.run(scenario())
+
+
+def test_ttl_expiry(use_backend):
+    async def scenario():
+        use_backend()
+        cache = CacheNamespace("matkul", ttl=60)
+        await cache.set("short", 1, ttl=0.05)
+        await cache.set("long", 2)
+        assert await cache.get("short") == 1
+
+        await asyncio.sleep(0.15)
+        assert await cache.get_many(["short", "long"]) == {"long": 2}
+
+        # ttl per entry tidak boleh melebihi ttl namespace
+        capped = CacheNamespace("capped", ttl=0.05)
+        await capped.set("x", 1, ttl=3600)
+        await asyncio.sleep(0.15)
+        assert await capped.get("x") is None
+
+    asyncio.run(scenario())
+
+
+def test_namespaces_do_not_collide(use_backend):
+    async def scenario():
+        backend = use_backend()
+        matkul = CacheNamespace("matkul", ttl=60)
+        cpl = CacheNamespace("cpl", ttl=60)
+        await matkul.set("1", "matkul")
+        await cpl.set("1", "cpl")
+        assert await matkul.get("1") == "matkul"
+        assert await cpl.get("1") == "cpl"
+
+        await cpl.delete("1")
+        assert await matkul.get("1") == "matkul"
+        assert await cpl.get("1") is None
+
+        raw = await backend.get_many([f"{settings.CACHE_KEY_PREFIX}:matkul:1"])
+        assert raw == [b'"matkul"']
+
+    asyncio.run(scenario())
+
+
+def test_json_round_trip(use_backend):
+    async def scenario():
+        use_backend()
+        cache = CacheNamespace("graph", ttl=60)
+        id_kurikulum = uuid.uuid4()
+        value = {
+            "id_kurikulum": id_kurikulum,
+            "created_at": datetime(2024, 1, 2, 3, 4, 5),
+            "role": RoleEnum.dosen,
+            "cpl": [{"id_cpl": "CPL-01", "bobot": 0.25, "aktif": True, "catatan": None}],
+        }
+        await cache.set("k", value)
+        assert await cache.get("k") == {
+            "id_kurikulum": str(id_kurikulum),
+            "created_at": "2024-01-02T03:04:05",
+            "role": "dosen",
+            "cpl": [{"id_cpl": "CPL-01", "bobot": 0.25, "aktif": True, "catatan": None}],
+        }
+
+    asyncio.run(scenario())
+
+
+def test_corrupt_entry_counts_as_miss(use_backend):
+    async def scenario():
+        backend = use_backend()
+        cache = CacheNamespace("matkul", ttl=60)
+        await backend.set_many({f"{settings.CACHE_KEY_PREFIX}:matkul:bad": b"{not json"}, 60)
+        assert await cache.get("bad") is None
+        assert cache.stats()["errors"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_principal_round_trip(db, use_backend, monkeypatch):
+    with Session(db) as session:
+        session.add(User(user_id="1987654321", nama="Dosen", password="hash", role=RoleEnum.dosen))
+        session.commit()
+
+    token = create_access_token({"sub": "1987654321", "nama": "Dosen", "role": "dosen"})
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+    async def scenario():
+        use_backend()
+        monkeypatch.setattr(principal_cache, "hits", 0)
+        async with async_session() as session:
+            fresh = await get_current_user(credentials, session)
+
+        # hapus user di database: request berikutnya harus dilayani dari cache
+        with Session(db) as sync_session:
+            sync_session.delete(sync_session.get(User, "1987654321"))
+            sync_session.commit()
+
+        async with async_session() as session:
+            cached = await get_current_user(credentials, session)
+
+        assert principal_cache.hits == 1
+        assert cached.password == ""
+        assert cached.role is RoleEnum.dosen
+        assert cached.model_dump(exclude={"password"}) == fresh.model_dump(exclude={"password"})
+
+    asyncio.run(scenario())